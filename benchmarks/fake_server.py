@@ -0,0 +1,424 @@
+"""
+Module for a local stand-in for a memoQ server, used by the benchmarks.
+
+The stand-in serves WSDLs for the serverproject, tm, tb, security, resource and filemanager endpoints and answers their
+operations with canned responses.  The WSDLs use the memoQ namespace and operation names but are generated from the
+simplified schema below rather than recorded from a real server, so they only cover the operations the benchmarks and
+tests use.  The number of items in list responses, the size of downloads, the contents of TM and TB exports and the
+latency added to every call are configurable.
+
+This code is released under the MIT License.
+"""
+import base64
+import codecs
+import csv
+import io
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lxml import etree
+
+
+NAMESPACE = 'http://kilgray.com/memoqservices/2007'
+SOAP_ENVELOPE_NAMESPACE = 'http://schemas.xmlsoap.org/soap/envelope/'
+# Chunks of large transfers are sent as text nodes over the 10 MB lxml allows by default.
+REQUEST_PARSER = etree.XMLParser(huge_tree=True, resolve_entities=False)
+
+# Fields of the list item types, as (name, XSD type) tuples.
+TYPES = {
+    'ServerProjectInfo': (('Client', 'xs:string'), ('CreationTime', 'xs:dateTime'), ('Deadline', 'xs:dateTime'),
+                          ('Description', 'xs:string'), ('DocumentStatus', 'xs:string'), ('Domain', 'xs:string'),
+                          ('LastChanged', 'xs:dateTime'), ('Name', 'xs:string'), ('Project', 'xs:string'),
+                          ('ServerProjectGuid', 'xs:string'), ('SourceLanguageCode', 'xs:string'),
+                          ('Subject', 'xs:string'), ('TargetLanguageCodes', 'tns:ArrayOfstring'),
+                          ('TimeClosed', 'xs:dateTime')),
+    'TMInfo': (('Client', 'xs:string'), ('Domain', 'xs:string'), ('Guid', 'xs:string'), ('Name', 'xs:string'),
+               ('NumEntries', 'xs:int'), ('SourceLanguageCode', 'xs:string'), ('TargetLanguageCode', 'xs:string')),
+    'TBInfo': (('Client', 'xs:string'), ('Domain', 'xs:string'), ('Guid', 'xs:string'), ('Name', 'xs:string'),
+               ('NumEntries', 'xs:int')),
+    'UserInfo': (('EmailAddress', 'xs:string'), ('FullName', 'xs:string'), ('UserGuid', 'xs:string'),
+                 ('UserName', 'xs:string')),
+    'GroupInfo': (('Description', 'xs:string'), ('GroupGuid', 'xs:string'), ('GroupName', 'xs:string')),
+    'LightResourceInfo': (('Description', 'xs:string'), ('Guid', 'xs:string'), ('Name', 'xs:string'),
+                          ('Readonly', 'xs:boolean')),
+    'TmxImportResult': (('AllSegmentCount', 'xs:int'), ('StoredSegmentCount', 'xs:int')),
+    'TBImportResult': (('ErrorCount', 'xs:int'), ('SuccessCount', 'xs:int')),
+}
+
+# Operations of each endpoint, as (name, parameters, outputs) tuples.  Outputs named after the operation are its
+# result, any others are out parameters.
+SERVICES = {
+    'serverproject': ('IServerProjectService', (
+        ('GetApiVersion', (), (('GetApiVersionResult', 'xs:string'),)),
+        ('ListProjects', (('filter', 'tns:ServerProjectListFilter'),),
+         (('ListProjectsResult', 'tns:ArrayOfServerProjectInfo'),)),
+    )),
+    'tm': ('ITMService', (
+        ('ListTMs', (('srcLang', 'xs:string'), ('targetLang', 'xs:string')), (('ListTMsResult', 'tns:ArrayOfTMInfo'),)),
+        ('BeginChunkedTMXExport', (('tmGuid', 'xs:string'),), (('BeginChunkedTMXExportResult', 'xs:string'),)),
+        ('GetNextTMXChunk', (('sessionId', 'xs:string'),), (('GetNextTMXChunkResult', 'xs:base64Binary'),)),
+        ('EndChunkedTMXExport', (('sessionId', 'xs:string'),), ()),
+        ('BeginChunkedTMXImport', (('tmGuid', 'xs:string'),), (('BeginChunkedTMXImportResult', 'xs:string'),)),
+        ('AddNextTMXChunk', (('sessionId', 'xs:string'), ('tmxData', 'xs:base64Binary')), ()),
+        ('EndChunkedTMXImport', (('sessionId', 'xs:string'),),
+         (('EndChunkedTMXImportResult', 'tns:TmxImportResult'),)),
+    )),
+    'tb': ('ITBService', (
+        ('ListTBs', (('languages', 'xs:string'),), (('ListTBsResult', 'tns:ArrayOfTBInfo'),)),
+        ('BeginChunkedCSVExport', (('tbGuid', 'xs:string'),), (('BeginChunkedCSVExportResult', 'xs:string'),)),
+        ('GetNextExportChunk', (('sessionId', 'xs:string'),), (('GetNextExportChunkResult', 'xs:base64Binary'),)),
+        ('EndChunkedExport', (('sessionId', 'xs:string'),), ()),
+        ('BeginChunkedCSVImport', (('tbGuid', 'xs:string'),), (('BeginChunkedCSVImportResult', 'xs:string'),)),
+        ('AddNextCSVChunk', (('sessionId', 'xs:string'), ('chunk', 'xs:base64Binary')), ()),
+        ('EndChunkedCSVImport', (('sessionId', 'xs:string'),), (('EndChunkedCSVImportResult', 'tns:TBImportResult'),)),
+        ('BeginChunkedMultiTermExport', (('tbGuid', 'xs:string'),),
+         (('BeginChunkedMultiTermExportResult', 'xs:string'),)),
+        ('BeginChunkedMultiTermImport', (('tbGuid', 'xs:string'),),
+         (('BeginChunkedMultiTermImportResult', 'xs:string'),)),
+        ('AddNextMultiTermChunk', (('sessionId', 'xs:string'), ('chunk', 'xs:base64Binary')), ()),
+        ('EndChunkedMultiTermImport', (('sessionId', 'xs:string'),),
+         (('EndChunkedMultiTermImportResult', 'tns:TBImportResult'),)),
+    )),
+    'security': ('ISecurityService', (
+        ('ListUsers', (), (('ListUsersResult', 'tns:ArrayOfUserInfo'),)),
+        ('ListGroups', (), (('ListGroupsResult', 'tns:ArrayOfGroupInfo'),)),
+    )),
+    'resource': ('IResourceService', (
+        ('ListResources', (('resourceType', 'xs:string'), ('filter', 'xs:string')),
+         (('ListResourcesResult', 'tns:ArrayOfLightResourceInfo'),)),
+    )),
+    'filemanager': ('IFileManagerService', (
+        ('BeginChunkedFileUpload', (('fileName', 'xs:string'), ('isZipped', 'xs:boolean')),
+         (('BeginChunkedFileUploadResult', 'xs:string'),)),
+        ('AddNextFileChunk', (('fileIdAndSessionId', 'xs:string'), ('fileData', 'xs:base64Binary')), ()),
+        ('EndChunkedFileUpload', (('fileIdAndSessionId', 'xs:string'),), ()),
+        ('BeginChunkedFileDownload', (('fileGuid', 'xs:string'), ('zip', 'xs:boolean')),
+         (('BeginChunkedFileDownloadResult', 'xs:string'), ('fileName', 'xs:string'), ('fileSize', 'xs:int'))),
+        ('GetNextFileChunk', (('sessionId', 'xs:string'), ('byteCount', 'xs:int')),
+         (('GetNextFileChunkResult', 'xs:base64Binary'),)),
+        ('EndChunkedFileDownload', (('sessionId', 'xs:string'),), ()),
+        ('DeleteFile', (('fileGuid', 'xs:string'),), ()),
+    )),
+}
+
+
+def _sequence(fields) -> str:
+    return '<xs:sequence>' + ''.join(f'<xs:element minOccurs="0" name="{name}" type="{xsd_type}"/>'
+                                     for name, xsd_type in fields) + '</xs:sequence>'
+
+
+def generate_wsdl(endpoint: str, host: str) -> str:
+    """
+    Function for generating the WSDL of an endpoint of the stand-in server.
+
+    :param endpoint: Name of the endpoint, as a string e.g. 'tm'
+    :param host: Host (and port) the server is reachable at, as a string.
+    :returns: The WSDL, as a string.
+    """
+    interface, operations = SERVICES[endpoint]
+    types = ''.join(f'<xs:complexType name="{name}">{_sequence(fields)}</xs:complexType>'
+                    f'<xs:complexType name="ArrayOf{name}"><xs:sequence><xs:element minOccurs="0" '
+                    f'maxOccurs="unbounded" name="{name}" nillable="true" type="tns:{name}"/></xs:sequence>'
+                    f'</xs:complexType>'
+                    for name, fields in TYPES.items())
+    types += '<xs:complexType name="ArrayOfstring"><xs:sequence><xs:element minOccurs="0" maxOccurs="unbounded" ' \
+             'name="string" nillable="true" type="xs:string"/></xs:sequence></xs:complexType>'
+    types += '<xs:complexType name="ServerProjectListFilter">' + \
+             _sequence((('LastChanged', 'xs:dateTime'), ('TimeClosed', 'xs:dateTime'))) + '</xs:complexType>'
+    elements = ''.join(f'<xs:element name="{name}"><xs:complexType>{_sequence(parameters)}</xs:complexType>'
+                       f'</xs:element><xs:element name="{name}Response"><xs:complexType>{_sequence(outputs)}'
+                       f'</xs:complexType></xs:element>'
+                       for name, parameters, outputs in operations)
+    messages = ''.join(f'<wsdl:message name="{interface}_{name}_InputMessage"><wsdl:part name="parameters" '
+                       f'element="tns:{name}"/></wsdl:message><wsdl:message name="{interface}_{name}_OutputMessage">'
+                       f'<wsdl:part name="parameters" element="tns:{name}Response"/></wsdl:message>'
+                       for name, _, _ in operations)
+    port_type = ''.join(f'<wsdl:operation name="{name}"><wsdl:input message="tns:{interface}_{name}_InputMessage"/>'
+                        f'<wsdl:output message="tns:{interface}_{name}_OutputMessage"/></wsdl:operation>'
+                        for name, _, _ in operations)
+    binding = ''.join(f'<wsdl:operation name="{name}"><soap:operation soapAction="{NAMESPACE}/{interface}/{name}" '
+                      f'style="document"/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output>'
+                      f'<soap:body use="literal"/></wsdl:output></wsdl:operation>'
+                      for name, _, _ in operations)
+    return f'''<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="{NAMESPACE}" targetNamespace="{NAMESPACE}">
+<wsdl:types><xs:schema elementFormDefault="qualified" targetNamespace="{NAMESPACE}">{types}{elements}</xs:schema>
+</wsdl:types>{messages}<wsdl:portType name="{interface}">{port_type}</wsdl:portType>
+<wsdl:binding name="BasicHttpBinding_{interface}" type="tns:{interface}">
+<soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>{binding}</wsdl:binding>
+<wsdl:service name="{interface[1:]}"><wsdl:port name="BasicHttpBinding_{interface}"
+    binding="tns:BasicHttpBinding_{interface}"><soap:address location="http://{host}/memoqservices/{endpoint}"/>
+</wsdl:port></wsdl:service></wsdl:definitions>'''
+
+
+def _items(type_name: str, count: int) -> str:
+    fields = TYPES[type_name]
+    values = {
+        'xs:string': lambda name, i: f'{name}-{i % 97}' if name in ('Client', 'Domain', 'Subject') else f'{name}-{i}',
+        'xs:dateTime': lambda name, i: '2100-01-01T00:00:00' if i % 3 else '2000-01-01T00:00:00',
+        'xs:int': lambda name, i: str(i),
+        'xs:boolean': lambda name, i: 'false',
+        # Arrays of zero, one and two items in turn.
+        'tns:ArrayOfstring': lambda name, i: ''.join(f'<string>{code}</string>' for code in ('fre', 'ger')[:i % 3]),
+    }
+    return ''.join(f'<{type_name}>' +
+                   ''.join(f'<{name}>{values[xsd_type](name, i)}</{name}>' for name, xsd_type in fields) +
+                   f'</{type_name}>'
+                   for i in range(count))
+
+
+class _Fault(Exception):
+    """Exception raised for answering an operation with a SOAP fault."""
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow responses (e.g. after a timeout) are expected, and not worth a traceback.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeMemoQServer(object):
+    """
+    Class for a local stand-in for a memoQ server, running in a background thread.
+    """
+
+    def __init__(self, list_size: int = 100, latency: float = 0.0, download_size: int = 1024 * 1024,
+                 api_version: str = '9.2.5', export_chunk_size: int = 64 * 1024):
+        """
+        Initializer for the class.
+
+        :param list_size: Number of items returned by the list operations, as an int.  This can be changed at any time.
+        :param latency: Number of seconds added to every call, as a float.
+        :param download_size: Size in bytes of the files served by the filemanager endpoint, as an int.
+        :param api_version: The API version reported by the server, as a string.
+        :param export_chunk_size: Size in bytes of the chunks of TM and TB exports, as an int.
+        """
+        self.list_size = list_size
+        self.latency = latency
+        self.download_size = download_size
+        self.api_version = api_version
+        self.export_chunk_size = export_chunk_size
+        # Number of requests received, by operation name (or by endpoint followed by '?wsdl' for WSDLs).
+        self.calls = Counter()
+        self.uploaded_bytes = {}
+        # Contents exported for each TM and TB (as CSV or MultiTerm XML), and imported into each, by GUID.  Exporting
+        # any other TM or TB fails.
+        self.tmx = {}
+        self.csv = {}
+        self.multiterm = {}
+        self.imported = {}
+        self._downloaded_bytes = {}
+        self._exports = {}
+        self._imports = {}
+        self._lists = {}
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        """
+        Method for getting the base URL of the running server.
+
+        :returns: The base URL, as a string.
+        """
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """
+        Method for starting the server on a free local port.
+        """
+        self._httpd = _HTTPServer(('127.0.0.1', 0), _make_handler(self))
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Method for stopping the server.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def _list(self, type_name: str) -> str:
+        # Keyed by size as well, so that changing list_size changes the lists served from then on.
+        key = (type_name, self.list_size)
+        with self._lock:
+            try:
+                return self._lists[key]
+            except KeyError:
+                self._lists[key] = _items(type_name, self.list_size)
+                return self._lists[key]
+
+    def respond(self, operation: str, parameters: dict) -> str:
+        """
+        Method for producing the body of the response to an operation.
+
+        :param operation: Name of the operation, as a string.
+        :param parameters: Dict mapping the names of the parameters of the operation to their text.
+        :returns: The contents of the response element, as a string.
+        """
+        if operation == 'GetApiVersion':
+            return f'<GetApiVersionResult>{self.api_version}</GetApiVersionResult>'
+        list_types = {'ListProjects': 'ServerProjectInfo', 'ListTMs': 'TMInfo', 'ListTBs': 'TBInfo',
+                      'ListUsers': 'UserInfo', 'ListGroups': 'GroupInfo', 'ListResources': 'LightResourceInfo'}
+        if operation in list_types:
+            return f'<{operation}Result>{self._list(list_types[operation])}</{operation}Result>'
+        if operation == 'BeginChunkedFileUpload':
+            with self._lock:
+                session_id = f'upload-{len(self.uploaded_bytes)}'
+                self.uploaded_bytes[session_id] = 0
+            return f'<BeginChunkedFileUploadResult>{session_id}</BeginChunkedFileUploadResult>'
+        if operation == 'AddNextFileChunk':
+            num_bytes = len(base64.b64decode(parameters['fileData']))
+            with self._lock:
+                self.uploaded_bytes[parameters['fileIdAndSessionId']] += num_bytes
+            return ''
+        if operation == 'BeginChunkedFileDownload':
+            session_id = f"download-{parameters['fileGuid']}"
+            with self._lock:
+                self._downloaded_bytes[session_id] = 0
+            return f'<BeginChunkedFileDownloadResult>{session_id}</BeginChunkedFileDownloadResult>' \
+                   f'<fileName>{parameters["fileGuid"]}.bin</fileName><fileSize>{self.download_size}</fileSize>'
+        if operation == 'GetNextFileChunk':
+            session_id = parameters['sessionId']
+            with self._lock:
+                count = min(int(parameters['byteCount']), self.download_size - self._downloaded_bytes[session_id])
+                self._downloaded_bytes[session_id] += count
+            chunk = base64.b64encode(bytes(count)).decode('ascii')
+            return f'<GetNextFileChunkResult>{chunk}</GetNextFileChunkResult>'
+        if operation == 'BeginChunkedTMXExport':
+            return f"<{operation}Result>{self._begin_export(self.tmx, parameters['tmGuid'])}</{operation}Result>"
+        if operation == 'GetNextTMXChunk':
+            chunk = base64.b64encode(self._next_export_chunk(parameters['sessionId'])).decode('ascii')
+            return f'<GetNextTMXChunkResult>{chunk}</GetNextTMXChunkResult>'
+        if operation == 'BeginChunkedCSVExport':
+            return f"<{operation}Result>{self._begin_export(self.csv, parameters['tbGuid'])}</{operation}Result>"
+        if operation == 'BeginChunkedMultiTermExport':
+            return f"<{operation}Result>{self._begin_export(self.multiterm, parameters['tbGuid'])}</{operation}Result>"
+        if operation == 'GetNextExportChunk':
+            chunk = base64.b64encode(self._next_export_chunk(parameters['sessionId'])).decode('ascii')
+            return f'<GetNextExportChunkResult>{chunk}</GetNextExportChunkResult>'
+        if operation in ('EndChunkedTMXExport', 'EndChunkedExport'):
+            with self._lock:
+                del self._exports[parameters['sessionId']]
+            return ''
+        if operation in ('BeginChunkedTMXImport', 'BeginChunkedCSVImport', 'BeginChunkedMultiTermImport'):
+            guid = parameters.get('tmGuid') or parameters['tbGuid']
+            return f"<{operation}Result>{self._begin_import(guid)}</{operation}Result>"
+        if operation in ('AddNextTMXChunk', 'AddNextCSVChunk', 'AddNextMultiTermChunk'):
+            self._add_import_chunk(parameters['sessionId'], parameters.get('tmxData') or parameters.get('chunk'))
+            return ''
+        if operation == 'EndChunkedTMXImport':
+            data = self._end_import(parameters['sessionId'])
+            count = data.count(b'<tu>') + data.count(b'<tu ')
+            return f'<EndChunkedTMXImportResult><AllSegmentCount>{count}</AllSegmentCount>' \
+                   f'<StoredSegmentCount>{count}</StoredSegmentCount></EndChunkedTMXImportResult>'
+        if operation == 'EndChunkedCSVImport':
+            data = self._end_import(parameters['sessionId'])
+            encoding = 'utf-16' if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else 'utf-8-sig'
+            # Every row but the header is an entry.
+            count = max(0, sum(1 for row in csv.reader(io.StringIO(data.decode(encoding)), delimiter='\t') if row) - 1)
+            return f'<EndChunkedCSVImportResult><ErrorCount>0</ErrorCount><SuccessCount>{count}</SuccessCount>' \
+                   f'</EndChunkedCSVImportResult>'
+        if operation == 'EndChunkedMultiTermImport':
+            data = self._end_import(parameters['sessionId'])
+            encoding = 'utf-16' if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else 'utf-8-sig'
+            count = data.decode(encoding).count('<conceptGrp>')
+            return f'<EndChunkedMultiTermImportResult><ErrorCount>0</ErrorCount><SuccessCount>{count}</SuccessCount>' \
+                   f'</EndChunkedMultiTermImportResult>'
+        return ''
+
+    def _begin_export(self, exports: dict, guid: str) -> str:
+        with self._lock:
+            if guid not in exports:
+                raise _Fault(f'No such resource: {guid}')
+            session_id = f'export-{guid}-{len(self._exports)}'
+            self._exports[session_id] = [exports[guid], 0]
+        return session_id
+
+    def _next_export_chunk(self, session_id: str) -> bytes:
+        with self._lock:
+            export = self._exports[session_id]
+            data, position = export
+            export[1] = min(position + self.export_chunk_size, len(data))
+        return data[position:export[1]]
+
+    def _begin_import(self, guid: str) -> str:
+        with self._lock:
+            session_id = f'import-{guid}-{len(self._imports)}'
+            self._imports[session_id] = (guid, bytearray())
+        return session_id
+
+    def _add_import_chunk(self, session_id: str, chunk: str):
+        data = base64.b64decode(chunk or '')
+        with self._lock:
+            self._imports[session_id][1].extend(data)
+
+    def _end_import(self, session_id: str) -> bytes:
+        with self._lock:
+            guid, data = self._imports.pop(session_id)
+            data = self.imported[guid] = bytes(data)
+        return data
+
+
+def _make_handler(server: FakeMemoQServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body: str, status: int = 200):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            endpoint = self.path.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+            if endpoint not in SERVICES:
+                self.send_error(404)
+                return
+            with server._lock:
+                server.calls[f'{endpoint}?wsdl'] += 1
+            self._send(generate_wsdl(endpoint, self.headers['Host']))
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            operation = self.headers.get('SOAPAction', '').strip('"').rsplit('/', 1)[-1]
+            request = etree.fromstring(body, REQUEST_PARSER).find(f'{{{SOAP_ENVELOPE_NAMESPACE}}}Body')[0]
+            parameters = {etree.QName(child).localname: child.text for child in request}
+            with server._lock:
+                server.calls[operation] += 1
+            if server.latency:
+                time.sleep(server.latency)
+            try:
+                response = server.respond(operation, parameters)
+            except _Fault as e:
+                self._send(f'<s:Envelope xmlns:s="{SOAP_ENVELOPE_NAMESPACE}"><s:Body><s:Fault>'
+                           f'<faultcode>s:Client</faultcode><faultstring>{e}</faultstring></s:Fault></s:Body>'
+                           f'</s:Envelope>', status=500)
+                return
+            self._send(f'<s:Envelope xmlns:s="{SOAP_ENVELOPE_NAMESPACE}"><s:Body>'
+                       f'<{operation}Response xmlns="{NAMESPACE}">{response}'
+                       f'</{operation}Response></s:Body></s:Envelope>')
+    return Handler
@@ -0,0 +1,72 @@
+"""
+Module for measuring how long the pymemoq modules take to import.
+
+Each module is imported in a fresh interpreter using ``python -X importtime``, so nothing is already cached in
+``sys.modules``.  Run from the root of the repository with:
+
+    python -m benchmarks.import_time
+
+This code is released under the MIT License.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+DEFAULT_MODULES = ('memoq', 'memoq.server', 'memoq.webservice', 'memoq.util', 'memoq.projects', 'memoq.tmx')
+
+
+def import_time(module: str) -> float:
+    """
+    Function for measuring how long a module takes to import in a fresh interpreter.
+
+    :param module: Name of the module to import, as a string e.g. 'memoq.server'
+    :returns: The cumulative import time of the module, including its dependencies, in seconds.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    # Lines are formatted as "import time: self [us] | cumulative | imported package", innermost imports first.
+    for line in reversed(process.stderr.splitlines()):
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"Could not find the import time of {module} in the output of python -X importtime")
+
+
+def bench_import_time(modules, repeat: int) -> dict:
+    results = {}
+    for module in modules:
+        timings = [import_time(module) for _ in range(repeat)]
+        results[module] = {
+            'repeat': repeat,
+            'number': 1,
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+            'max': max(timings),
+            'per_call': min(timings),
+            'timings': timings,
+        }
+    return results
+
+
+def main(argv: list = None) -> dict:
+    parser = argparse.ArgumentParser(description="Measure how long the pymemoq modules take to import.")
+    parser.add_argument('--output', help="File to write the JSON results to.")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of fresh interpreters per module.")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help="Modules to import.")
+    args = parser.parse_args(argv)
+
+    results = bench_import_time(args.modules, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    for module, result in results.items():
+        print(f"{module}: {result['min'] * 1000:.1f} ms (min of {result['repeat']})")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Module for running the pymemoq benchmarks against a local stand-in memoQ server.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.run --output benchmark-results.json
+
+The results are written as JSON so they can be compared between releases.
+
+This code is released under the MIT License.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import zeep
+
+from memoq.cache import WSDLCache
+from memoq.server import MemoQServer
+from memoq.transport import MemoQTransport
+from memoq.util import response_object_to_dict, response_objects_to_dicts
+from memoq.webservice import MemoQFileManagerService, MemoQServerProjectService, MemoQTMService
+
+from benchmarks.fake_server import FakeMemoQServer
+from benchmarks.import_time import DEFAULT_MODULES, bench_import_time
+
+
+def measure(func, repeat: int, number: int = 1, setup=None) -> dict:
+    """
+    Function for timing a callable.
+
+    :param func: Callable to time.  It is passed the return value of ``setup``, if given.
+    :param repeat: Number of timed runs, as an int.
+    :param number: Number of calls to ``func`` per run, as an int.
+    :param setup: Optional callable run (untimed) before each run, whose return value is passed to ``func``.
+    :returns: A dict of timing statistics, in seconds per run.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        started = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        timings.append(time.perf_counter() - started)
+    return {
+        'repeat': repeat,
+        'number': number,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+        'per_call': min(timings) / number,
+        'timings': timings,
+    }
+
+
+def bench_client_construction(base_url: str, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_path:
+        def cold():
+            transport = MemoQTransport(cache=WSDLCache(os.path.join(cache_path, str(time.perf_counter_ns()))))
+            return MemoQTMService(base_url, transport)._client
+        results['cold'] = measure(cold, repeat)
+
+        warm_path = os.path.join(cache_path, 'warm')
+        MemoQTMService(base_url, MemoQTransport(cache=WSDLCache(warm_path)))._client
+        results['warm_disk'] = measure(
+            lambda: MemoQTMService(base_url, MemoQTransport(cache=WSDLCache(warm_path)))._client, repeat)
+
+        transport = MemoQTransport(cache=WSDLCache(warm_path))
+        MemoQTMService(base_url, transport)._client
+        results['warm_memory'] = measure(lambda: MemoQTMService(base_url, transport)._client, repeat)
+    return results
+
+
+def bench_call_overhead(base_url: str, cache: WSDLCache, repeat: int, number: int) -> dict:
+    service = MemoQServerProjectService(base_url, MemoQTransport(cache=cache))
+    client = service._client
+    service.GetApiVersion()
+    return {
+        'direct_client': measure(lambda: client.service.GetApiVersion(), repeat, number),
+        'through_getattr': measure(lambda: service.GetApiVersion(), repeat, number),
+    }
+
+
+def bench_serialization(base_url: str, cache: WSDLCache, repeat: int) -> dict:
+    service = MemoQServerProjectService(base_url, MemoQTransport(cache=cache))
+    projects = service.ListProjects({'TimeClosed': datetime(1900, 1, 1)})
+    results = {
+        'response_object_to_dict': measure(lambda: [response_object_to_dict(proj) for proj in projects], repeat),
+        'response_objects_to_dicts': measure(lambda: response_objects_to_dicts(projects), repeat),
+    }
+    for result in results.values():
+        result['items'] = len(projects)
+        result['items_per_second'] = len(projects) / result['min']
+    return results
+
+
+def bench_inventory(base_url: str, cache: WSDLCache, repeat: int) -> dict:
+    def inventory(memoq_server):
+        return (memoq_server.all_projects, memoq_server.tms, memoq_server.tbs, memoq_server.users,
+                memoq_server.groups)
+
+    transport = MemoQTransport(cache=cache)
+    inventory(MemoQServer(base_url, transport))
+    return {
+        'properties': measure(inventory, repeat, setup=lambda: MemoQServer(base_url, transport)),
+        'light_resources_serial': measure(lambda s: dict(iter(s.light_resources)), repeat,
+                                          setup=lambda: MemoQServer(base_url, transport)),
+        'light_resources_prefetch': measure(lambda s: s.light_resources.prefetch(), repeat,
+                                            setup=lambda: MemoQServer(base_url, transport)),
+    }
+
+
+def bench_transfer(base_url: str, cache: WSDLCache, repeat: int, size: int) -> dict:
+    service = MemoQFileManagerService(base_url, MemoQTransport(cache=cache))
+    with tempfile.TemporaryDirectory() as path:
+        source = os.path.join(path, 'upload.bin')
+        with open(source, 'wb') as f:
+            f.write(os.urandom(size))
+        results = {
+            'upload': measure(lambda: service.upload(source), repeat),
+            'upload_read_ahead': measure(lambda: service.upload(source, read_ahead=2), repeat),
+            'download': measure(lambda: service.download('file', os.path.join(path, 'download.bin')), repeat),
+            'download_pipelined': measure(
+                lambda: service.download('file', os.path.join(path, 'download.bin'), pipeline=True), repeat),
+        }
+    for result in results.values():
+        result['bytes'] = size
+        result['bytes_per_second'] = size / result['min']
+    return results
+
+
+def main(argv: list = None) -> dict:
+    parser = argparse.ArgumentParser(description="Run the pymemoq benchmarks against a local stand-in memoQ server.")
+    parser.add_argument('--output', default='benchmark-results.json', help="File to write the JSON results to.")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of timed runs per benchmark.")
+    parser.add_argument('--calls', type=int, default=200, help="Number of calls per run of the call benchmarks.")
+    parser.add_argument('--list-size', type=int, default=1000, help="Number of items in list responses.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds of latency added to every call.")
+    parser.add_argument('--transfer-size', type=int, default=16 * 1024 * 1024, help="Bytes per upload/download.")
+    args = parser.parse_args(argv)
+
+    # The stand-in server listens on a new port every run, so its service definitions are cached in a temporary
+    # directory rather than leaving a stale entry in the user's cache every time.
+    with FakeMemoQServer(list_size=args.list_size, latency=args.latency, download_size=args.transfer_size) as server, \
+            tempfile.TemporaryDirectory() as cache_path:
+        cache = WSDLCache(cache_path)
+        results = {
+            'metadata': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': sys.version,
+                'platform': platform.platform(),
+                'zeep': zeep.__version__,
+                'parameters': vars(args),
+            },
+            'results': {
+                'client_construction': bench_client_construction(server.base_url, args.repeat),
+                'call_overhead': bench_call_overhead(server.base_url, cache, args.repeat, args.calls),
+                'serialization': bench_serialization(server.base_url, cache, args.repeat),
+                'inventory': bench_inventory(server.base_url, cache, args.repeat),
+                'transfer': bench_transfer(server.base_url, cache, args.repeat, args.transfer_size),
+                'import_time': bench_import_time(DEFAULT_MODULES, args.repeat),
+            },
+        }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    for group, benchmarks in results['results'].items():
+        for name, result in benchmarks.items():
+            print(f"{group}.{name}: {result['per_call'] * 1000:.3f} ms per call (min of {result['repeat']})")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,33 @@
-from memoq.server import MemoQServer
+"""
+Package for accessing the memoQ API.
+
+The submodules of the package, and the dependencies they pull in (zeep, lxml, requests), are only imported when they
+are first used, so that ``import memoq`` stays cheap.  ``from memoq import MemoQServer`` and ``memoq.webservice`` and
+the like keep working as if everything had been imported up front.
+
+This code is released under the MIT License.
+"""
+import importlib
 
 __all__ = ['MemoQServer']
+
+# Names exported by the package, and the submodules they are defined in.
+_exports = {
+    'MemoQServer': 'memoq.server',
+}
+_submodules = ('aio', 'cache', 'membership', 'mirror', 'pool', 'projects', 'raw', 'server', 'stats', 'tasks',
+               'termbase', 'tmx', 'transfer', 'transport', 'util', 'webservice', 'workload')
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name]), name)
+        globals()[name] = value
+        return value
+    if name in _submodules:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_exports) | set(_submodules))
@@ -0,0 +1,839 @@
+"""
+Module for asyncio variants of the memoQ Web Service API services and of the memoQ server.
+
+The operations of the services in this module return coroutines, so independent calls can be run concurrently e.g.
+
+    >>> tms, tbs, users = await asyncio.gather(memoq_server.tms, memoq_server.tbs, memoq_server.users)
+
+This requires the zeep async extras, which can be installed with ``pip install pymemoq[async]``.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from zeep import AsyncClient
+
+from .membership import DEFAULT_MEMBERSHIP_WORKERS, MembershipChanges, MembershipIndex, _user_guids
+from .projects import ProjectChanges, ProjectIndex, guid_key
+from .server import DEFAULT_FULL_SYNC_INTERVAL, DEFAULT_PREFETCH_WORKERS, DEFAULT_SYNC_OVERLAP, LightResources, \
+    MemoQServer
+from .stats import Instrumentation
+from .tasks import TaskScheduler
+from .termbase import aiter_concept_entries, aiter_term_entries, encode_concept_entries, encode_term_entries
+from .tmx import aiter_translation_units, awrite_translation_units_json_lines
+from .transfer import AdaptiveChunkSize, AsyncTransferLimiter, ChunkReader, TransferReport, adownload_chunks, \
+    aiter_downloaded_chunks, aupload_chunks
+from .transport import AsyncMemoQTransport, MemoQTransport
+from .util import response_objects_to_records
+from .workload import DEFAULT_HARVEST_WORKERS, DEFAULT_STATISTICS_RESULT_FORMAT, ProjectWorkload, WorkloadHarvest, \
+    WorkloadTotals, _statistics_by_language, _target_languages
+from .webservice import DEFAULT_EXPORT_WORKERS, DEFAULT_IMPORT_READ_AHEAD, DEFAULT_IMPORT_WORKERS, \
+    MemoQWebServiceBase, MemoQAsynchronousTasksService, MemoQELMService, MemoQFileManagerService, \
+    MemoQLightResourceService, MemoQLiveDocsService, MemoQSecurityService, MemoQServerProjectService, MemoQTBService, \
+    MemoQTMService, _upload_file_name
+
+
+async def _arun_concurrently(func, arguments: dict, max_workers: int) -> dict:
+    """
+    Function for awaiting a coroutine function on several items concurrently.
+
+    :param func: Coroutine function taking a key and its value from ``arguments``.
+    :param arguments: A dict mapping each key (e.g. the GUID of a TM) to the value to call ``func`` with.
+    :param max_workers: Maximum number of calls running at the same time, as an int.
+    :returns: A dict mapping each key to the result of ``func``, or to the exception it raised.
+    """
+    slots = asyncio.Semaphore(max(1, max_workers))
+
+    async def call(key, value):
+        async with slots:
+            return await func(key, value)
+
+    results = await asyncio.gather(*(call(key, value) for key, value in arguments.items()), return_exceptions=True)
+    return dict(zip(arguments, results))
+
+
+class AsyncMemoQWebServiceBase(MemoQWebServiceBase):
+    """
+    Abstract Base Class for asyncio memoQ Web Service API Services.
+
+    Operations looked up on instances of this class return coroutines, which must be awaited.
+    """
+
+    _client_class = AsyncClient
+    _transport_class = AsyncMemoQTransport
+
+    async def aclose(self):
+        """
+        Method for closing the transport associated with the service.
+        """
+        await self.transport.aclose()
+
+    def _instrument(self, instrumentation: Instrumentation, name: str, operation):
+        """
+        Method for wrapping an operation so that its calls are recorded.
+
+        :param instrumentation: The Instrumentation instance recording the calls.
+        :param name: Name of the operation, as a string e.g. 'AsyncMemoQTMService.ListTMs'
+        :param operation: The operation to wrap, returning an awaitable.
+        :returns: The wrapped operation.
+        """
+        return instrumentation.wrap_async(name, operation)
+
+
+class AsyncMemoQAsynchronousTasksService(AsyncMemoQWebServiceBase, MemoQAsynchronousTasksService):
+    """Class for the asyncio variant of the Asynchronous Tasks management API."""
+
+
+class AsyncMemoQELMService(AsyncMemoQWebServiceBase, MemoQELMService):
+    """Class for the asyncio variant of the License (ELM) management API."""
+
+
+class AsyncMemoQFileManagerService(AsyncMemoQWebServiceBase, MemoQFileManagerService):
+    """Class for the asyncio variant of the File Manager service API."""
+
+    async def upload(self, path_or_fileobj, file_name: str = None, is_zipped: bool = False,
+                     chunk_size: AdaptiveChunkSize = None, read_ahead: int = 0) -> str:
+        """
+        Method for uploading a file to the memoQ server.  See MemoQFileManagerService.upload() for details.
+
+        :param path_or_fileobj: Path of the file, or a binary file object, to upload.
+        :param file_name: Name of the file on the server, as a string.  Defaults to the name of the file being uploaded,
+            and must be specified when uploading a file object without a name.
+        :param is_zipped: Whether or not the file being uploaded is zipped, as a bool.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :returns: The GUID of the uploaded file, as a string.
+        """
+        file_name = _upload_file_name(path_or_fileobj, file_name)
+        file_guid, _ = await aupload_chunks(lambda: self.BeginChunkedFileUpload(file_name, is_zipped),
+                                            self.AddNextFileChunk,
+                                            self.EndChunkedFileUpload,
+                                            path_or_fileobj,
+                                            chunk_size=chunk_size,
+                                            read_ahead=read_ahead,
+                                            abort=self._abort_upload)
+        return file_guid
+
+    async def _abort_upload(self, file_guid: str):
+        await self.EndChunkedFileUpload(file_guid)
+        await self.DeleteFile(file_guid)
+
+    async def download(self, file_guid: str, dest, zipped: bool = False, chunk_size: AdaptiveChunkSize = None,
+                       pipeline: bool = False) -> str:
+        """
+        Method for downloading a file from the memoQ server.  See MemoQFileManagerService.download() for details.
+
+        :param file_guid: The GUID of the file to download, as a string.
+        :param dest: Path of the file, or a binary file object, to write the downloaded file to.
+        :param zipped: Whether or not the server should zip the file before sending it, as a bool.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param pipeline: Whether to write to ``dest`` in a background thread while the next chunk is requested, as a
+            bool.
+        :returns: The name of the file on the server, as a string.
+        """
+        response = await self.BeginChunkedFileDownload(file_guid, zipped)
+        session_id = response.BeginChunkedFileDownloadResult
+        try:
+            chunks = aiter_downloaded_chunks(lambda byte_count: self.GetNextFileChunk(session_id, byte_count),
+                                             chunk_size=chunk_size,
+                                             total_size=response.fileSize)
+            await adownload_chunks(chunks, dest, pipeline=pipeline)
+        finally:
+            await self.EndChunkedFileDownload(session_id)
+        return response.fileName
+
+
+class AsyncMemoQLightResourceService(AsyncMemoQWebServiceBase, MemoQLightResourceService):
+    """Class for the asyncio variant of the Light resource management API."""
+
+
+class AsyncMemoQLiveDocsService(AsyncMemoQWebServiceBase, MemoQLiveDocsService):
+    """Class for the asyncio variant of the LiveDocs management API."""
+
+
+class AsyncMemoQSecurityService(AsyncMemoQWebServiceBase, MemoQSecurityService):
+    """Class for the asyncio variant of the Security service API."""
+
+
+class AsyncMemoQServerProjectService(AsyncMemoQWebServiceBase, MemoQServerProjectService):
+    """Class for the asyncio variant of the Server project API."""
+
+
+class AsyncMemoQTBService(AsyncMemoQWebServiceBase, MemoQTBService):
+    """Class for the asyncio variant of the Term base API."""
+
+    async def iter_csv_chunks(self, tb_guid: str):
+        """
+        Asynchronous generator for exporting a TB as CSV, one chunk at a time.  See MemoQTBService.iter_csv_chunks()
+        for details.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: An asynchronous generator yielding the CSV as chunks of bytes.
+        """
+        session_id = await self.BeginChunkedCSVExport(tb_guid)
+        try:
+            async for chunk in aiter_downloaded_chunks(lambda _: self.GetNextExportChunk(session_id)):
+                yield chunk
+        finally:
+            await self.EndChunkedExport(session_id)
+
+    def iter_term_entries(self, tb_guid: str):
+        """
+        Asynchronous generator for exporting the entries of a TB one at a time.  See MemoQTBService.iter_term_entries()
+        for details.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: An asynchronous generator yielding each entry as a ``memoq.termbase.TermEntry`` instance.
+        """
+        return aiter_term_entries(self.iter_csv_chunks(tb_guid))
+
+    async def export_csv(self, tb_guid: str, dest, pipeline: bool = False) -> int:
+        """
+        Method for exporting a TB to a CSV file.  See MemoQTBService.export_csv() for details.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :param dest: Path of the file, or a binary file object, to write to.
+        :param pipeline: Whether to write to ``dest`` in a background thread while the next chunk is requested, as a
+            bool.
+        :returns: The number of bytes written, as an int.
+        """
+        return await adownload_chunks(self.iter_csv_chunks(tb_guid), dest, pipeline=pipeline)
+
+    async def export_csvs(self, destinations: dict, max_workers: int = DEFAULT_EXPORT_WORKERS) -> dict:
+        """
+        Method for exporting several TBs to CSV files concurrently.  See MemoQTBService.export_csvs() for details.
+
+        :param destinations: A dict mapping the GUID of each TB to export to the path of the file to write it to.
+        :param max_workers: Maximum number of TBs to export at the same time, as an int.
+        :returns: A dict mapping the GUID of each TB to the number of bytes written for it, or to the exception raised
+            if its export failed.
+        """
+        return await _arun_concurrently(self.export_csv, destinations, max_workers)
+
+    async def import_csv(self, tb_guid: str, source, chunk_size: AdaptiveChunkSize = None,
+                         read_ahead: int = DEFAULT_IMPORT_READ_AHEAD,
+                         limiter: AsyncTransferLimiter = None) -> TransferReport:
+        """
+        Method for importing entries into a TB from CSV.  See MemoQTBService.import_csv() for details.
+
+        :param tb_guid: The GUID of the TB to import into, as a string.
+        :param source: Path of a CSV file, or a binary file object, to import.  Alternatively, an iterable (e.g. a
+            generator) of ``memoq.termbase.TermEntry`` instances or of dicts, which are encoded as they are sent.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :param limiter: Optional AsyncTransferLimiter shared with other imports, capping their concurrency and
+            bandwidth.
+        :returns: A TransferReport instance, whose result is the value returned by EndChunkedCSVImport().
+        """
+        if not isinstance(source, (str, bytes, os.PathLike)) and not hasattr(source, 'read'):
+            source = ChunkReader(encode_term_entries(source))
+        return await self._import(tb_guid, self.BeginChunkedCSVImport, self.AddNextCSVChunk, self.EndChunkedCSVImport,
+                                  source, chunk_size, read_ahead, limiter)
+
+    async def import_csvs(self, sources: dict, max_workers: int = DEFAULT_IMPORT_WORKERS,
+                          max_bytes_per_second: float = None, limiter: AsyncTransferLimiter = None) -> dict:
+        """
+        Method for importing entries into several TBs concurrently.  See MemoQTBService.import_csvs() for details.
+
+        :param sources: A dict mapping the GUID of each TB to import into to its source, as accepted by
+            ``import_csv()``.
+        :param max_workers: Maximum number of imports running at the same time, as an int.
+        :param max_bytes_per_second: Maximum number of bytes sent per second across all of the imports, or None for no
+            cap.
+        :param limiter: AsyncTransferLimiter to use instead of one created from ``max_workers`` and
+            ``max_bytes_per_second``, e.g. to share the caps with other imports.
+        :returns: A dict mapping the GUID of each TB to the TransferReport of its import, or to the exception raised if
+            its import failed.
+        """
+        limiter = limiter if limiter is not None else AsyncTransferLimiter(max_workers, max_bytes_per_second)
+        return await _arun_concurrently(lambda tb_guid, source: self.import_csv(tb_guid, source, limiter=limiter),
+                                        sources, max_workers)
+
+    async def iter_multiterm_chunks(self, tb_guid: str):
+        """
+        Asynchronous generator for exporting a TB as MultiTerm XML, one chunk at a time.  See
+        MemoQTBService.iter_multiterm_chunks() for details.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: An asynchronous generator yielding the XML as chunks of bytes.
+        """
+        session_id = await self.BeginChunkedMultiTermExport(tb_guid)
+        try:
+            async for chunk in aiter_downloaded_chunks(lambda _: self.GetNextExportChunk(session_id)):
+                yield chunk
+        finally:
+            await self.EndChunkedExport(session_id)
+
+    def iter_concept_entries(self, tb_guid: str):
+        """
+        Asynchronous generator for exporting the concepts of a TB one at a time.  See
+        MemoQTBService.iter_concept_entries() for details.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: An asynchronous generator yielding each concept as a ``memoq.termbase.ConceptEntry`` instance.
+        """
+        return aiter_concept_entries(self.iter_multiterm_chunks(tb_guid))
+
+    async def export_multiterm(self, tb_guid: str, dest, pipeline: bool = False) -> int:
+        """
+        Method for exporting a TB to a MultiTerm XML file.  See MemoQTBService.export_multiterm() for details.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :param dest: Path of the file, or a binary file object, to write to.
+        :param pipeline: Whether to write to ``dest`` in a background thread while the next chunk is requested, as a
+            bool.
+        :returns: The number of bytes written, as an int.
+        """
+        return await adownload_chunks(self.iter_multiterm_chunks(tb_guid), dest, pipeline=pipeline)
+
+    async def import_multiterm(self, tb_guid: str, source, chunk_size: AdaptiveChunkSize = None,
+                               read_ahead: int = DEFAULT_IMPORT_READ_AHEAD,
+                               limiter: AsyncTransferLimiter = None) -> TransferReport:
+        """
+        Method for importing concepts into a TB from MultiTerm XML.  See MemoQTBService.import_multiterm() for details.
+
+        :param tb_guid: The GUID of the TB to import into, as a string.
+        :param source: Path of a MultiTerm XML file, or a binary file object, to import.  Alternatively, an iterable
+            (e.g. a generator) of ``memoq.termbase.ConceptEntry`` instances, which are encoded as they are sent.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :param limiter: Optional AsyncTransferLimiter shared with other imports, capping their concurrency and
+            bandwidth.
+        :returns: A TransferReport instance, whose result is the value returned by EndChunkedMultiTermImport().
+        """
+        if not isinstance(source, (str, bytes, os.PathLike)) and not hasattr(source, 'read'):
+            source = ChunkReader(encode_concept_entries(source))
+        return await self._import(tb_guid, self.BeginChunkedMultiTermImport, self.AddNextMultiTermChunk,
+                                  self.EndChunkedMultiTermImport, source, chunk_size, read_ahead, limiter)
+
+    async def _import(self, tb_guid: str, begin, add_next_chunk, end, source, chunk_size: AdaptiveChunkSize,
+                      read_ahead: int, limiter: AsyncTransferLimiter) -> TransferReport:
+        sent = 0
+
+        async def add_next_counted_chunk(session_id: str, chunk):
+            nonlocal sent
+            await add_next_chunk(session_id, chunk)
+            sent += len(chunk)
+
+        started = time.perf_counter()
+        _, result = await aupload_chunks(lambda: begin(tb_guid),
+                                         add_next_counted_chunk,
+                                         end,
+                                         source,
+                                         chunk_size=chunk_size,
+                                         read_ahead=read_ahead,
+                                         limiter=limiter)
+        return TransferReport(tb_guid, sent, time.perf_counter() - started, result)
+
+
+class AsyncMemoQTMService(AsyncMemoQWebServiceBase, MemoQTMService):
+    """Class for the asyncio variant of the Translation Memory API."""
+
+    async def iter_tmx_chunks(self, tm_guid: str):
+        """
+        Asynchronous generator for exporting a TM as TMX, one chunk at a time.  See MemoQTMService.iter_tmx_chunks()
+        for details.
+
+        :param tm_guid: The GUID of the TM to export, as a string.
+        :returns: An asynchronous generator yielding the TMX as chunks of bytes.
+        """
+        session_id = await self.BeginChunkedTMXExport(tm_guid)
+        try:
+            async for chunk in aiter_downloaded_chunks(lambda _: self.GetNextTMXChunk(session_id)):
+                yield chunk
+        finally:
+            await self.EndChunkedTMXExport(session_id)
+
+    def iter_translation_units(self, tm_guid: str):
+        """
+        Asynchronous generator for exporting the translation units of a TM one at a time.  See
+        MemoQTMService.iter_translation_units() for details.
+
+        :param tm_guid: The GUID of the TM to export, as a string.
+        :returns: An asynchronous generator yielding each translation unit as a ``memoq.tmx.TranslationUnit`` instance.
+        """
+        return aiter_translation_units(self.iter_tmx_chunks(tm_guid))
+
+    async def export_tmx(self, tm_guid: str, dest, json_lines: bool = False, pipeline: bool = False) -> int:
+        """
+        Method for exporting a TM to a file.  See MemoQTMService.export_tmx() for details.
+
+        :param tm_guid: The GUID of the TM to export, as a string.
+        :param dest: Path of the file, or a file object, to write to.  File objects must be binary when writing TMX and
+            text when writing JSON Lines.
+        :param json_lines: Whether to write the translation units as JSON Lines rather than the TMX as is, as a bool.
+        :param pipeline: Whether to write the TMX in a background thread while the next chunk is requested, as a bool.
+        :returns: The number of bytes written for TMX, or the number of translation units written for JSON Lines.
+        """
+        if not json_lines:
+            return await adownload_chunks(self.iter_tmx_chunks(tm_guid), dest, pipeline=pipeline)
+        if hasattr(dest, 'write'):
+            return await awrite_translation_units_json_lines(self.iter_translation_units(tm_guid), dest)
+        with open(dest, 'w', encoding='utf-8') as f:
+            return await awrite_translation_units_json_lines(self.iter_translation_units(tm_guid), f)
+
+    async def export_tmxs(self, destinations: dict, json_lines: bool = False,
+                          max_workers: int = DEFAULT_EXPORT_WORKERS) -> dict:
+        """
+        Method for exporting several TMs to files concurrently.  See MemoQTMService.export_tmxs() for details.
+
+        :param destinations: A dict mapping the GUID of each TM to export to the path of the file to write it to.
+        :param json_lines: Whether to write the translation units as JSON Lines rather than the TMX as is, as a bool.
+        :param max_workers: Maximum number of TMs to export at the same time, as an int.
+        :returns: A dict mapping the GUID of each TM to the return value of ``export_tmx()`` for it, or to the exception
+            raised if its export failed.
+        """
+        return await _arun_concurrently(lambda tm_guid, dest: self.export_tmx(tm_guid, dest, json_lines), destinations,
+                                        max_workers)
+
+    async def import_tmx(self, tm_guid: str, path_or_fileobj, chunk_size: AdaptiveChunkSize = None,
+                         read_ahead: int = DEFAULT_IMPORT_READ_AHEAD,
+                         limiter: AsyncTransferLimiter = None) -> TransferReport:
+        """
+        Method for importing a TMX file into a TM.  See MemoQTMService.import_tmx() for details.
+
+        :param tm_guid: The GUID of the TM to import into, as a string.
+        :param path_or_fileobj: Path of the TMX file, or a binary file object, to import.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :param limiter: Optional AsyncTransferLimiter shared with other imports, capping their concurrency and
+            bandwidth.
+        :returns: A TransferReport instance, whose result is the TmxImportResult returned by EndChunkedTMXImport().
+        """
+        sent = 0
+
+        async def add_next_chunk(session_id: str, chunk):
+            nonlocal sent
+            await self.AddNextTMXChunk(session_id, chunk)
+            sent += len(chunk)
+
+        started = time.perf_counter()
+        _, result = await aupload_chunks(lambda: self.BeginChunkedTMXImport(tm_guid),
+                                         add_next_chunk,
+                                         self.EndChunkedTMXImport,
+                                         path_or_fileobj,
+                                         chunk_size=chunk_size,
+                                         read_ahead=read_ahead,
+                                         limiter=limiter)
+        return TransferReport(tm_guid, sent, time.perf_counter() - started, result)
+
+    async def import_tmxs(self, sources: dict, max_workers: int = DEFAULT_IMPORT_WORKERS,
+                          max_bytes_per_second: float = None, limiter: AsyncTransferLimiter = None) -> dict:
+        """
+        Method for importing several TMX files concurrently.  See MemoQTMService.import_tmxs() for details.
+
+        :param sources: A dict mapping the GUID of each TM to import into to the path of the TMX file to import.
+        :param max_workers: Maximum number of imports running at the same time, as an int.
+        :param max_bytes_per_second: Maximum number of bytes sent per second across all of the imports, or None for no
+            cap.
+        :param limiter: AsyncTransferLimiter to use instead of one created from ``max_workers`` and
+            ``max_bytes_per_second``, e.g. to share the caps with other imports.
+        :returns: A dict mapping the GUID of each TM to the TransferReport of its import, or to the exception raised if
+            its import failed.
+        """
+        limiter = limiter if limiter is not None else AsyncTransferLimiter(max_workers, max_bytes_per_second)
+        return await _arun_concurrently(lambda tm_guid, source: self.import_tmx(tm_guid, source, limiter=limiter),
+                                        sources, max_workers)
+
+
+class AsyncLightResources(LightResources):
+    """
+    Class that represents a mapping of memoQ light resources, retrieved using asyncio.
+
+    Lookups return awaitables, whether or not the light resource type has been prefetched.
+    """
+
+    def __getitem__(self, item: str):
+        """
+        Method for retrieving a light resource.  See LightResources.__getitem__() for details.
+
+        :param item: Light Resource to retrieve, as a str e.g. "ProjectTemplate"
+        :returns: An awaitable for the list of Light Resources of the requested type.
+        """
+        if item in self._resources:
+            resources = self._resources[item]
+
+            async def prefetched():
+                return resources
+
+            return prefetched()
+        return super().__getitem__(item)
+
+    async def prefetch(self, resource_types=None,
+                       max_workers: int = DEFAULT_PREFETCH_WORKERS) -> 'AsyncLightResources':
+        """
+        Method for retrieving several types of light resources concurrently and keeping them for later lookups.
+
+        :param resource_types: Iterable of the light resource types to retrieve e.g. ("ProjectTemplate", "QASettings").
+            If not specified, every light resource type is retrieved.
+        :param max_workers: Maximum number of light resource types to retrieve at the same time, as an int.
+        :returns: The AsyncLightResources instance, for chaining.
+        """
+        resource_types = self._checked_resource_types(resource_types)
+        slots = asyncio.Semaphore(max(1, max_workers))
+
+        async def list_resources(resource_type: str) -> list:
+            async with slots:
+                return await self._light_resource_service.ListResources(resource_type)
+
+        resources = await asyncio.gather(*(list_resources(resource_type) for resource_type in resource_types))
+        self._resources.update(zip(resource_types, resources))
+        return self
+
+
+class AsyncMembershipIndex(MembershipIndex):
+    """
+    Class that represents an index of the members of the groups on a memoQ server, refreshed using asyncio.
+
+    Lookups are answered from the index as usual, and its ``refresh()`` and ``refresh_groups()`` methods are
+    coroutines.  See MembershipIndex for details.
+    """
+
+    async def refresh(self, groups: list, full: bool = False, max_age: float = None,
+                      max_workers: int = DEFAULT_MEMBERSHIP_WORKERS) -> MembershipChanges:
+        """
+        Method for bringing the index up to date with the groups on the memoQ server.  See MembershipIndex.refresh()
+        for details.
+
+        :param groups: The full list of groups on the server, as returned by ListGroups().
+        :param full: Whether to retrieve the members of every group again, as a bool.
+        :param max_age: Number of seconds after which the members of a group are retrieved again.
+        :param max_workers: Maximum number of groups to retrieve at the same time, as an int.
+        :returns: A MembershipChanges instance describing the memberships added and removed.
+        """
+        stale, removed_groups, now = self._outdated(groups, full, max_age)
+        return self._complete_refresh(await self._fetch(stale, max_workers), removed_groups, now)
+
+    async def refresh_groups(self, group_guids, max_workers: int = DEFAULT_MEMBERSHIP_WORKERS) -> MembershipChanges:
+        """
+        Method for retrieving the members of some groups again, e.g. after adding users to them.
+
+        :param group_guids: Iterable of the GUIDs of the groups to refresh.
+        :param max_workers: Maximum number of groups to retrieve at the same time, as an int.
+        :returns: A MembershipChanges instance describing the memberships added and removed.
+        """
+        members = await self._fetch({guid_key(guid) for guid in group_guids}, max_workers)
+        return self._apply(members, time.monotonic())
+
+    async def _fetch(self, group_guids, max_workers: int) -> dict:
+        """
+        Method for retrieving the members of groups from the memoQ server concurrently.
+
+        :returns: A dict mapping the GUID of each group to a frozenset of the GUIDs of its users.
+        """
+        group_guids = list(group_guids)
+        slots = asyncio.Semaphore(max(1, max_workers))
+
+        async def users_of_group(group_guid: str) -> frozenset:
+            async with slots:
+                return _user_guids(await self._security_service.ListUsersOfGroup(group_guid))
+
+        return dict(zip(group_guids, await asyncio.gather(*(users_of_group(guid) for guid in group_guids))))
+
+
+class AsyncWorkloadHarvest(WorkloadHarvest):
+    """
+    Class that represents the harvest of the workload of a set of projects on a memoQ server, using asyncio.
+
+    The harvest is run by iterating over it with ``async for`` (or awaiting ``run()``).  See WorkloadHarvest for
+    details.
+    """
+
+    def __init__(self, memoq_server, projects=None, statistics_options: dict = None,
+                 statistics_result_format: str = DEFAULT_STATISTICS_RESULT_FORMAT,
+                 max_workers: int = DEFAULT_HARVEST_WORKERS):
+        """
+        Initializer for the class.
+
+        :param memoq_server: The AsyncMemoQServer instance to harvest the projects from.
+        :param projects: Iterable of the projects to harvest, as returned by ListProjects().  If not specified, the
+            active projects of the server are harvested.
+        :param statistics_options: The options of the statistics to run on each project, as a dict of the fields of
+            StatisticsOptions.  If not specified, statistics are not harvested.
+        :param statistics_result_format: The format of the statistics, as a string e.g. 'CSV_MemoQ'
+        :param max_workers: Maximum number of projects harvested at the same time, as an int.
+        """
+        super().__init__(memoq_server, projects, statistics_options, statistics_result_format, max_workers)
+
+    def __iter__(self):
+        raise TypeError(f"{self.__class__.__name__} must be iterated over with 'async for'.")
+
+    def __aiter__(self):
+        if self._started:
+            raise RuntimeError("A WorkloadHarvest can only be iterated over once.")
+        self._started = True
+        return self._aharvest()
+
+    async def run(self) -> WorkloadTotals:
+        """
+        Method for harvesting every project, keeping only the totals.
+
+        :returns: The totals of the workload, as a WorkloadTotals instance.
+        """
+        async for _ in self:
+            pass
+        return self.totals
+
+    async def _aharvest(self):
+        projects = self.projects if self.projects is not None else await self.memoq_server.active_projects
+        pending = set()
+        try:
+            for project in projects:
+                pending.add(asyncio.ensure_future(self._aharvest_project(project)))
+                if len(pending) < self.max_workers:
+                    continue
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for workload in self._completed(done):
+                    yield workload
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for workload in self._completed(done):
+                    yield workload
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _aharvest_project(self, project) -> ProjectWorkload:
+        started = time.perf_counter()
+        service = self.memoq_server._server_project_service
+        try:
+            documents = await service.ListProjectTranslationDocuments(project.ServerProjectGuid) or []
+            if self.memoq_server.compact:
+                documents = response_objects_to_records(documents)
+            statistics = None
+            if self.statistics_options is not None:
+                task = await service.StartStatisticsOnProjectTask(project.ServerProjectGuid,
+                                                                  _target_languages(documents),
+                                                                  self.statistics_options,
+                                                                  self.statistics_result_format)
+                statistics = _statistics_by_language(await self.memoq_server.task_scheduler.wait_async(task.TaskId))
+        except Exception as e:
+            return ProjectWorkload(project, error=e, seconds=time.perf_counter() - started)
+        return ProjectWorkload(project, documents, statistics, seconds=time.perf_counter() - started)
+
+
+class AsyncMemoQServer(MemoQServer):
+    """
+    Class that represents a memoQ server, accessed using asyncio.
+
+    The properties of this class that talk to the server (e.g. ``tms``, ``users`` or ``all_projects``) return
+    coroutines, which must be awaited.
+    """
+
+    _transport_class = AsyncMemoQTransport
+    _asynchronous_tasks_service_class = AsyncMemoQAsynchronousTasksService
+    _light_resource_service_class = AsyncMemoQLightResourceService
+    _live_docs_service_class = AsyncMemoQLiveDocsService
+    _security_service_class = AsyncMemoQSecurityService
+    _server_project_service_class = AsyncMemoQServerProjectService
+    _tb_service_class = AsyncMemoQTBService
+    _tm_service_class = AsyncMemoQTMService
+    _light_resources_class = AsyncLightResources
+    _membership_loading = None
+
+    def __str__(self) -> str:
+        """
+        Method for retrieving a user-readable string representing the memoQ server.
+
+        Since retrieving the API version requires awaiting a call to the server, it is not included in the string.
+
+        :returns: A user readable str for the memoQ server.
+        """
+        return f"memoQ server @ {self.base_url}"
+
+    def _reinit_after_fork(self):
+        """
+        Method for replacing the locks of the server in a child process after a fork.  A load of the membership index
+        still running in the parent is dropped, as it belongs to the event loop of the parent.
+        """
+        super()._reinit_after_fork()
+        self._membership_loading = None
+
+    def _cached(self, key: str, loader):
+        """
+        Method for retrieving a value through the cache.
+
+        :param key: Name of the value, as a string e.g. 'tms'
+        :param loader: Callable taking no arguments, which returns an awaitable for the value.
+        :returns: A coroutine for the cached or freshly retrieved value.
+        """
+        return self.cache.aget(key, loader)
+
+    def _cached_list(self, key: str, loader):
+        """
+        Method for retrieving a list through the cache, converting it into compact records if the server is compact.
+
+        :param key: Name of the list, as a string e.g. 'tms'
+        :param loader: Callable taking no arguments, which returns an awaitable for the list.
+        :returns: A coroutine for the cached or freshly retrieved list.
+        """
+        if not self.compact:
+            return self._cached(key, loader)
+
+        async def load():
+            return response_objects_to_records(await loader())
+
+        return self._cached(key, load)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Method for closing the transport shared by the services of the server.
+        """
+        await self.transport.aclose()
+
+    @property
+    async def active_projects(self) -> list:
+        """
+        Method for retrieving the list of active projects on the memoQ server.
+
+        :returns: A list of active projects on the memoQ server.
+        """
+        return (await self.project_index).active()
+
+    @property
+    async def closed_projects(self) -> list:
+        """
+        Method for retrieving the list of closed projects on the memoQ server.
+
+        :returns: A list of closed projects on the memoQ server.
+        """
+        return (await self.project_index).closed()
+
+    async def sync_projects(self, full: bool = False, full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+                            overlap: float = DEFAULT_SYNC_OVERLAP) -> ProjectChanges:
+        """
+        Method for bringing the local copy of the projects on the memoQ server up to date.  See
+        MemoQServer.sync_projects() for details.
+
+        :param full: Whether or not to retrieve every project regardless of the previous sync, as a bool.
+        :param full_sync_interval: Number of seconds after which a full sync is made instead of an incremental one, or
+            None to only make full syncs when asked to.
+        :param overlap: Number of seconds before the previous sync to ask for changes from, to allow for clock skew.
+        :returns: A ProjectChanges instance listing the projects added, updated and removed by the sync.
+        """
+        changes = await self._sync_project_store(full, full_sync_interval, overlap)
+
+        async def synced_projects():
+            return self.project_store.projects
+
+        self.cache.invalidate('all_projects')
+        await self.cache.aget('all_projects', synced_projects)
+        return changes
+
+    async def _sync_project_store(self, full: bool = False, full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+                                  overlap: float = DEFAULT_SYNC_OVERLAP) -> ProjectChanges:
+        synced_at = datetime.now(timezone.utc)
+        since = self._sync_since(synced_at, full, full_sync_interval, overlap)
+        projects = await self._server_project_service.ListProjects(self._project_list_filter(since))
+        return self._merge_projects(projects, since, synced_at)
+
+    async def _synced_projects(self) -> list:
+        """
+        Method for retrieving the list of all projects once projects are synced, by syncing them.
+
+        :returns: The projects in ``project_store``, as a list.
+        """
+        await self._sync_project_store()
+        return self.project_store.projects
+
+    @property
+    async def membership_index(self) -> AsyncMembershipIndex:
+        """
+        Method for retrieving the index of the members of the groups on the memoQ server.  The members of every group
+        are retrieved the first time the index is used; use refresh_membership() to bring it up to date afterwards.
+
+        :returns: An AsyncMembershipIndex instance, whose ``users_of()`` and ``groups_of()`` methods take group and
+            user GUIDs.
+        """
+        if self._membership_index is not None:
+            return self._membership_index
+        # Concurrent first uses share a single load, as with the cached lists.
+        if self._membership_loading is None or self._membership_loading.done():
+            self._membership_loading = asyncio.ensure_future(self._load_membership_index())
+        return await asyncio.shield(self._membership_loading)
+
+    async def _load_membership_index(self) -> AsyncMembershipIndex:
+        membership_index = AsyncMembershipIndex(self._security_service)
+        await membership_index.refresh(await self.groups)
+        self._membership_index = membership_index
+        return membership_index
+
+    async def refresh_membership(self, full: bool = False, max_age: float = None,
+                                 max_workers: int = DEFAULT_MEMBERSHIP_WORKERS) -> MembershipChanges:
+        """
+        Method for bringing the membership index up to date with the memoQ server.  See
+        MemoQServer.refresh_membership() for details.
+
+        :param full: Whether to retrieve the members of every group again, as a bool.
+        :param max_age: Number of seconds after which the members of a group are retrieved again.
+        :param max_workers: Maximum number of groups to retrieve at the same time, as an int.
+        :returns: A MembershipChanges instance, whose ``added`` and ``removed`` sets hold (user GUID, group GUID)
+            tuples.
+        """
+        membership_index = await self.membership_index
+        return await membership_index.refresh(await self.refresh('groups'), full=full, max_age=max_age,
+                                              max_workers=max_workers)
+
+    def harvest_workload(self, projects=None, statistics_options: dict = None,
+                         statistics_result_format: str = DEFAULT_STATISTICS_RESULT_FORMAT,
+                         max_workers: int = DEFAULT_HARVEST_WORKERS) -> AsyncWorkloadHarvest:
+        """
+        Method for harvesting the translation documents, word counts and progress (and optionally the statistics) of
+        projects on the memoQ server concurrently e.g.
+
+            >>> harvest = memoq_server.harvest_workload()
+            >>> async for workload in harvest:
+            ...     print(workload.project.Name, workload.word_count, workload.progress)
+            >>> harvest.totals.as_dict()
+
+        :param projects: Iterable of the projects to harvest.  If not specified, the active projects are harvested.
+        :param statistics_options: The options of the statistics to run on each project, as a dict of the fields of
+            StatisticsOptions.  If not specified, statistics are not harvested.
+        :param statistics_result_format: The format of the statistics, as a string e.g. 'CSV_MemoQ'
+        :param max_workers: Maximum number of projects harvested at the same time, as an int.
+        :returns: An AsyncWorkloadHarvest instance, which harvests the projects as it is iterated over with
+            ``async for``, yielding a ProjectWorkload instance per project as it completes.
+        """
+        return AsyncWorkloadHarvest(self, projects, statistics_options, statistics_result_format, max_workers)
+
+    @property
+    def task_scheduler(self) -> TaskScheduler:
+        """
+        Method for retrieving the scheduler used for waiting on memoQ asynchronous tasks started on the memoQ server.
+
+        The scheduler polls the server from its own threads, so it uses a (synchronous) MemoQAsynchronousTasksService
+        of its own, with a synchronous transport sharing the settings, WSDL cache and instrumentation of the transport
+        of the server.  Use its ``wait_async()`` method to await tasks.
+
+        :returns: A TaskScheduler instance.
+        """
+        if self._task_scheduler is None:
+            with self._lock:
+                if self._task_scheduler is None:
+                    if isinstance(self.transport, AsyncMemoQTransport):
+                        transport = self.transport.synchronous_transport()
+                    else:
+                        transport = MemoQTransport(cache=getattr(self.transport, 'cache', None))
+                    self._task_scheduler = TaskScheduler(MemoQAsynchronousTasksService(self.base_url, transport))
+        return self._task_scheduler
+
+    @property
+    async def project_index(self) -> ProjectIndex:
+        """
+        Method for retrieving an index of all projects (both active and closed) on the memoQ server.  The index is
+        rebuilt whenever the list of projects is retrieved again.
+
+        :returns: A ProjectIndex instance, suitable for splitting projects into active and closed ones and for looking
+            up projects by GUID, name, client or document status.
+        """
+        return self._index_projects(await self.all_projects)
@@ -0,0 +1,547 @@
+"""
+Module for caching the memoQ service definitions and the results of calls to the memoQ server.
+
+The memoQ WSDL and XSD files only change when the server is upgraded, so rather than expiring them after a timeout they
+are kept on disk indefinitely, partitioned by server and by the version of the memoQ API the server reports.  When the
+server reports a different version, the definitions cached for the old version are discarded.
+
+The results of calls such as listing the TMs or users of a server are cached in memory according to a per-key policy,
+allowing a bounded amount of staleness in exchange for not calling the server on every access.
+
+This code is released under the MIT License.
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+from zeep.cache import Base
+from zeep.wsdl import Document
+
+
+_PENDING_VERSION = '_pending'
+_VERSION_FILE_NAME = 'VERSION'
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+# Every cache in the process, so that their locks can be replaced in child processes after a fork.
+_wsdl_caches = weakref.WeakSet()
+_inventory_caches = weakref.WeakSet()
+
+
+def _default_cache_path() -> str:
+    """
+    Function for getting the default location of the on-disk cache.
+
+    :returns: The path to the default cache directory, as a string.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'pymemoq', 'wsdl')
+
+
+def get_default_cache() -> 'WSDLCache':
+    """
+    Function for getting the cache shared by default between every transport in the process.
+
+    :returns: The shared WSDLCache instance.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = WSDLCache()
+        return _default_cache
+
+
+def _unpickle_wsdl_cache(path: str, default: bool, state: dict) -> 'WSDLCache':
+    """
+    Function for restoring a pickled WSDLCache.  The default cache of the process that pickled it is restored into the
+    default cache of the process unpickling it, so that every service unpickled there keeps sharing a single cache.
+    """
+    cache = get_default_cache() if default else None
+    if cache is None or cache.path != path:
+        cache = WSDLCache(path)
+    cache._merge(state)
+    return cache
+
+
+def _reinit_after_fork():
+    """
+    Function for replacing the locks of every cache in a child process after a fork, as they may have been held by
+    threads of the parent process, which do not exist in the child.  Loads in progress in the parent are forgotten.
+    """
+    global _default_cache_lock
+    _default_cache_lock = threading.Lock()
+    for cache in list(_wsdl_caches):
+        cache._lock = threading.RLock()
+        cache._loading_locks = {}
+    for cache in list(_inventory_caches):
+        cache._lock = threading.Lock()
+        cache._refreshing = set()
+        cache._loading = {}
+        cache._aloading = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _origin(url: str) -> str:
+    """
+    Function for getting the origin (scheme and network location) of a URL.
+
+    :param url: The URL, as a string.
+    :returns: The origin of the URL, as a string e.g. 'http://localhost:8080'
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+class WSDLCache(Base):
+    """
+    Class for an on-disk cache of the memoQ WSDL and XSD files, keyed by server and memoQ API version.
+
+    Entries never expire.  Instead, the cache is validated once per process against the API version reported by each
+    server, see ``ensure_validated()``.  Parsed service definitions are additionally kept in memory so that every
+    client created for the same service in the same process shares them.
+
+    Child processes forked after the service definitions were parsed share them as they are.  Pickling the cache (e.g.
+    along with a service sent to a ``multiprocessing`` worker) carries the files and the validated API versions over,
+    so the unpickled cache only has to parse the files again, without calling the server.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Initializer for the class.
+
+        :param path: Directory in which to store the cached files, as a string.  Defaults to ``~/.cache/pymemoq/wsdl``
+            (or the equivalent under ``$XDG_CACHE_HOME``).
+        """
+        self.path = path if path is not None else _default_cache_path()
+        self._lock = threading.RLock()
+        # Locks held while loading from a given server, so that loading from one server does not hold up the others.
+        self._loading_locks = {}
+        self._documents = {}
+        self._contents = {}
+        self._validated = set()
+        self._versions = {}
+        _wsdl_caches.add(self)
+
+    def __reduce__(self):
+        with self._lock:
+            state = {'contents': dict(self._contents), 'validated': set(self._validated),
+                     'versions': dict(self._versions)}
+        return _unpickle_wsdl_cache, (self.path, self is _default_cache, state)
+
+    def _merge(self, state: dict):
+        """
+        Method for merging the state of a pickled cache into this cache.  Servers already validated by this cache keep
+        their own files.
+        """
+        with self._lock:
+            for url, content in state['contents'].items():
+                if _origin(url) not in self._validated:
+                    self._contents.setdefault(url, content)
+            for origin in state['validated']:
+                if origin not in self._validated:
+                    self._versions[origin] = state['versions'].get(origin)
+                    self._validated.add(origin)
+
+    def _loading_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            try:
+                return self._loading_locks[key]
+            except KeyError:
+                self._loading_locks[key] = threading.Lock()
+                return self._loading_locks[key]
+
+    def _server_path(self, origin: str) -> str:
+        return os.path.join(self.path, _hash(origin)[:16])
+
+    def _version_path(self, origin: str, version: str) -> str:
+        return os.path.join(self._server_path(origin), re.sub(r'[^\w.-]', '_', version))
+
+    def _entry_path(self, url: str) -> str:
+        origin = _origin(url)
+        return os.path.join(self._version_path(origin, self.version(origin) or _PENDING_VERSION), _hash(url))
+
+    def add(self, url: str, content: bytes):
+        """
+        Method for adding a WSDL or XSD file to the cache.
+
+        :param url: The URL the file was loaded from, as a string.
+        :param content: The content of the file, as bytes.
+        """
+        self._contents[url] = content
+        entry_path = self._entry_path(url)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+        os.replace(temp_path, entry_path)
+
+    def get(self, url: str):
+        """
+        Method for retrieving a WSDL or XSD file from the cache.
+
+        :param url: The URL of the file, as a string.
+        :returns: The content of the file as bytes, or None if the file is not cached.
+        """
+        try:
+            return self._contents[url]
+        except KeyError:
+            pass
+        try:
+            with open(self._entry_path(url), 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        self._contents[url] = content
+        return content
+
+    def version(self, base_url: str):
+        """
+        Method for retrieving the memoQ API version the cached files of a server were stored for.
+
+        :param base_url: Base URL of the memoQ server, as a string.
+        :returns: The API version as a string, or None if nothing has been cached for the server yet.
+        """
+        origin = _origin(base_url)
+        try:
+            return self._versions[origin]
+        except KeyError:
+            pass
+        try:
+            with open(os.path.join(self._server_path(origin), _VERSION_FILE_NAME), encoding='utf-8') as f:
+                version = f.read().strip() or None
+        except OSError:
+            version = None
+        self._versions[origin] = version
+        return version
+
+    def load_document(self, url: str, transport) -> Document:
+        """
+        Method for retrieving the parsed definition of a service, parsing it (from the on-disk cache, if possible) on
+        first use.
+
+        :param url: URL of the WSDL of the service, as a string.
+        :param transport: The zeep transport used to load any files that are not already cached.
+        :returns: The parsed service definition, as a ``zeep.wsdl.Document``.
+        """
+        with self._lock:
+            try:
+                return self._documents[url]
+            except KeyError:
+                pass
+        with self._loading_lock(url):
+            with self._lock:
+                try:
+                    return self._documents[url]
+                except KeyError:
+                    pass
+            document = Document(url, transport)
+            with self._lock:
+                return self._documents.setdefault(url, document)
+
+    def ensure_validated(self, base_url: str, fetch_version):
+        """
+        Method for validating the cached files of a server against the memoQ API version the server reports.  This
+        only calls the server the first time it is called for a given server in the process.
+
+        :param base_url: Base URL of the memoQ server, as a string.
+        :param fetch_version: Callable taking no arguments, which returns the API version reported by the server.
+        :returns: True if the cached files were stale and have been discarded, False otherwise.
+        """
+        origin = _origin(base_url)
+        if origin in self._validated:
+            return False
+        with self._loading_lock(origin):
+            if origin in self._validated:
+                return False
+            return self.validate(base_url, fetch_version())
+
+    def validate(self, base_url: str, version: str) -> bool:
+        """
+        Method for validating the cached files of a server against a memoQ API version.  If the version differs from
+        the version the files were stored for, the stale files are discarded.
+
+        :param base_url: Base URL of the memoQ server, as a string.
+        :param version: The API version reported by the server, as a string.
+        :returns: True if the cached files were stale and have been discarded, False otherwise.
+        """
+        origin = _origin(base_url)
+        with self._lock:
+            current_version = self.version(origin)
+            stale = current_version is not None and current_version != version
+            if current_version != version:
+                version_path = self._version_path(origin, version)
+                shutil.rmtree(version_path, ignore_errors=True)
+                if current_version is None:
+                    # Anything stored before the version was known was fetched from the live server, so keep it.
+                    pending_path = self._version_path(origin, _PENDING_VERSION)
+                    if os.path.isdir(pending_path):
+                        os.replace(pending_path, version_path)
+                else:
+                    shutil.rmtree(self._version_path(origin, current_version), ignore_errors=True)
+                os.makedirs(self._server_path(origin), exist_ok=True)
+                with open(os.path.join(self._server_path(origin), _VERSION_FILE_NAME), 'w', encoding='utf-8') as f:
+                    f.write(version)
+                self._versions[origin] = version
+            if stale:
+                for url in [url for url in self._documents if _origin(url) == origin]:
+                    del self._documents[url]
+                for url in [url for url in self._contents if _origin(url) == origin]:
+                    del self._contents[url]
+            self._validated.add(origin)
+            return stale
+
+
+class CachePolicy(object):
+    """
+    Class describing how long a cached value may be used for.
+    """
+
+    def __init__(self, ttl: float = None, max_age: float = None, stale_while_revalidate: bool = False):
+        """
+        Initializer for the class.
+
+        :param ttl: Number of seconds a cached value is considered fresh for.  None means the value stays fresh until it
+            is invalidated (or reaches ``max_age``), and 0 disables caching altogether.
+        :param max_age: Maximum number of seconds a cached value may be used for, fresh or stale.  None means no limit.
+        :param stale_while_revalidate: Whether or not to keep returning a stale value while a fresh one is fetched in
+            the background, as a bool.  Stale values are never returned once they reach ``max_age``.
+        """
+        self.ttl = ttl
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(ttl={self.ttl!r}, max_age={self.max_age!r}, " \
+               f"stale_while_revalidate={self.stale_while_revalidate!r})"
+
+    def is_fresh(self, age: float) -> bool:
+        """
+        Method for checking whether a cached value can be used as is.
+
+        :param age: Age of the cached value in seconds.
+        :returns: True if the value is fresh, False otherwise.
+        """
+        return (self.ttl is None or age < self.ttl) and (self.max_age is None or age < self.max_age)
+
+    def is_usable_stale(self, age: float) -> bool:
+        """
+        Method for checking whether a cached value that is no longer fresh can still be returned while it is refreshed.
+
+        :param age: Age of the cached value in seconds.
+        :returns: True if the stale value can be returned, False otherwise.
+        """
+        return self.stale_while_revalidate and (self.max_age is None or age < self.max_age)
+
+
+class InventoryCache(object):
+    """
+    Class for caching the results of calls to a memoQ server, such as the list of TMs or users, with a per-key policy.
+
+    Concurrent requests for a key that is not cached share a single call to the server: the first request loads the
+    value, and the others wait for it and get the same result (or exception), whatever the policy of the key.
+
+    Any object providing the ``get()``, ``aget()`` and ``invalidate()`` methods of this class can be used in its place.
+
+    Pickling the cache only keeps its policies: the cached values are retrieved again by the process unpickling it.
+    """
+
+    def __init__(self, policies: dict = None, default_policy: CachePolicy = None):
+        """
+        Initializer for the class.
+
+        :param policies: Dict mapping keys (e.g. 'tms') to the CachePolicy to use for them.
+        :param default_policy: The CachePolicy used for keys not in ``policies``.  Defaults to no caching.
+        """
+        self.policies = dict(policies) if policies is not None else {}
+        self.default_policy = default_policy if default_policy is not None else CachePolicy(ttl=0)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        # Loads in progress, keyed by key (and by key and event loop for asyncio).
+        self._loading = {}
+        self._aloading = {}
+        # Bumped by invalidate(), so that loads started before then are not stored.
+        self._generation = 0
+        self._key_generations = {}
+        _inventory_caches.add(self)
+
+    def __getstate__(self) -> dict:
+        return {'policies': self.policies, 'default_policy': self.default_policy}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state['policies'], state['default_policy'])
+
+    def policy(self, key: str) -> CachePolicy:
+        """
+        Method for getting the policy for a key.
+
+        :param key: The key, as a string.
+        :returns: The CachePolicy for the key.
+        """
+        return self.policies.get(key, self.default_policy)
+
+    def _lookup(self, key: str):
+        """
+        Method for looking up a cached value.
+
+        :returns: A tuple of the cached value and its state: 'fresh', 'stale' (the caller should refresh it),
+            'refreshing' (stale, but already being refreshed) or None if there is no usable value.
+        """
+        policy = self.policy(key)
+        if policy.ttl == 0:
+            return None, None
+        with self._lock:
+            try:
+                value, loaded_at = self._entries[key]
+            except KeyError:
+                return None, None
+            age = time.monotonic() - loaded_at
+            if policy.is_fresh(age):
+                return value, 'fresh'
+            if policy.is_usable_stale(age) and key not in self._refreshing:
+                self._refreshing.add(key)
+                return value, 'stale'
+            if policy.is_usable_stale(age):
+                return value, 'refreshing'
+            return None, None
+
+    def _generation_of(self, key: str) -> tuple:
+        return self._generation, self._key_generations.get(key, 0)
+
+    def _store(self, key: str, value, generation: tuple):
+        if self.policy(key).ttl != 0:
+            with self._lock:
+                if generation == self._generation_of(key):
+                    self._entries[key] = (value, time.monotonic())
+        return value
+
+    def _refreshed(self, key: str):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def get(self, key: str, loader):
+        """
+        Method for getting a value from the cache, loading it if necessary.
+
+        :param key: The key of the value, as a string.
+        :param loader: Callable taking no arguments, which returns the value from the memoQ server.
+        :returns: The cached or freshly loaded value.
+        """
+        value, state = self._lookup(key)
+        if state == 'stale':
+            threading.Thread(target=self._refresh_in_background, args=(key, loader, self._generation_of(key)),
+                             daemon=True).start()
+        if state is not None:
+            return value
+        with self._lock:
+            future = self._loading.get(key)
+            if future is not None:
+                leader = False
+            else:
+                future = self._loading[key] = Future()
+                generation = self._generation_of(key)
+                leader = True
+        if not leader:
+            return future.result()
+        try:
+            value = self._store(key, loader(), generation)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+
+    def _refresh_in_background(self, key: str, loader, generation: tuple):
+        # Failures are only logged: the stale value keeps being served until the next refresh, or until it expires.
+        try:
+            self._store(key, loader(), generation)
+        except Exception:
+            logger.warning("Refreshing %r in the background failed", key, exc_info=True)
+        finally:
+            self._refreshed(key)
+
+    async def aget(self, key: str, loader):
+        """
+        Method for getting a value from the cache, loading it if necessary, for use with asyncio.
+
+        :param key: The key of the value, as a string.
+        :param loader: Callable taking no arguments, which returns an awaitable for the value from the memoQ server.
+        :returns: The cached or freshly loaded value.
+        """
+        import asyncio  # Only needed, and so only imported, when used from asyncio.
+        value, state = self._lookup(key)
+        if state == 'stale':
+            asyncio.ensure_future(self._arefresh_in_background(key, loader, self._generation_of(key)))
+        if state is not None:
+            return value
+        loading_key = (key, asyncio.get_event_loop())
+        with self._lock:
+            task = self._aloading.get(loading_key)
+            if task is None:
+                task = self._aloading[loading_key] = asyncio.ensure_future(
+                    self._aload(key, loader, self._generation_of(key), loading_key))
+        # Shielded, so that a cancelled caller does not cancel the load for the others.
+        return await asyncio.shield(task)
+
+    async def _aload(self, key: str, loader, generation: tuple, loading_key: tuple):
+        import asyncio
+        task = asyncio.current_task()
+        try:
+            return self._store(key, await loader(), generation)
+        finally:
+            with self._lock:
+                # Once invalidated, the load may have been replaced by a newer one, which must be left alone.
+                if self._aloading.get(loading_key) is task:
+                    del self._aloading[loading_key]
+
+    async def _arefresh_in_background(self, key: str, loader, generation: tuple):
+        try:
+            self._store(key, await loader(), generation)
+        except Exception:
+            logger.warning("Refreshing %r in the background failed", key, exc_info=True)
+        finally:
+            self._refreshed(key)
+
+    def invalidate(self, key: str = None):
+        """
+        Method for discarding cached values.  Loads in progress are not stored once they complete, and later requests
+        start new loads rather than waiting for them.
+
+        :param key: The key of the value to discard, as a string.  If not specified, every value is discarded.
+        """
+        with self._lock:
+            if key is None:
+                self._generation += 1
+                self._key_generations.clear()
+                self._entries.clear()
+                self._loading.clear()
+                self._aloading.clear()
+            else:
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+                self._entries.pop(key, None)
+                self._loading.pop(key, None)
+                for loading_key in [loading_key for loading_key in self._aloading if loading_key[0] == key]:
+                    del self._aloading[loading_key]
@@ -0,0 +1,175 @@
+"""
+Module for indexing which users of a memoQ server are members of which groups.
+
+The members of every group are retrieved concurrently, once, and kept in two hash maps (group to users and user to
+groups), so both "who is in this group" and "which groups is this user in" are answered without calling the server.
+Refreshing the index only retrieves the groups that need it.
+
+This code is released under the MIT License.
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from .projects import guid_key
+from .webservice import MemoQSecurityService
+
+
+DEFAULT_MEMBERSHIP_WORKERS = 8
+
+# Memberships that were added and removed by a refresh, as sets of (user GUID, group GUID) tuples.
+MembershipChanges = namedtuple('MembershipChanges', ['added', 'removed'])
+
+_EMPTY = frozenset()
+
+
+def _user_guids(users) -> frozenset:
+    return frozenset(guid_key(user.UserGuid) for user in users or ())
+
+
+class MembershipIndex(object):
+    """
+    Class that represents an index of the members of the groups on a memoQ server.
+
+    GUIDs can be passed in any case, and are returned as lower case strings.
+    """
+
+    def __init__(self, security_service: MemoQSecurityService):
+        """
+        Initializer for the class.
+
+        :param security_service: The MemoQSecurityService instance used to retrieve the members of the groups.
+        """
+        self._security_service = security_service
+        self.last_refresh = None
+        self._users_by_group = {}
+        self._groups_by_user = {}
+        self._refreshed_at = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(groups={len(self._users_by_group)}, users={len(self._groups_by_user)})"
+
+    def __contains__(self, group_guid) -> bool:
+        return guid_key(group_guid) in self._users_by_group
+
+    def __len__(self) -> int:
+        return len(self._users_by_group)
+
+    def users_of(self, group_guid) -> frozenset:
+        """
+        Method for retrieving the members of a group.
+
+        :param group_guid: The GUID of the group.
+        :returns: The GUIDs of the users in the group, as a frozenset.  Empty if the group is not in the index.
+        """
+        return self._users_by_group.get(guid_key(group_guid), _EMPTY)
+
+    def groups_of(self, user_guid) -> frozenset:
+        """
+        Method for retrieving the groups a user is a member of.
+
+        :param user_guid: The GUID of the user.
+        :returns: The GUIDs of the groups the user is in, as a frozenset.  Empty if the user is in no indexed group.
+        """
+        return self._groups_by_user.get(guid_key(user_guid), _EMPTY)
+
+    def is_member(self, user_guid, group_guid) -> bool:
+        """
+        Method for checking whether a user is a member of a group.
+
+        :param user_guid: The GUID of the user.
+        :param group_guid: The GUID of the group.
+        :returns: True if the user is in the group, False otherwise.
+        """
+        return guid_key(user_guid) in self.users_of(group_guid)
+
+    def refresh(self, groups: list, full: bool = False, max_age: float = None,
+                max_workers: int = DEFAULT_MEMBERSHIP_WORKERS) -> MembershipChanges:
+        """
+        Method for bringing the index up to date with the groups on the memoQ server.
+
+        Groups that are not in the index yet are retrieved, groups that are no longer on the server are dropped, and
+        the groups already in the index are only retrieved again if ``full`` is set or they are older than ``max_age``.
+
+        :param groups: The full list of groups on the server, as returned by ListGroups().
+        :param full: Whether to retrieve the members of every group again, as a bool.
+        :param max_age: Number of seconds after which the members of a group are retrieved again.  If not specified,
+            the members of a group are kept until the group is refreshed explicitly.
+        :param max_workers: Maximum number of groups to retrieve at the same time, as an int.
+        :returns: A MembershipChanges instance describing the memberships added and removed.
+        """
+        stale, removed_groups, now = self._outdated(groups, full, max_age)
+        return self._complete_refresh(self._fetch(stale, max_workers), removed_groups, now)
+
+    def refresh_groups(self, group_guids, max_workers: int = DEFAULT_MEMBERSHIP_WORKERS) -> MembershipChanges:
+        """
+        Method for retrieving the members of some groups again, e.g. after adding users to them.
+
+        :param group_guids: Iterable of the GUIDs of the groups to refresh.
+        :param max_workers: Maximum number of groups to retrieve at the same time, as an int.
+        :returns: A MembershipChanges instance describing the memberships added and removed.
+        """
+        return self._apply(self._fetch({guid_key(guid) for guid in group_guids}, max_workers), time.monotonic())
+
+    def _outdated(self, groups: list, full: bool, max_age: float) -> tuple:
+        """
+        Method for working out which groups a refresh has to retrieve.
+
+        :returns: A tuple of the GUIDs of the groups to retrieve, the GUIDs of the groups no longer on the server, and
+            the time of the refresh.
+        """
+        group_guids = {guid_key(group.GroupGuid) for group in groups}
+        now = time.monotonic()
+        with self._lock:
+            stale = [guid for guid in group_guids
+                     if full or guid not in self._refreshed_at or
+                     (max_age is not None and now - self._refreshed_at[guid] > max_age)]
+            removed_groups = [guid for guid in self._users_by_group if guid not in group_guids]
+        return stale, removed_groups, now
+
+    def _complete_refresh(self, members: dict, removed_groups: list, refreshed_at: float) -> MembershipChanges:
+        members.update((guid, _EMPTY) for guid in removed_groups)
+        changes = self._apply(members, refreshed_at, removed_groups)
+        self.last_refresh = datetime.now(timezone.utc)
+        return changes
+
+    def _fetch(self, group_guids, max_workers: int) -> dict:
+        """
+        Method for retrieving the members of groups from the memoQ server concurrently.
+
+        :returns: A dict mapping the GUID of each group to a frozenset of the GUIDs of its users.
+        """
+        group_guids = list(group_guids)
+        if not group_guids:
+            return {}
+
+        def users_of_group(group_guid: str) -> frozenset:
+            return _user_guids(self._security_service.ListUsersOfGroup(group_guid))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(group_guids)))) as executor:
+            return dict(zip(group_guids, executor.map(users_of_group, group_guids)))
+
+    def _apply(self, members: dict, refreshed_at: float, dropped=()) -> MembershipChanges:
+        added, removed = set(), set()
+        with self._lock:
+            for group_guid, user_guids in members.items():
+                previous = self._users_by_group.get(group_guid, _EMPTY)
+                for user_guid in user_guids - previous:
+                    self._groups_by_user[user_guid] = self._groups_by_user.get(user_guid, _EMPTY) | {group_guid}
+                    added.add((user_guid, group_guid))
+                for user_guid in previous - user_guids:
+                    groups = self._groups_by_user[user_guid] - {group_guid}
+                    if groups:
+                        self._groups_by_user[user_guid] = groups
+                    else:
+                        del self._groups_by_user[user_guid]
+                    removed.add((user_guid, group_guid))
+                self._users_by_group[group_guid] = user_guids
+                self._refreshed_at[group_guid] = refreshed_at
+            for group_guid in dropped:
+                self._users_by_group.pop(group_guid, None)
+                self._refreshed_at.pop(group_guid, None)
+        return MembershipChanges(added, removed)
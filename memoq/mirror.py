@@ -0,0 +1,290 @@
+"""
+Module for mirroring the inventory of a memoQ server into a local SQLite database.
+
+The projects, users, groups, TMs, TBs and light resources of a server are each stored in a table of their own, with one
+column per field of the response objects and indexes on the fields usually filtered on.  Refreshing the mirror only
+writes the rows that changed, and the projects are synced incrementally if the server syncs its projects (see
+``MemoQServer.sync_projects()``), in which case only the rows of the projects changed by the sync are written.  The
+database uses write-ahead logging, so any number of readers (in any number of processes) can query the mirror while it
+is being refreshed.
+
+This code is released under the MIT License.
+"""
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+from .server import DEFAULT_PREFETCH_WORKERS, MemoQServer
+from .util import _json_default, response_objects_to_dicts
+
+
+class _Collection(object):
+    """Class describing how a collection of the inventory is mirrored."""
+
+    __slots__ = ('name', 'key', 'indexes')
+
+    def __init__(self, name: str, key: str, indexes: tuple):
+        self.name = name
+        self.key = key
+        self.indexes = indexes
+
+
+COLLECTIONS = {collection.name: collection for collection in (
+    _Collection('projects', 'ServerProjectGuid', ('Name', 'Client', 'DocumentStatus', 'TimeClosed', 'LastChanged')),
+    _Collection('users', 'UserGuid', ('UserName', 'EmailAddress')),
+    _Collection('groups', 'GroupGuid', ('GroupName',)),
+    _Collection('tms', 'Guid', ('Name', 'Client', 'SourceLanguageCode', 'TargetLanguageCode')),
+    _Collection('tbs', 'Guid', ('Name', 'Client')),
+    _Collection('light_resources', 'Guid', ('ResourceType', 'Name')),
+)}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_value(value):
+    """
+    Function for converting a field of a response object into a value SQLite can store.  Aware datetimes are stored as
+    ISO 8601 strings in UTC so that they compare correctly as text.
+    """
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+class InventoryMirror(object):
+    """
+    Class that represents a local SQLite mirror of the inventory of a memoQ server.
+
+    A mirror opened without a server can only be queried, which is how readers in other processes should open it.
+
+    Refreshing the projects lists every project on the server, unless the server already syncs its projects (i.e.
+    ``sync_projects()`` has been called on it), in which case the mirror syncs them incrementally as well and only
+    writes the projects the sync changed.  If the projects were synced elsewhere since the previous refresh (e.g. by the
+    server itself, or by another mirror of the same server), or the sync was a full one, the rows are diffed against
+    every synced project instead.  The mirror never starts syncing the projects of a server on its own, since that
+    changes how the server retrieves them.
+    """
+
+    def __init__(self, path: str, memoq_server: MemoQServer = None):
+        """
+        Initializer for the class.
+
+        :param path: Path of the SQLite database file.  It is created if it does not exist.
+        :param memoq_server: The MemoQServer instance to mirror.  Required for refreshing the mirror.
+        """
+        self.path = path
+        self.memoq_server = memoq_server
+        self._lock = threading.RLock()
+        self._projects_synced_at = None
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS mirror_state "
+                                     "(collection TEXT PRIMARY KEY, refreshed_at TEXT, rows INTEGER)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.close()
+
+    def close(self):
+        """
+        Method for closing the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def columns(self, collection: str) -> tuple:
+        """
+        Method for retrieving the columns of the table of a collection.
+
+        :param collection: Name of the collection, as a string e.g. 'projects'
+        :returns: The names of the columns, as a tuple of strings.  Empty if the collection has never been mirrored.
+        """
+        if collection not in COLLECTIONS:
+            raise KeyError(f"Unrecognized collection.  Valid collections are: {', '.join(COLLECTIONS)}")
+        with self._lock:
+            return tuple(row['name'] for row in self._connection.execute(f"PRAGMA table_info({_quote(collection)})"))
+
+    def state(self) -> dict:
+        """
+        Method for retrieving when each collection was last refreshed.
+
+        :returns: A dict mapping the name of each mirrored collection to a dict with the time it was last refreshed (as
+            an ISO 8601 string) and its number of rows.
+        """
+        with self._lock:
+            return {row['collection']: {'refreshed_at': row['refreshed_at'], 'rows': row['rows']}
+                    for row in self._connection.execute("SELECT * FROM mirror_state")}
+
+    def query(self, sql: str, parameters=()) -> list:
+        """
+        Method for running a query against the mirror.
+
+        :param sql: The SQL statement, e.g. 'SELECT Client, COUNT(*) FROM projects GROUP BY Client'
+        :param parameters: The parameters of the statement, as a sequence or a dict.
+        :returns: A list of ``sqlite3.Row`` instances, which can be indexed by column name or position.
+        """
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def select(self, collection: str, where: dict = None, order_by: str = None, limit: int = None) -> list:
+        """
+        Method for retrieving the rows of a collection matching the given field values.
+
+        :param collection: Name of the collection, as a string e.g. 'projects'
+        :param where: Optional dict mapping field names to the values they must be equal to.
+        :param order_by: Optional name of the field to sort the rows by.
+        :param limit: Optional maximum number of rows to return, as an int.
+        :returns: A list of ``sqlite3.Row`` instances.
+        """
+        columns = self.columns(collection)
+        where = where or {}
+        for name in tuple(where) + ((order_by,) if order_by is not None else ()):
+            if name not in columns:
+                raise KeyError(f"Unrecognized field '{name}' for collection '{collection}'.")
+        sql = f"SELECT * FROM {_quote(collection)}"
+        if where:
+            sql += " WHERE " + " AND ".join(f"{_quote(name)} IS ?" for name in where)
+        if order_by is not None:
+            sql += f" ORDER BY {_quote(order_by)}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql, [_sql_value(value) for value in where.values()])
+
+    def count_by(self, collection: str, field: str) -> dict:
+        """
+        Method for counting the rows of a collection per value of a field.
+
+        :param collection: Name of the collection, as a string e.g. 'projects'
+        :param field: Name of the field to group the rows by, e.g. 'DocumentStatus'
+        :returns: A dict mapping each value of the field to its number of rows.
+        """
+        if field not in self.columns(collection):
+            raise KeyError(f"Unrecognized field '{field}' for collection '{collection}'.")
+        return dict(self.query(f"SELECT {_quote(field)}, COUNT(*) FROM {_quote(collection)} GROUP BY {_quote(field)}"))
+
+    def refresh(self, collections=None, max_workers: int = DEFAULT_PREFETCH_WORKERS) -> dict:
+        """
+        Method for bringing the mirror up to date with the memoQ server.
+
+        The collections are retrieved from the server concurrently, then each collection is written in a transaction of
+        its own.  Only the rows that were added, changed or removed are written.
+
+        :param collections: Iterable of the names of the collections to refresh e.g. ('projects', 'tms').  If not
+            specified, every collection is refreshed.
+        :param max_workers: Maximum number of collections to retrieve at the same time, as an int.
+        :returns: A dict mapping the name of each refreshed collection to a dict with its number of 'upserted' and
+            'deleted' rows.
+        """
+        if self.memoq_server is None:
+            raise RuntimeError("A mirror opened without a memoQ server cannot be refreshed.")
+        collections = tuple(collections) if collections is not None else tuple(COLLECTIONS)
+        for name in collections:
+            if name not in COLLECTIONS:
+                raise KeyError(f"Unrecognized collection '{name}'.  Valid collections are: {', '.join(COLLECTIONS)}")
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(collections)))) as executor:
+            fetched = list(executor.map(self._fetch, collections))
+        written = {}
+        for name, (records, removed, synced_at) in zip(collections, fetched):
+            written[name] = self._write(COLLECTIONS[name], records, removed)
+            if synced_at is not None:
+                self._projects_synced_at = synced_at
+        return written
+
+    def _fetch(self, name: str) -> tuple:
+        """
+        Method for retrieving a collection, or the changes to it, from the memoQ server.
+
+        :returns: A tuple of the records as a list of dicts, the keys of the removed records (None if the records are
+            the whole collection) and the time the projects were synced (None for other collections).
+        """
+        if name == 'projects':
+            if not self.memoq_server.syncs_projects:
+                return response_objects_to_dicts(self.memoq_server.refresh('all_projects')), None, None
+            store = self.memoq_server.project_store
+            last_sync = store.last_sync
+            changes = self.memoq_server.sync_projects()
+            if changes.full or last_sync is None or last_sync != self._projects_synced_at:
+                # The changes of syncs made since the previous refresh are not known, so every row is diffed.
+                return response_objects_to_dicts(store.projects), None, store.last_sync
+            return response_objects_to_dicts(changes.added + changes.updated), changes.removed, store.last_sync
+        if name == 'light_resources':
+            light_resources = self.memoq_server.light_resources
+            light_resources.invalidate()
+            records = []
+            for resource_type, resources in light_resources.prefetch():
+                for record in response_objects_to_dicts(resources):
+                    record['ResourceType'] = resource_type
+                    records.append(record)
+            return records, None, None
+        return response_objects_to_dicts(self.memoq_server.refresh(name)), None, None
+
+    def _ensure_table(self, collection: _Collection, records: list) -> tuple:
+        table = _quote(collection.name)
+        self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({_quote(collection.key)} TEXT PRIMARY KEY)")
+        columns = [row['name'] for row in self._connection.execute(f"PRAGMA table_info({table})")]
+        # Records of the same collection may not all have the same fields (e.g. light resources of different types).
+        names = {}
+        for record in records:
+            names.update(dict.fromkeys(record))
+        for name in names:
+            if name not in columns:
+                self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(name)}")
+                columns.append(name)
+        for name in collection.indexes:
+            if name in columns:
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'{collection.name}_{name}')} "
+                                         f"ON {table} ({_quote(name)})")
+        return tuple(columns)
+
+    def _write(self, collection: _Collection, records: list, removed: list = None) -> dict:
+        """
+        Method for writing the records of a collection to its table.
+
+        :param records: The records, as a list of dicts.
+        :param removed: The keys of the records to delete, or None if the records are the whole collection, in which
+            case the table is diffed against them and only the rows that changed are written.
+        :returns: A dict with the number of 'upserted' and 'deleted' rows.
+        """
+        with self._lock, self._connection:
+            table = _quote(collection.name)
+            columns = self._ensure_table(collection, records)
+            column_list = ', '.join(map(_quote, columns))
+            key_index = columns.index(collection.key)
+            rows = {}
+            for record in records:
+                row = tuple(_sql_value(record.get(name)) for name in columns)
+                rows[str(row[key_index])] = row
+            if removed is None:
+                existing = {str(row[key_index]): tuple(row)
+                            for row in self._connection.execute(f"SELECT {column_list} FROM {table}")}
+                upserts = [row for key, row in rows.items() if existing.get(key) != row]
+                deleted = [key for key in existing if key not in rows]
+            else:
+                upserts = list(rows.values())
+                deleted = [str(_sql_value(key)) for key in removed]
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {table} ({column_list}) "
+                f"VALUES ({', '.join('?' * len(columns))})", upserts)
+            deleted_count = self._connection.executemany(f"DELETE FROM {table} WHERE {_quote(collection.key)} = ?",
+                                                         [(key,) for key in deleted]).rowcount
+            count = self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            self._connection.execute("INSERT OR REPLACE INTO mirror_state VALUES (?, ?, ?)",
+                                     (collection.name, datetime.now(timezone.utc).isoformat(), count))
+        return {'upserted': len(upserts), 'deleted': max(deleted_count, 0)}
@@ -0,0 +1,258 @@
+"""
+Module for querying several memoQ servers at once.
+
+This code is released under the MIT License.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .server import MemoQServer
+from .transport import MemoQTransport
+
+
+DEFAULT_MAX_CONCURRENCY_PER_SERVER = 4
+
+
+class ServerResult(object):
+    """Class that represents the outcome of a query on a single memoQ server of a pool."""
+
+    __slots__ = ('base_url', 'value', 'error', 'seconds')
+
+    def __init__(self, base_url: str, value=None, error: Exception = None, seconds: float = None):
+        """
+        Initializer for the class.
+
+        :param base_url: Base URL of the memoQ server, as a string.
+        :param value: The value returned by the server, if the query succeeded.
+        :param error: The exception raised by the query, if it failed or timed out.
+        :param seconds: Number of seconds the query took, or None if it timed out.
+        """
+        self.base_url = base_url
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"seconds={self.seconds:.3f}"
+        return f"{self.__class__.__qualname__}(base_url='{self.base_url}', {outcome})"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class PoolResult(object):
+    """Class that represents the outcome of a query on every memoQ server of a pool."""
+
+    def __init__(self, results: dict):
+        """
+        Initializer for the class.
+
+        :param results: A dict mapping the base URL of each memoQ server to its ServerResult.
+        """
+        self.results = results
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({list(self.results.values())!r})"
+
+    @property
+    def complete(self) -> bool:
+        """
+        Method for checking whether every server answered the query.
+
+        :returns: True if the query succeeded on every server, False if the results are partial.
+        """
+        return all(result.ok for result in self.results.values())
+
+    @property
+    def values(self) -> dict:
+        """
+        Method for retrieving the values returned by the servers that answered the query.
+
+        :returns: A dict mapping the base URL of each server that answered to the value it returned.
+        """
+        return {base_url: result.value for base_url, result in self.results.items() if result.ok}
+
+    @property
+    def errors(self) -> dict:
+        """
+        Method for retrieving the errors of the servers that did not answer the query.
+
+        :returns: A dict mapping the base URL of each server that failed or timed out to the exception raised.
+        """
+        return {base_url: result.error for base_url, result in self.results.items() if not result.ok}
+
+    @property
+    def timings(self) -> dict:
+        """
+        Method for retrieving how long the query took on each server.
+
+        :returns: A dict mapping the base URL of each server to the number of seconds the query took on it, or None if
+            it timed out.
+        """
+        return {base_url: result.seconds for base_url, result in self.results.items()}
+
+    @property
+    def items(self) -> list:
+        """
+        Method for merging the lists returned by the servers that answered the query.
+
+        :returns: A list of (base URL, item) tuples, in the order of the servers of the pool.
+        """
+        return [(base_url, item) for base_url, value in self.values.items() for item in value or ()]
+
+
+class MemoQServerPool(object):
+    """
+    Class that represents a pool of memoQ servers, which are queried concurrently.
+
+    A query is run on every server at the same time, so it takes as long as the slowest server rather than the sum of
+    all of them.  Servers that fail or do not answer within the timeout are reported in the result alongside the
+    servers that did answer.  Each server has threads of its own, so a server that hangs only holds up its own
+    queries.
+    """
+
+    def __init__(self, servers, max_concurrency_per_server: int = DEFAULT_MAX_CONCURRENCY_PER_SERVER,
+                 timeout: float = None):
+        """
+        Initializer for the class.
+
+        :param servers: Iterable of the memoQ servers of the pool, as base URLs (e.g. 'http://localhost:8080') or as
+            MemoQServer instances.  Servers created by the pool from base URLs use a transport whose operations time
+            out after ``timeout`` seconds, so that calls the pool stops waiting for do not keep running.
+        :param max_concurrency_per_server: Maximum number of queries run on each server at the same time, as an int.
+        :param timeout: Default number of seconds to wait for the servers to answer a query, or None to wait for all of
+            them.
+        """
+        self.servers = {}
+        # Transports created by the pool, which are closed along with it, unlike the transports of servers passed in.
+        self._transports = []
+        for server in servers:
+            if not isinstance(server, MemoQServer):
+                transport = MemoQTransport(operation_timeout=timeout)
+                self._transports.append(transport)
+                server = MemoQServer(server, transport)
+            self.servers[server.base_url] = server
+        self.max_concurrency_per_server = max_concurrency_per_server
+        self.timeout = timeout
+        self._executors = {base_url: ThreadPoolExecutor(max_workers=max(1, max_concurrency_per_server))
+                           for base_url in self.servers}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({list(self.servers)!r})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.servers)
+
+    def close(self):
+        """
+        Method for stopping the pool and closing the transports it created.  Queries still running are waited on.  The
+        transports of the servers passed in as MemoQServer instances are left open.
+        """
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        for transport in self._transports:
+            transport.close()
+
+    def _call(self, server: MemoQServer, func) -> ServerResult:
+        started = time.perf_counter()
+        try:
+            value = func(server)
+        except Exception as e:
+            return ServerResult(server.base_url, error=e, seconds=time.perf_counter() - started)
+        return ServerResult(server.base_url, value=value, seconds=time.perf_counter() - started)
+
+    def map(self, func, timeout: float = None) -> PoolResult:
+        """
+        Method for running a query on every server of the pool concurrently.
+
+        :param func: Callable taking a MemoQServer instance, which runs the query on it.
+        :param timeout: Number of seconds to wait for the servers to answer.  Defaults to the timeout of the pool.
+            Servers that do not answer in time are reported with a TimeoutError.  Queries that had not started yet (as
+            the server was busy with earlier ones) are dropped, and queries already running are left to finish in the
+            background.
+        :returns: A PoolResult instance.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        futures = {base_url: self._executors[base_url].submit(self._call, server, func)
+                   for base_url, server in self.servers.items()}
+        wait(futures.values(), timeout=timeout)
+        results = {}
+        for base_url, future in futures.items():
+            if future.done():
+                results[base_url] = future.result()
+            else:
+                future.cancel()
+                results[base_url] = ServerResult(
+                    base_url, error=TimeoutError(f"{base_url} did not answer within {timeout} seconds"))
+        return PoolResult(results)
+
+    def query(self, name: str, timeout: float = None) -> PoolResult:
+        """
+        Method for retrieving a property of every server of the pool concurrently.
+
+        :param name: Name of the MemoQServer property to retrieve e.g. 'tms'
+        :param timeout: Number of seconds to wait for the servers to answer.  Defaults to the timeout of the pool.
+        :returns: A PoolResult instance.
+        """
+        return self.map(lambda server: getattr(server, name), timeout)
+
+    @property
+    def active_projects(self) -> PoolResult:
+        """
+        Method for retrieving the list of active projects on every server of the pool.
+
+        :returns: A PoolResult instance.
+        """
+        return self.query('active_projects')
+
+    @property
+    def all_projects(self) -> PoolResult:
+        """
+        Method for retrieving the list of all projects (both active and closed) on every server of the pool.
+
+        :returns: A PoolResult instance.
+        """
+        return self.query('all_projects')
+
+    @property
+    def groups(self) -> PoolResult:
+        """
+        Method for retrieving the list of groups on every server of the pool.
+
+        :returns: A PoolResult instance.
+        """
+        return self.query('groups')
+
+    @property
+    def tbs(self) -> PoolResult:
+        """
+        Method for retrieving the list of Term Bases (TBs) on every server of the pool.
+
+        :returns: A PoolResult instance.
+        """
+        return self.query('tbs')
+
+    @property
+    def tms(self) -> PoolResult:
+        """
+        Method for retrieving the list of Translation Memories (TMs) on every server of the pool.
+
+        :returns: A PoolResult instance.
+        """
+        return self.query('tms')
+
+    @property
+    def users(self) -> PoolResult:
+        """
+        Method for retrieving the list of users on every server of the pool.
+
+        :returns: A PoolResult instance.
+        """
+        return self.query('users')
@@ -0,0 +1,227 @@
+"""
+Module for indexing and keeping local copies of the projects on a memoQ server.
+
+This code is released under the MIT License.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+
+
+def guid_key(guid) -> str:
+    """
+    Function for normalising a GUID into the key it is looked up by, so that GUIDs given as UUIDs or as strings in any
+    case (memoQ returns them in lower case) match.
+
+    :param guid: The GUID, as a string or a UUID.
+    :returns: The GUID, as a lower case string.
+    """
+    return str(guid).lower()
+
+
+class ProjectIndex(object):
+    """
+    Class that represents an index of memoQ server projects, built once from the result of ListProjects().
+
+    Projects are kept sorted by the time they were (or will be) closed, so the active and closed projects can be split
+    with a binary search, and are hashed by GUID, name, client and document status for constant time lookups.
+    """
+
+    def __init__(self, projects: list):
+        """
+        Initializer for the class.
+
+        :param projects: The list of projects to index, as returned by ListProjects().
+        """
+        self.projects = projects
+        self._by_guid = {}
+        self._by_name = {}
+        self._by_client = {}
+        self._by_document_status = {}
+        decorated = []
+        for proj in projects:
+            self._by_guid[guid_key(proj.ServerProjectGuid)] = proj
+            self._by_name[proj.Name] = proj
+            self._by_client.setdefault(proj.Client, []).append(proj)
+            self._by_document_status.setdefault(proj.DocumentStatus, []).append(proj)
+            decorated.append((proj.TimeClosed.replace(tzinfo=timezone.utc), len(decorated), proj))
+        decorated.sort(key=lambda item: item[:2])
+        self._times_closed = [time_closed for time_closed, _, _ in decorated]
+        self._sorted_projects = [proj for _, _, proj in decorated]
+
+    def __contains__(self, guid) -> bool:
+        return guid_key(guid) in self._by_guid
+
+    def __iter__(self):
+        return iter(self.projects)
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    def active(self, now: datetime = None) -> list:
+        """
+        Method for retrieving the projects that are still active, i.e. that are closed after ``now``.
+
+        :param now: The point in time to split the projects at, as a datetime.  Defaults to the current time.
+        :returns: A list of active projects, ordered by the time they will be closed.
+        """
+        now = now if now is not None else datetime.now(timezone.utc)
+        return self._sorted_projects[bisect_right(self._times_closed, now):]
+
+    def closed(self, now: datetime = None) -> list:
+        """
+        Method for retrieving the projects that have been closed, i.e. that were closed before ``now``.
+
+        :param now: The point in time to split the projects at, as a datetime.  Defaults to the current time.
+        :returns: A list of closed projects, ordered by the time they were closed.
+        """
+        now = now if now is not None else datetime.now(timezone.utc)
+        return self._sorted_projects[:bisect_left(self._times_closed, now)]
+
+    def by_guid(self, guid):
+        """
+        Method for looking up a project by its GUID.
+
+        :param guid: The ServerProjectGuid of the project.
+        :returns: The project, or None if there is no project with the GUID.
+        """
+        return self._by_guid.get(guid_key(guid))
+
+    def by_name(self, name: str):
+        """
+        Method for looking up a project by its name.
+
+        :param name: The name of the project, as a string.
+        :returns: The project, or None if there is no project with the name.
+        """
+        return self._by_name.get(name)
+
+    def by_client(self, client: str) -> list:
+        """
+        Method for retrieving the projects of a client.
+
+        :param client: The name of the client, as a string.
+        :returns: A list of the projects of the client.
+        """
+        return list(self._by_client.get(client, ()))
+
+    def by_document_status(self, document_status: str) -> list:
+        """
+        Method for retrieving the projects with a given document status.
+
+        :param document_status: The document status, as a string e.g. 'TranslationInProgress'
+        :returns: A list of the projects with the document status.
+        """
+        return list(self._by_document_status.get(document_status, ()))
+
+    def client_counts(self) -> Counter:
+        """
+        Method for counting the projects of each client.
+
+        :returns: A Counter mapping each client to its number of projects.
+        """
+        return Counter({client: len(projects) for client, projects in self._by_client.items()})
+
+    def document_status_counts(self) -> Counter:
+        """
+        Method for counting the projects with each document status.
+
+        :returns: A Counter mapping each document status to its number of projects.
+        """
+        return Counter({status: len(projects) for status, projects in self._by_document_status.items()})
+
+
+ProjectChanges = namedtuple('ProjectChanges', ['added', 'updated', 'removed', 'full'])
+ProjectChanges.__doc__ = """Changes applied to a ProjectStore by a sync, as lists of projects (removed: of GUIDs)."""
+
+
+class ProjectStore(object):
+    """
+    Class that represents a local copy of the projects on a memoQ server, kept up to date incrementally.
+
+    Projects are keyed by their GUID.  A full sync replaces the contents of the store (which is how projects deleted on
+    the server are dropped), while an incremental sync only merges in the projects that changed since the previous sync.
+    """
+
+    def __init__(self):
+        """
+        Initializer for the class.
+        """
+        self.last_sync = None
+        self.last_full_sync = None
+        self._projects = {}
+        self._list = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    def __contains__(self, guid) -> bool:
+        return guid_key(guid) in self._projects
+
+    @property
+    def projects(self) -> list:
+        """
+        Method for retrieving the projects in the store.  A new list is returned every time the store changes, so the
+        list can be used as a snapshot.
+
+        :returns: A list of the projects in the store.
+        """
+        return self._list
+
+    def replace(self, projects: list, synced_at: datetime) -> ProjectChanges:
+        """
+        Method for replacing the contents of the store with the full list of projects on the server.
+
+        :param projects: The full list of projects, as returned by ListProjects().
+        :param synced_at: Time up to which the list is known to be complete, as an aware datetime.
+        :returns: A ProjectChanges instance describing the differences to the previous contents.
+        """
+        with self._lock:
+            previous = self._projects
+            self._projects = {guid_key(proj.ServerProjectGuid): proj for proj in projects}
+            added = [proj for key, proj in self._projects.items() if key not in previous]
+            updated = [proj for key, proj in self._projects.items() if key in previous and previous[key] != proj]
+            removed = [previous[key].ServerProjectGuid for key in previous if key not in self._projects]
+            self._list = list(self._projects.values())
+            self.last_sync = self.last_full_sync = synced_at
+            return ProjectChanges(added, updated, removed, True)
+
+    def merge(self, projects: list, synced_at: datetime) -> ProjectChanges:
+        """
+        Method for merging the projects that changed on the server into the store.
+
+        :param projects: The changed projects, as returned by ListProjects() with a LastChanged filter.
+        :param synced_at: Time up to which changes are known to be included, as an aware datetime.
+        :returns: A ProjectChanges instance describing the changes applied.
+        """
+        with self._lock:
+            added, updated = [], []
+            for proj in projects:
+                key = guid_key(proj.ServerProjectGuid)
+                previous = self._projects.get(key)
+                if previous is None:
+                    added.append(proj)
+                elif previous != proj:
+                    updated.append(proj)
+                else:
+                    continue
+                self._projects[key] = proj
+            if added or updated:
+                self._list = list(self._projects.values())
+            self.last_sync = synced_at
+            return ProjectChanges(added, updated, [], False)
+
+    def remove(self, guids) -> list:
+        """
+        Method for removing projects from the store, e.g. after deleting them on the server.
+
+        :param guids: Iterable of the GUIDs of the projects to remove.
+        :returns: A list of the GUIDs that were in the store.
+        """
+        with self._lock:
+            removed = [guid for guid in guids if self._projects.pop(guid_key(guid), None) is not None]
+            if removed:
+                self._list = list(self._projects.values())
+            return removed
@@ -0,0 +1,226 @@
+"""
+Module for decoding the raw SOAP responses of the memoQ Web Service API into compact records as they are received.
+
+zeep builds the whole response into an lxml tree, then materialises a typed object for every element of it, which for
+large list responses (e.g. ListProjects on a big server) takes most of the time and memory of a call.  The functions in
+this module instead parse the response incrementally with ``lxml.etree.iterparse``, decode each item of the result as
+soon as it has been received, using the XSD type of the item to convert its fields, and discard it from the parse tree.
+
+This code is released under the MIT License.
+"""
+import sys
+from collections import namedtuple
+
+from lxml import etree
+from zeep.xsd.types.complex import ComplexType
+from zeep.xsd.types.simple import AnySimpleType
+
+from .util import INTERNED_FIELD_SUFFIXES, record_field_names
+
+
+XSI_NIL = '{http://www.w3.org/2001/XMLSchema-instance}nil'
+
+
+def _localname(tag: str) -> str:
+    return tag.rpartition('}')[2]
+
+
+def _raw_value(element):
+    """
+    Function for decoding an element with no known XSD type.  Elements with children are decoded into a dict, whose
+    values are tuples for children sharing the same name; without a type, an array of one item cannot be told apart
+    from a single value.
+    """
+    if element.get(XSI_NIL) == 'true':
+        return None
+    if len(element) == 0:
+        return element.text or ''
+    values = {}
+    for child in element:
+        name = _localname(child.tag)
+        value = _raw_value(child)
+        if name in values:
+            previous = values[name]
+            values[name] = previous + (value,) if isinstance(previous, tuple) else (previous, value)
+        else:
+            values[name] = value
+    return values
+
+
+def _simple_parser(xsd_type):
+    pythonvalue = xsd_type.pythonvalue
+
+    def parse(element):
+        # As zeep does, an empty element has no value rather than e.g. an empty string.
+        text = element.text
+        return None if text is None else pythonvalue(text)
+    return parse
+
+
+def _complex_parser(xsd_type, converters: dict):
+    convert = _compile_type_converter(xsd_type, converters)
+
+    def parse(element):
+        # As zeep does, an empty element of a complex type (e.g. an ArrayOfstring of no items) has no value.
+        if len(element) == 0 and not element.attrib:
+            return None
+        return convert(element)
+    return parse
+
+
+def _element_parser(xsd_element, converters: dict):
+    if isinstance(xsd_element.type, AnySimpleType):
+        return _simple_parser(xsd_element.type)
+    if isinstance(xsd_element.type, ComplexType) and xsd_element.type.elements:
+        return _complex_parser(xsd_element.type, converters)
+    return _raw_value
+
+
+def _compile_type_converter(xsd_type, converters: dict, name: str = None):
+    """
+    Function for compiling a converter for elements of an XSD complex type into records, e.g. the items of a list
+    response or their nested values.
+
+    A namedtuple class with the fields of the type (named according to ``memoq.util.record_field_names()``) is
+    generated once.  Fields of simple types are converted by the type (e.g. into datetimes), and fields of complex types
+    into nested records.  Whether a field is an array is decided by the type (i.e. whether its element accepts multiple
+    occurrences) rather than by the number of items received, so that it is always a tuple, as in the records made from
+    zeep objects.  Values of fields whose names end with one of ``INTERNED_FIELD_SUFFIXES`` are interned.
+
+    :param xsd_type: The XSD type of the elements.
+    :param converters: Dict of the converters already compiled, by XSD type, shared by the nested types so that each
+        is compiled once (and recursive types can refer to themselves).
+    :param name: Optional name of the namedtuple class, as a string.  Defaults to the name of the type.
+    :returns: A function converting an element into a record.
+    """
+    try:
+        return converters[xsd_type]
+    except KeyError:
+        pass
+    elements = list(xsd_type.elements)
+    names = tuple(field for field, _ in elements)
+    make = namedtuple(name or xsd_type.name or 'Record', record_field_names(names))._make
+    positions = {field: index for index, field in enumerate(names)}
+    arrays = tuple(index for index, (_, element) in enumerate(elements) if element.accepts_multiple)
+    multiple = frozenset(arrays)
+    interned = frozenset(index for index, field in enumerate(names) if field.endswith(INTERNED_FIELD_SUFFIXES))
+    parsers = []
+
+    def convert(element) -> tuple:
+        values = [None] * len(names)
+        for index in arrays:
+            values[index] = []
+        for child in element:
+            index = positions.get(_localname(child.tag))
+            if index is None:
+                continue
+            value = None if child.get(XSI_NIL) == 'true' else parsers[index](child)
+            if index in interned and isinstance(value, str):
+                value = sys.intern(value)
+            if index in multiple:
+                values[index].append(value)
+            else:
+                values[index] = value
+        for index in arrays:
+            values[index] = tuple(values[index])
+        return make(values)
+    # Registered before the parsers of the fields are compiled, for types nested in themselves.
+    converters[xsd_type] = convert
+    parsers.extend(_element_parser(element, converters) for _, element in elements)
+    return convert
+
+
+def _compile_raw_converter(xsd_type, first_item, converters: dict = None):
+    """
+    Function for compiling a converter for the items of a list response into compact records.
+
+    :param xsd_type: The XSD type of the items, or None if it is not known.  Without a type, the fields of the record
+        are the children of the first item, and values are kept as strings.  Items of a simple type (e.g. the strings
+        of an ArrayOfstring) are converted into values rather than records.
+    :param first_item: The first item element of the response.
+    :param converters: Optional dict of the converters already compiled, by XSD type.
+    :returns: A function converting an item element into a record.
+    """
+    if isinstance(xsd_type, AnySimpleType):
+        return _simple_parser(xsd_type)
+    if xsd_type is not None:
+        return _compile_type_converter(xsd_type, {} if converters is None else converters,
+                                       getattr(xsd_type, 'name', None) or _localname(first_item.tag))
+    # Children repeated in the first item make a single field, holding the last of them.
+    names = tuple(dict.fromkeys(_localname(child.tag) for child in first_item))
+    make = namedtuple(_localname(first_item.tag), record_field_names(names))._make
+    positions = {name: index for index, name in enumerate(names)}
+    interned = frozenset(index for index, name in enumerate(names) if name.endswith(INTERNED_FIELD_SUFFIXES))
+
+    def convert(item) -> tuple:
+        values = [None] * len(names)
+        for child in item:
+            index = positions.get(_localname(child.tag))
+            if index is None:
+                continue
+            value = _raw_value(child)
+            if index in interned and isinstance(value, str):
+                value = sys.intern(value)
+            values[index] = value
+        return make(values)
+    return convert
+
+
+def result_item_types(binding_operation) -> dict:
+    """
+    Function for resolving the XSD types of the items of the result of an operation from its output message: the type
+    of the ``<...Result>`` element of the response, then the type of each of its item elements.
+
+    :param binding_operation: The zeep operation of a binding e.g. ``port.binding.get('ListProjects')``.
+    :returns: A dict mapping the qualified name of each item element (e.g. '{namespace}ServerProjectInfo') to its XSD
+        type.  The dict is empty if the result is not a list of elements.
+    """
+    body = getattr(binding_operation.output, 'body', None)
+    result_name = f'{binding_operation.name}Result'
+    for name, element in getattr(getattr(body, 'type', None), 'elements', ()):
+        if name == result_name:
+            return {(item.qname.text if item.qname is not None else item_name): item.type
+                    for item_name, item in getattr(element.type, 'elements', ())}
+    return {}
+
+
+def iter_result_records(stream, operation: str, item_types: dict = None):
+    """
+    Generator for decoding the items of the result of an operation incrementally from a raw SOAP response.
+
+    :param stream: File-like object of the SOAP response, as bytes e.g. the ``raw`` stream of a ``requests`` response.
+    :param operation: Name of the operation, as a string e.g. 'ListProjects'.  The items are the children of its
+        ``<ListProjectsResult>`` element.
+    :param item_types: Optional dict mapping the qualified name of each item element to its XSD type, as returned by
+        ``result_item_types()``.  Fields are converted according to the type (dates into datetimes, etc.); items whose
+        element is not in the dict keep their fields as strings.
+    :returns: A generator yielding each item of the result as a namedtuple (or as a value, for items of a simple type).
+    """
+    result_name = f'{operation}Result'
+    converters = {}
+    type_converters = {}
+    depth = None
+    for event, element in etree.iterparse(stream, events=('start', 'end'), resolve_entities=False, huge_tree=True):
+        if event == 'start':
+            if depth is not None:
+                depth += 1
+            elif _localname(element.tag) == result_name:
+                depth = 0
+            continue
+        if depth is None:
+            continue
+        if depth == 0:
+            break
+        depth -= 1
+        if depth > 0:
+            continue
+        try:
+            convert = converters[element.tag]
+        except KeyError:
+            xsd_type = item_types.get(element.tag) if item_types is not None else None
+            convert = converters[element.tag] = _compile_raw_converter(xsd_type, element, type_converters)
+        yield convert(element)
+        # Drop the item, and anything before it, from the tree so the tree stays small.
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
@@ -3,11 +3,31 @@ Module for wrapping around a memoQ server.
 
 This code is released under the MIT License.
 """
+import os
+import threading
+import weakref
 from collections.abc import Mapping
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-from .webservice import MemoQLightResourceService, MemoQLiveDocsService, MemoQTBService, MemoQTMService, \
-    MemoQSecurityService, MemoQServerProjectService
+from .cache import CachePolicy, InventoryCache
+from .membership import DEFAULT_MEMBERSHIP_WORKERS, MembershipChanges, MembershipIndex
+from .projects import ProjectChanges, ProjectIndex, ProjectStore
+from .tasks import TaskScheduler
+from .transport import MemoQTransport
+from .util import response_objects_to_records
+from .workload import DEFAULT_HARVEST_WORKERS, DEFAULT_STATISTICS_RESULT_FORMAT, WorkloadHarvest
+from .webservice import MemoQAsynchronousTasksService, MemoQLightResourceService, MemoQLiveDocsService, \
+    MemoQTBService, MemoQTMService, MemoQSecurityService, MemoQServerProjectService
+
+
+DEFAULT_PREFETCH_WORKERS = 8
+
+# An incremental project sync asks for the projects changed since a little before the previous sync, to allow for the
+# clocks of the client and the memoQ server not agreeing.  Merging a project twice is harmless.
+DEFAULT_SYNC_OVERLAP = 300.0
+# Projects deleted on the server are only noticed by a full sync, which sync_projects() falls back to once a day.
+DEFAULT_FULL_SYNC_INTERVAL = 24 * 60 * 60.0
 
 
 class LightResources(Mapping):
@@ -37,6 +57,7 @@ class LightResources(Mapping):
             "TMSettings",
             "WebSearchSettings"
         )
+        self._resources = {}
 
     def __getitem__(self, item: str) -> list:
         """
@@ -47,11 +68,16 @@ class LightResources(Mapping):
 
         https://docs.memoq.com/current/api-docs/wsapi/api/lightresourceservice/MemoQServices.ResourceType.html
 
+        If the resource type has been prefetched, the prefetched list is returned without calling the server.
+
         :param item: Light Resource to retrieve, as a str e.g. "ProjectTemplate"
         :returns: A list of Light Resources of the requested type.
         """
         if item in self._resource_types:
-            return self._light_resource_service.ListResources(item)
+            try:
+                return self._resources[item]
+            except KeyError:
+                return self._light_resource_service.ListResources(item)
         else:
             raise KeyError(
                 f"Unrecognized light resource type.  Valid resource types are: {', '.join(self._resource_types)}")
@@ -63,20 +89,135 @@ class LightResources(Mapping):
     def __len__(self):
         return len(self._resource_types)
 
+    def prefetch(self, resource_types=None, max_workers: int = DEFAULT_PREFETCH_WORKERS) -> 'LightResources':
+        """
+        Method for retrieving several types of light resources concurrently and keeping them for later lookups.
 
-class MemoQServer(object):
-    """Class that represents a memoQ server."""
+        :param resource_types: Iterable of the light resource types to retrieve e.g. ("ProjectTemplate", "QASettings").
+            If not specified, every light resource type is retrieved.
+        :param max_workers: Maximum number of light resource types to retrieve at the same time, as an int.
+        :returns: The LightResources instance, for chaining.
+        """
+        resource_types = self._checked_resource_types(resource_types)
+        if resource_types:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(resource_types))) as executor:
+                resources = executor.map(self._light_resource_service.ListResources, resource_types)
+                self._resources.update(zip(resource_types, resources))
+        return self
+
+    def _checked_resource_types(self, resource_types) -> tuple:
+        """
+        Method for checking the light resource types to prefetch.
+
+        :param resource_types: Iterable of light resource types, or None for every light resource type.
+        :returns: The light resource types, as a tuple.
+        """
+        resource_types = tuple(resource_types) if resource_types is not None else self._resource_types
+        for resource_type in resource_types:
+            if resource_type not in self._resource_types:
+                raise KeyError(f"Unrecognized light resource type '{resource_type}'.  Valid resource types are: "
+                               f"{', '.join(self._resource_types)}")
+        return resource_types
+
+    def invalidate(self, resource_type: str = None):
+        """
+        Method for discarding prefetched light resources, so that they are retrieved from the server on next lookup.
 
-    def __init__(self, base_url: str):
+        :param resource_type: The light resource type to discard, as a str.  If not specified, every prefetched light
+            resource type is discarded.
+        """
+        if resource_type is None:
+            self._resources.clear()
+        else:
+            self._resources.pop(resource_type, None)
+
+
+# By default, the list of projects and the API version are kept until they are invalidated, and everything else is
+# fetched from the server on every access.
+DEFAULT_CACHE_POLICIES = {
+    'all_projects': CachePolicy(ttl=None),
+    'api_version': CachePolicy(ttl=None),
+}
+
+
+# Every server in the process, so that their locks can be replaced in child processes after a fork.
+_servers = weakref.WeakSet()
+
+
+def _reinit_after_fork():
+    for server in list(_servers):
+        server._reinit_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+class MemoQServer(object):
+    """
+    Class that represents a memoQ server.
+
+    A server can be pickled, e.g. to send it to ``multiprocessing`` workers.  Only its base URL, transport, cache
+    policies and settings are pickled: its services are created again on first use, from the service definitions
+    carried over by the WSDL cache of the transport, and its cached lists are retrieved again.  Child processes forked
+    after calling ``prewarm()`` share the services, and the parsed service definitions, of the parent.
+    """
+
+    _transport_class = MemoQTransport
+    _asynchronous_tasks_service_class = MemoQAsynchronousTasksService
+    _light_resource_service_class = MemoQLightResourceService
+    _live_docs_service_class = MemoQLiveDocsService
+    _security_service_class = MemoQSecurityService
+    _server_project_service_class = MemoQServerProjectService
+    _tb_service_class = MemoQTBService
+    _tm_service_class = MemoQTMService
+    _light_resources_class = LightResources
+
+    def __init__(self, base_url: str, transport: MemoQTransport = None, cache: InventoryCache = None,
+                 compact: bool = False):
         """
         Initializer for the class.
 
         :param base_url: Base URL for the memoQ server.  For example, 'http://localhost:8080'
+        :param transport: Transport shared by all of the services used by the server.  If not specified, a new pooled
+            transport is created.
+        :param cache: Cache for the lists of projects, TMs, TBs, users, groups and corpora and for the API version.  If
+            not specified, an InventoryCache using ``DEFAULT_CACHE_POLICIES`` is created.
+        :param compact: Whether to return the lists of projects, TMs, TBs, users, groups and corpora as compact records
+            (see ``memoq.util.response_objects_to_records()``) rather than zeep objects, as a bool.  Records use a
+            fraction of the memory, which matters when keeping the inventory of a large server cached.
         """
         self.base_url = base_url
-        self._all_projects = None
+        self.transport = transport if transport is not None else self._transport_class()
+        self.cache = cache if cache is not None else InventoryCache(DEFAULT_CACHE_POLICIES)
+        self.compact = compact
         self._api_endpoints = {}
+        self._lock = threading.RLock()
         self._light_resources = None
+        self._membership_index = None
+        self._membership_lock = threading.Lock()
+        self._project_index = None
+        self._project_store = None
+        self._task_scheduler = None
+        _servers.add(self)
+
+    def __getstate__(self) -> dict:
+        return {'base_url': self.base_url, 'transport': self.transport, 'cache': self.cache, 'compact': self.compact}
+
+    def __setstate__(self, state: dict):
+        self.__init__(**state)
+
+    def _reinit_after_fork(self):
+        """
+        Method for replacing the locks of the server, and of the indexes it owns, in a child process after a fork.
+        The task scheduler is dropped, as its polling threads only exist in the parent process.
+        """
+        self._lock = threading.RLock()
+        self._membership_lock = threading.Lock()
+        self._task_scheduler = None
+        for owned in (self._project_store, self._membership_index):
+            if owned is not None:
+                owned._lock = threading.Lock()
 
     def __repr__(self) -> str:
         """
@@ -94,59 +235,227 @@ class MemoQServer(object):
         """
         return f"memoQ server v{self.api_version} @ {self.base_url}"
 
+    def stats(self) -> dict:
+        """
+        Method for retrieving the statistics recorded for the operations called on the memoQ server.  This requires the
+        transport of the server to have been created with an Instrumentation instance.
+
+        :returns: A dict mapping the name of each operation called (e.g. 'MemoQTMService.ListTMs') to a dict of its call
+            count, error count, latency histogram, request/response sizes and network/parse times.
+        """
+        instrumentation = getattr(self.transport, 'instrumentation', None)
+        return instrumentation.snapshot() if instrumentation is not None else {}
+
+    def _cached(self, key: str, loader):
+        """
+        Method for retrieving a value through the cache.
+
+        :param key: Name of the value, as a string e.g. 'tms'
+        :param loader: Callable taking no arguments, which retrieves the value from the memoQ server.
+        :returns: The cached or freshly retrieved value.
+        """
+        return self.cache.get(key, loader)
+
+    def _cached_list(self, key: str, loader):
+        """
+        Method for retrieving a list through the cache, converting it into compact records if the server is compact.
+
+        :param key: Name of the list, as a string e.g. 'tms'
+        :param loader: Callable taking no arguments, which retrieves the list from the memoQ server.
+        :returns: The cached or freshly retrieved list.
+        """
+        if not self.compact:
+            return self._cached(key, loader)
+        return self._cached(key, lambda: response_objects_to_records(loader()))
+
+    def invalidate(self, *names: str):
+        """
+        Method for discarding cached values, so that they are retrieved from the memoQ server on next access.
+
+        :param names: Names of the properties to discard e.g. 'tms', 'all_projects'.  If none are specified, every
+            cached value is discarded.
+        """
+        if not names:
+            self.cache.invalidate()
+        for name in names:
+            self.cache.invalidate(name)
+
+    def refresh(self, name: str):
+        """
+        Method for retrieving a fresh copy of a cached value from the memoQ server.
+
+        :param name: Name of the property to refresh e.g. 'tms', 'all_projects'
+        :returns: The freshly retrieved value.
+        """
+        self.invalidate(name)
+        return getattr(self, name)
+
     @property
-    def _light_resource_service(self):
-        light_resource_service_key = "_light_resource_service"
+    def project_store(self) -> ProjectStore:
+        """
+        Method for retrieving the local copy of the projects on the memoQ server kept up to date by sync_projects().
+
+        :returns: A ProjectStore instance.
+        """
+        if self._project_store is None:
+            with self._lock:
+                if self._project_store is None:
+                    self._project_store = ProjectStore()
+        return self._project_store
+
+    @property
+    def syncs_projects(self) -> bool:
+        """
+        Method for telling whether the projects on the memoQ server are synced, i.e. whether sync_projects() has been
+        called.  Unlike ``project_store``, this never creates the store.
+
+        :returns: True if the projects are synced, False otherwise.
+        """
+        return self._project_store is not None
+
+    def _project_list_filter(self, since: datetime = None) -> dict:
+        # https://docs.memoq.com/current/api-docs/wsapi/api/serverprojectservice/MemoQServices.ServerProjectListFilter.html  # noqa: E501
+        list_filter = {'TimeClosed': datetime(year=1900, month=1, day=1)}
+        if since is not None:
+            list_filter['LastChanged'] = since
+        return list_filter
+
+    def _sync_since(self, synced_at: datetime, full: bool, full_sync_interval: float, overlap: float):
+        store = self.project_store
+        if full or store.last_sync is None:
+            return None
+        if full_sync_interval is not None and synced_at - store.last_full_sync >= timedelta(seconds=full_sync_interval):
+            return None
+        return store.last_sync - timedelta(seconds=overlap)
+
+    def sync_projects(self, full: bool = False, full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+                      overlap: float = DEFAULT_SYNC_OVERLAP) -> ProjectChanges:
+        """
+        Method for bringing the local copy of the projects on the memoQ server up to date.
+
+        The first sync retrieves every project.  Later syncs only retrieve the projects changed since the previous sync
+        (including projects that were closed in the meantime), using the LastChanged field of the project list filter,
+        and merge them into ``project_store``.  Since deleted projects are not returned by the server, a full sync is
+        made every ``full_sync_interval`` seconds to drop them.  The ``all_projects``, ``active_projects``,
+        ``closed_projects`` and ``project_index`` properties are then served from the synced projects, and retrieving
+        them again (with ``refresh('all_projects')``, or once their cache policy expires) makes another sync rather
+        than retrieving every project.
+
+        :param full: Whether or not to retrieve every project regardless of the previous sync, as a bool.
+        :param full_sync_interval: Number of seconds after which a full sync is made instead of an incremental one, or
+            None to only make full syncs when asked to.
+        :param overlap: Number of seconds before the previous sync to ask for changes from, to allow for clock skew.
+        :returns: A ProjectChanges instance listing the projects added, updated and removed by the sync.
+        """
+        changes = self._sync_project_store(full, full_sync_interval, overlap)
+        self.cache.invalidate('all_projects')
+        self.cache.get('all_projects', lambda: self.project_store.projects)
+        return changes
+
+    def _sync_project_store(self, full: bool = False, full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+                            overlap: float = DEFAULT_SYNC_OVERLAP) -> ProjectChanges:
+        synced_at = datetime.now(timezone.utc)
+        since = self._sync_since(synced_at, full, full_sync_interval, overlap)
+        projects = self._server_project_service.ListProjects(self._project_list_filter(since))
+        return self._merge_projects(projects, since, synced_at)
+
+    def _synced_projects(self) -> list:
+        """
+        Method for retrieving the list of all projects once projects are synced, by syncing them.
+
+        :returns: The projects in ``project_store``, as a list.
+        """
+        self._sync_project_store()
+        return self.project_store.projects
+
+    def _merge_projects(self, projects: list, since: datetime, synced_at: datetime) -> ProjectChanges:
+        if self.compact:
+            projects = response_objects_to_records(projects)
+        if since is None:
+            return self.project_store.replace(projects, synced_at)
+        return self.project_store.merge(projects, synced_at)
+
+    def prewarm(self) -> 'MemoQServer':
+        """
+        Method for creating every service of the server and building its client ahead of first use.  Call this before
+        forking worker processes (e.g. before creating a ``multiprocessing`` pool with the 'fork' start method) so that
+        the workers share the parsed service definitions instead of each parsing them again.
+
+        :returns: The server itself.
+        """
+        for service in (self._asynchronous_tasks_service, self._light_resource_service, self._live_docs_service,
+                        self._security_service, self._server_project_service, self._tb_service, self._tm_service):
+            service.prewarm()
+        return self
+
+    def harvest_workload(self, projects=None, statistics_options: dict = None,
+                         statistics_result_format: str = DEFAULT_STATISTICS_RESULT_FORMAT,
+                         max_workers: int = DEFAULT_HARVEST_WORKERS) -> WorkloadHarvest:
+        """
+        Method for harvesting the translation documents, word counts and progress (and optionally the statistics) of
+        projects on the memoQ server concurrently e.g.
+
+            >>> harvest = memoq_server.harvest_workload()
+            >>> for workload in harvest:
+            ...     print(workload.project.Name, workload.word_count, workload.progress)
+            >>> harvest.totals.as_dict()
+
+        :param projects: Iterable of the projects to harvest.  If not specified, the active projects are harvested.
+        :param statistics_options: The options of the statistics to run on each project, as a dict of the fields of
+            StatisticsOptions e.g. {'Algorithm': 'MemoQ', 'ShowCounts': True, ...}.  If not specified, statistics are
+            not harvested.  Statistics tasks are waited on through the task scheduler of the server.
+        :param statistics_result_format: The format of the statistics, as a string e.g. 'CSV_MemoQ'
+        :param max_workers: Maximum number of projects harvested at the same time, as an int.
+        :returns: A WorkloadHarvest instance, which harvests the projects as it is iterated over, yielding a
+            ProjectWorkload instance per project as it completes, and keeps the running totals in its ``totals``.
+        """
+        return WorkloadHarvest(self, projects if projects is not None else self.active_projects, statistics_options,
+                               statistics_result_format, max_workers)
+
+    def _service(self, key: str, service_class):
+        """
+        Method for retrieving a service of the server, creating it on first use.  Services are created at most once,
+        even when several threads ask for them at the same time.
+
+        :param key: Name of the service, as a string e.g. '_tm_service'
+        :param service_class: The class of the service, called with the base URL and transport of the server.
+        :returns: The service.
+        """
         try:
-            return self._api_endpoints[light_resource_service_key]
+            return self._api_endpoints[key]
         except KeyError:
-            self._api_endpoints[light_resource_service_key] = MemoQLightResourceService(self.base_url)
-            return self._api_endpoints[light_resource_service_key]
+            with self._lock:
+                if key not in self._api_endpoints:
+                    self._api_endpoints[key] = service_class(self.base_url, self.transport)
+                return self._api_endpoints[key]
+
+    @property
+    def _asynchronous_tasks_service(self):
+        return self._service("_asynchronous_tasks_service", self._asynchronous_tasks_service_class)
+
+    @property
+    def _light_resource_service(self):
+        return self._service("_light_resource_service", self._light_resource_service_class)
 
     @property
     def _live_docs_service(self):
-        live_docs_service_key = "_live_docs_service"
-        try:
-            return self._api_endpoints[live_docs_service_key]
-        except KeyError:
-            self._api_endpoints[live_docs_service_key] = MemoQLiveDocsService(self.base_url)
-            return self._api_endpoints[live_docs_service_key]
+        return self._service("_live_docs_service", self._live_docs_service_class)
 
     @property
     def _security_service(self):
-        security_service_key = "_security_service"
-        try:
-            return self._api_endpoints[security_service_key]
-        except KeyError:
-            self._api_endpoints[security_service_key] = MemoQSecurityService(self.base_url)
-            return self._api_endpoints[security_service_key]
+        return self._service("_security_service", self._security_service_class)
 
     @property
     def _server_project_service(self):
-        server_project_service_key = "_server_project_service"
-        try:
-            return self._api_endpoints[server_project_service_key]
-        except KeyError:
-            self._api_endpoints[server_project_service_key] = MemoQServerProjectService(self.base_url)
-            return self._api_endpoints[server_project_service_key]
+        return self._service("_server_project_service", self._server_project_service_class)
 
     @property
     def _tb_service(self):
-        tb_service_key = "_tb_service"
-        try:
-            return self._api_endpoints[tb_service_key]
-        except KeyError:
-            self._api_endpoints[tb_service_key] = MemoQTBService(self.base_url)
-            return self._api_endpoints[tb_service_key]
+        return self._service("_tb_service", self._tb_service_class)
 
     @property
     def _tm_service(self):
-        tm_service_key = "_tm_service"
-        try:
-            return self._api_endpoints[tm_service_key]
-        except KeyError:
-            self._api_endpoints[tm_service_key] = MemoQTMService(self.base_url)
-            return self._api_endpoints[tm_service_key]
+        return self._service("_tm_service", self._tm_service_class)
 
     @property
     def active_projects(self) -> list:
@@ -155,9 +464,7 @@ class MemoQServer(object):
 
         :returns: A list of active projects on the memoQ server.
         """
-        return [proj
-                for proj in self.all_projects
-                if proj.TimeClosed.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)]
+        return self.project_index.active()
 
     @property
     def all_projects(self) -> list:
@@ -166,11 +473,12 @@ class MemoQServer(object):
 
         :returns: A list of all projects (both active and closed) on the memoQ server.
         """
+        if self.syncs_projects:
+            # Once projects are synced, the list is kept up to date by syncing rather than by listing every project.
+            return self._cached('all_projects', self._synced_projects)
         # https://docs.memoq.com/current/api-docs/wsapi/api/serverprojectservice/MemoQServices.ServerProjectListFilter.html#MemoQServices_SP_ServerProjectListFilter_TimeClosed
-        if self._all_projects is None:
-            self._all_projects = self._server_project_service.ListProjects(
-                {'TimeClosed': datetime(year=1900, month=1, day=1)})
-        return self._all_projects
+        return self._cached_list('all_projects', lambda: self._server_project_service.ListProjects(
+            self._project_list_filter()))
 
     @property
     def api_version(self) -> str:
@@ -179,7 +487,7 @@ class MemoQServer(object):
 
         :returns: The API version, as a string.
         """
-        return self._server_project_service.GetApiVersion()
+        return self._cached('api_version', lambda: self._server_project_service.GetApiVersion())
 
     @property
     def closed_projects(self) -> list:
@@ -188,9 +496,7 @@ class MemoQServer(object):
 
         :returns: A list of closed projects on the memoQ server.
         """
-        return [proj
-                for proj in self.all_projects
-                if proj.TimeClosed.replace(tzinfo=timezone.utc) < datetime.now(timezone.utc)]
+        return self.project_index.closed()
 
     @property
     def corpora(self) -> list:
@@ -199,7 +505,7 @@ class MemoQServer(object):
 
         :returns: A list of corpora published by the memoQ server.
         """
-        return self._live_docs_service.ListCorpora()
+        return self._cached_list('corpora', lambda: self._live_docs_service.ListCorpora())
 
     @property
     def groups(self) -> list:
@@ -208,7 +514,7 @@ class MemoQServer(object):
 
         :returns: A list of memoQ server groups.
         """
-        return self._security_service.ListGroups()
+        return self._cached_list('groups', lambda: self._security_service.ListGroups())
 
     @property
     def light_resources(self) -> LightResources:
@@ -218,9 +524,75 @@ class MemoQServer(object):
         :returns: A LightResources instance, suitable for running dict style lookups.
         """
         if self._light_resources is None:
-            self._light_resources = LightResources(self._light_resource_service)
+            with self._lock:
+                if self._light_resources is None:
+                    self._light_resources = self._light_resources_class(self._light_resource_service)
         return self._light_resources
 
+    @property
+    def membership_index(self) -> MembershipIndex:
+        """
+        Method for retrieving the index of the members of the groups on the memoQ server.  The members of every group
+        are retrieved the first time the index is used; use refresh_membership() to bring it up to date afterwards.
+
+        :returns: A MembershipIndex instance, whose ``users_of()`` and ``groups_of()`` methods take group and user
+            GUIDs.
+        """
+        if self._membership_index is None:
+            # Not self._lock, which would hold up the creation of other services while the groups are retrieved.
+            with self._membership_lock:
+                if self._membership_index is None:
+                    membership_index = MembershipIndex(self._security_service)
+                    membership_index.refresh(self.groups)
+                    self._membership_index = membership_index
+        return self._membership_index
+
+    def refresh_membership(self, full: bool = False, max_age: float = None,
+                           max_workers: int = DEFAULT_MEMBERSHIP_WORKERS) -> MembershipChanges:
+        """
+        Method for bringing the membership index up to date with the memoQ server.  The list of groups is retrieved
+        again, then only the members of new groups (and, if requested, of every group or of the groups last retrieved
+        more than ``max_age`` seconds ago) are retrieved.
+
+        :param full: Whether to retrieve the members of every group again, as a bool.
+        :param max_age: Number of seconds after which the members of a group are retrieved again.
+        :param max_workers: Maximum number of groups to retrieve at the same time, as an int.
+        :returns: A MembershipChanges instance, whose ``added`` and ``removed`` sets hold (user GUID, group GUID)
+            tuples.
+        """
+        membership_index = self.membership_index
+        return membership_index.refresh(self.refresh('groups'), full=full, max_age=max_age, max_workers=max_workers)
+
+    @property
+    def project_index(self) -> ProjectIndex:
+        """
+        Method for retrieving an index of all projects (both active and closed) on the memoQ server.  The index is
+        rebuilt whenever the list of projects is retrieved again.
+
+        :returns: A ProjectIndex instance, suitable for splitting projects into active and closed ones and for looking
+            up projects by GUID, name, client or document status.
+        """
+        return self._index_projects(self.all_projects)
+
+    def _index_projects(self, projects: list) -> ProjectIndex:
+        project_index = self._project_index
+        if project_index is None or project_index.projects is not projects:
+            project_index = self._project_index = ProjectIndex(projects)
+        return project_index
+
+    @property
+    def task_scheduler(self) -> TaskScheduler:
+        """
+        Method for retrieving the scheduler used for waiting on memoQ asynchronous tasks started on the memoQ server.
+
+        :returns: A TaskScheduler instance, whose ``submit()``, ``wait()`` and ``wait_async()`` methods take task IDs.
+        """
+        if self._task_scheduler is None:
+            with self._lock:
+                if self._task_scheduler is None:
+                    self._task_scheduler = TaskScheduler(self._asynchronous_tasks_service)
+        return self._task_scheduler
+
     @property
     def tbs(self) -> list:
         """
@@ -228,7 +600,7 @@ class MemoQServer(object):
 
         :returns: A list of all TBs on the memoQ server.
         """
-        return self._tb_service.ListTBs()
+        return self._cached_list('tbs', lambda: self._tb_service.ListTBs())
 
     @property
     def tms(self) -> list:
@@ -237,7 +609,7 @@ class MemoQServer(object):
 
         :returns: A list of all TMs on the memoQ server.
         """
-        return self._tm_service.ListTMs()
+        return self._cached_list('tms', lambda: self._tm_service.ListTMs())
 
     @property
     def users(self) -> list:
@@ -246,4 +618,4 @@ class MemoQServer(object):
 
         :returns: A list of memoQ server users.
         """
-        return self._security_service.ListUsers()
+        return self._cached_list('users', lambda: self._security_service.ListUsers())
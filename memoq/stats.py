@@ -0,0 +1,390 @@
+"""
+Module for instrumenting the calls made to the memoQ Web Service API.
+
+When an Instrumentation instance is attached to a transport (and enabled), every operation called through a service
+using that transport is recorded: call and error counts, a latency histogram, the size of the request and response,
+the time spent on the network, the time zeep spends processing the reply (parsing the XML and building the result) and
+the rest of the time spent locally (serialising the request, and the overhead of zeep and of the instrumentation).
+
+This code is released under the MIT License.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+
+
+# Upper bounds of the latency histogram buckets, in seconds.  The last bucket catches everything slower.
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, float('inf'))
+
+_current_call = ContextVar('memoq_current_call', default=None)
+# Held while timing the replies of bindings, which are shared by every client built from the same service definition.
+_bindings_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+# Every Instrumentation instance in the process, so that their locks can be replaced in child processes after a fork.
+_instrumentations = weakref.WeakSet()
+
+
+def _reinit_after_fork():
+    for instrumentation in list(_instrumentations):
+        instrumentation._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+class _Call(object):
+    """Class accumulating the network activity of a single operation call."""
+
+    __slots__ = ('network_seconds', 'parse_seconds', 'request_bytes', 'response_bytes')
+
+    def __init__(self):
+        self.network_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+def record_post(post, address, message, headers, stream: bool = False):
+    """
+    Function for timing an HTTP POST made by a transport, attributing it to the operation call in progress (if any).
+    Only the POST itself counts as time on the network.
+
+    :param post: Callable making the POST, taking the address, message and headers.
+    :param address: The URL to post to, as a string.
+    :param message: The body of the request, as bytes.
+    :param headers: The HTTP headers of the request, as a dict.
+    :param stream: Whether the body of the response is streamed, as a bool.  If so, it is not read here: pass the
+        stream through ``record_reads()`` to record the time and bytes it takes to read.
+    :returns: The response to the POST.
+    """
+    call = _current_call.get()
+    if call is None:
+        return post(address, message, headers)
+    started = time.perf_counter()
+    response = post(address, message, headers)
+    call.network_seconds += time.perf_counter() - started
+    call.request_bytes += len(message)
+    if not stream:
+        call.response_bytes += len(response.content)
+    return response
+
+
+class _TimedReader(object):
+    """Class for a file object recording the time and bytes it takes to read a stream as time on the network."""
+
+    __slots__ = ('_stream', '_call')
+
+    def __init__(self, stream, call: _Call):
+        self._stream = stream
+        self._call = call
+
+    def read(self, size: int = -1) -> bytes:
+        started = time.perf_counter()
+        data = self._stream.read(size)
+        self._call.network_seconds += time.perf_counter() - started
+        self._call.response_bytes += len(data)
+        return data
+
+
+def record_reads(stream):
+    """
+    Function for timing the reads from a streamed response, attributing them to the operation call in progress (if any)
+    as time on the network.
+
+    :param stream: The binary file object to read the response from.
+    :returns: A file object reading from ``stream``.
+    """
+    call = _current_call.get()
+    return stream if call is None else _TimedReader(stream, call)
+
+
+def record_parsing(items):
+    """
+    Generator for timing the parsing of the items of a streamed response, attributing it to the operation call in
+    progress (if any).  The time spent reading from the stream (see ``record_reads()``) is left out.
+
+    :param items: Iterable parsing the items from the stream, which may be a generator.
+    :returns: A generator yielding each item.
+    """
+    call = _current_call.get()
+    if call is None:
+        yield from items
+        return
+    items = iter(items)
+    while True:
+        started = time.perf_counter()
+        network_seconds = call.network_seconds
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        finally:
+            call.parse_seconds += time.perf_counter() - started - (call.network_seconds - network_seconds)
+        yield item
+
+
+async def record_post_async(post, address, message, headers):
+    """
+    Function for timing an HTTP POST made by an asyncio transport, attributing it to the operation call in progress.
+
+    :param post: Callable returning an awaitable for the POST, taking the address, message and headers.
+    :param address: The URL to post to, as a string.
+    :param message: The body of the request, as bytes.
+    :param headers: The HTTP headers of the request, as a dict.
+    :returns: The response to the POST.
+    """
+    call = _current_call.get()
+    if call is None:
+        return await post(address, message, headers)
+    started = time.perf_counter()
+    response = await post(address, message, headers)
+    call.network_seconds += time.perf_counter() - started
+    call.request_bytes += len(message)
+    call.response_bytes += len(response.content)
+    return response
+
+
+def time_reply_processing(bindings):
+    """
+    Function for timing how long zeep takes to process the replies received through some bindings, attributing the time
+    to the operation call in progress (if any).  Bindings already timed are left as they are.
+
+    :param bindings: Iterable of zeep bindings e.g. ``client.wsdl.bindings.values()``.
+    """
+    with _bindings_lock:
+        for binding in bindings:
+            process_reply = getattr(binding, 'process_reply', None)
+            if process_reply is None or getattr(process_reply, 'timed', False):
+                continue
+            binding.process_reply = _timed_process_reply(process_reply)
+
+
+def _timed_process_reply(process_reply):
+    def timed_process_reply(client, operation, response):
+        call = _current_call.get()
+        if call is None:
+            return process_reply(client, operation, response)
+        started = time.perf_counter()
+        try:
+            return process_reply(client, operation, response)
+        finally:
+            call.parse_seconds += time.perf_counter() - started
+    timed_process_reply.timed = True
+    return timed_process_reply
+
+
+class OperationStats(object):
+    """
+    Class holding the statistics recorded for a single operation.
+
+    ``parse_seconds`` is the time zeep spent processing the replies.  ``local_seconds`` is the rest of the time of the
+    calls, neither on the network nor parsing: serialising the requests, and the overhead of zeep and of the
+    instrumentation itself.
+    """
+
+    __slots__ = ('count', 'errors', 'total_seconds', 'min_seconds', 'max_seconds', 'network_seconds', 'parse_seconds',
+                 'local_seconds', 'request_bytes', 'response_bytes', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.min_seconds = None
+        self.max_seconds = None
+        self.network_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.local_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, record: dict):
+        """
+        Method for adding a call to the statistics.
+
+        :param record: The record of the call, as passed to the hook of an Instrumentation instance.
+        """
+        seconds = record['seconds']
+        self.count += 1
+        self.errors += record['error'] is not None
+        self.total_seconds += seconds
+        self.min_seconds = seconds if self.min_seconds is None else min(self.min_seconds, seconds)
+        self.max_seconds = seconds if self.max_seconds is None else max(self.max_seconds, seconds)
+        self.network_seconds += record['network_seconds']
+        self.parse_seconds += record['parse_seconds']
+        self.local_seconds += record['local_seconds']
+        self.request_bytes += record['request_bytes']
+        self.response_bytes += record['response_bytes']
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.histogram[index] += 1
+                break
+
+    def as_dict(self) -> dict:
+        """
+        Method for getting the statistics as a dict.
+
+        :returns: The statistics, as a dict.  The histogram maps the upper bound of each bucket in seconds to the number
+            of calls that fell into it.
+        """
+        result = {name: getattr(self, name) for name in self.__slots__ if name != 'histogram'}
+        result['mean_seconds'] = self.total_seconds / self.count if self.count else None
+        result['histogram'] = dict(zip(LATENCY_BUCKETS, self.histogram))
+        return result
+
+
+class Instrumentation(object):
+    """
+    Class for recording statistics about the operations called through the services sharing a transport.
+
+    Statistics are recorded per process: pickling an Instrumentation instance keeps its settings but not its statistics.
+    """
+
+    def __init__(self, enabled: bool = True, hook=None):
+        """
+        Initializer for the class.
+
+        :param enabled: Whether or not to record calls, as a bool.  This can be changed at any time.
+        :param hook: Optional callable, called with a dict describing each call once it has completed.  The dict has
+            the keys 'operation', 'seconds', 'network_seconds', 'parse_seconds', 'local_seconds', 'request_bytes',
+            'response_bytes' and 'error' (the exception raised by the call, or None).  'parse_seconds' is the time zeep
+            spent processing the reply, and 'local_seconds' the rest of the time of the call off the network.
+            Exceptions raised by the hook are logged, and do not change the result of the call.
+        """
+        self.enabled = enabled
+        self.hook = hook
+        self._lock = threading.Lock()
+        self._operations = {}
+        _instrumentations.add(self)
+
+    def __getstate__(self) -> dict:
+        return {'enabled': self.enabled, 'hook': self.hook}
+
+    def __setstate__(self, state: dict):
+        self.__init__(**state)
+
+    def _record(self, operation: str, seconds: float, call: _Call, error: Exception):
+        record = {
+            'operation': operation,
+            'seconds': seconds,
+            'network_seconds': call.network_seconds,
+            'parse_seconds': call.parse_seconds,
+            'local_seconds': max(seconds - call.network_seconds - call.parse_seconds, 0.0),
+            'request_bytes': call.request_bytes,
+            'response_bytes': call.response_bytes,
+            'error': error,
+        }
+        with self._lock:
+            try:
+                stats = self._operations[operation]
+            except KeyError:
+                stats = self._operations[operation] = OperationStats()
+            stats.add(record)
+        if self.hook is not None:
+            try:
+                self.hook(record)
+            except Exception:
+                logger.exception("Instrumentation hook failed for %s", operation)
+
+    def wrap(self, operation: str, func):
+        """
+        Method for wrapping an operation so that its calls are recorded.
+
+        :param operation: Name of the operation, as a string e.g. 'MemoQTMService.ListTMs'
+        :param func: The operation to wrap.
+        :returns: The wrapped operation.
+        """
+        def instrumented(*args, **kwargs):
+            call = _Call()
+            token = _current_call.set(call)
+            started = time.perf_counter()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                _current_call.reset(token)
+                self._record(operation, time.perf_counter() - started, call, error)
+        return instrumented
+
+    def wrap_async(self, operation: str, func):
+        """
+        Method for wrapping an asyncio operation so that its calls are recorded.
+
+        :param operation: Name of the operation, as a string e.g. 'MemoQTMService.ListTMs'
+        :param func: The operation to wrap, returning an awaitable.
+        :returns: The wrapped operation.
+        """
+        async def instrumented(*args, **kwargs):
+            call = _Call()
+            token = _current_call.set(call)
+            started = time.perf_counter()
+            error = None
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                _current_call.reset(token)
+                self._record(operation, time.perf_counter() - started, call, error)
+        return instrumented
+
+    def wrap_generator(self, operation: str, func):
+        """
+        Method for wrapping an operation returning a generator, e.g. a streamed raw call, so that its calls are
+        recorded.  A call lasts until the generator is exhausted or closed, and only the time spent in the generator
+        counts.
+
+        :param operation: Name of the operation, as a string e.g. 'MemoQServerProjectService.ListProjects'
+        :param func: The operation to wrap, returning a generator.
+        :returns: The wrapped operation.
+        """
+        def instrumented(*args, **kwargs):
+            call = _Call()
+            seconds = 0.0
+            error = None
+            items = func(*args, **kwargs)
+            try:
+                while True:
+                    token = _current_call.set(call)
+                    started = time.perf_counter()
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        return
+                    finally:
+                        seconds += time.perf_counter() - started
+                        _current_call.reset(token)
+                    yield item
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                items.close()
+                self._record(operation, seconds, call, error)
+        return instrumented
+
+    def snapshot(self) -> dict:
+        """
+        Method for getting the statistics recorded so far.
+
+        :returns: A dict mapping the name of each operation called to a dict of its statistics.
+        """
+        with self._lock:
+            return {operation: stats.as_dict() for operation, stats in sorted(self._operations.items())}
+
+    def reset(self):
+        """
+        Method for discarding the statistics recorded so far.
+        """
+        with self._lock:
+            self._operations.clear()
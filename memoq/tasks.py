@@ -0,0 +1,220 @@
+"""
+Module for waiting on memoQ asynchronous tasks.
+
+Long running operations, such as TM imports and exports, statistics and pretranslation, return a task ID which then
+has to be polled using the Asynchronous Tasks management API until the task finishes.  The TaskScheduler in this module
+tracks any number of tasks at once, polls them with exponential backoff and jitter under a global cap on the number of
+requests per second, and exposes each task as a future.
+
+This code is released under the MIT License.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .webservice import MemoQAsynchronousTasksService
+
+
+# https://docs.memoq.com/current/api-docs/wsapi/api/tasksservice/MemoQServices.TaskStatus.html
+TASK_STATUS_COMPLETED = 'Completed'
+TASK_STATUSES_FAILED = ('Cancelled', 'Failed', 'InvalidTask')
+
+DEFAULT_MAX_REQUESTS_PER_SECOND = 10.0
+
+
+class TaskFailedError(Exception):
+    """Exception raised when a memoQ asynchronous task does not complete successfully."""
+
+    def __init__(self, task_id: str, status: str, result=None):
+        """
+        Initializer for the class.
+
+        :param task_id: The ID of the task, as a string.
+        :param status: The final status of the task, as a string e.g. 'Failed'
+        :param result: The result of the task as returned by GetTaskResult(), if any.
+        """
+        super().__init__(f"Task {task_id} finished with status {status}")
+        self.task_id = task_id
+        self.status = status
+        self.result = result
+
+
+class TaskScheduler(object):
+    """
+    Class for waiting on many memoQ asynchronous tasks at once.
+
+    Every task starts out being polled every ``initial_interval`` seconds.  Each time a task is found to be still
+    running, the interval is multiplied by ``backoff`` (up to ``max_interval``) and randomised by ``jitter`` so that
+    tasks submitted together do not keep getting polled together.  Calls to the server are spread over a small pool of
+    threads, and are never started at more than ``max_requests_per_second``.
+    """
+
+    def __init__(self, tasks_service: MemoQAsynchronousTasksService,
+                 max_requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND, max_workers: int = 4,
+                 initial_interval: float = 0.5, max_interval: float = 30.0, backoff: float = 2.0, jitter: float = 0.2):
+        """
+        Initializer for the class.
+
+        :param tasks_service: The MemoQAsynchronousTasksService instance used to poll the tasks.
+        :param max_requests_per_second: Maximum number of calls to the server per second, across all tasks.
+        :param max_workers: Maximum number of calls to the server in flight at the same time, as an int.
+        :param initial_interval: Number of seconds to wait before polling a task for the first time.
+        :param max_interval: Maximum number of seconds to wait between two polls of a task.
+        :param backoff: Factor by which the interval between two polls of a task grows.
+        :param jitter: Maximum fraction by which each interval is randomly shortened or lengthened.
+        """
+        self._tasks_service = tasks_service
+        self.max_requests_per_second = max_requests_per_second
+        self.max_workers = max_workers
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self._condition = threading.Condition()
+        self._queue = []
+        self._unfinished = 0
+        self._sequence = itertools.count()
+        self._next_request_time = 0.0
+        self._executor = None
+        self._thread = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Method for getting the number of tasks being waited on, including those being polled at the moment.
+
+        :returns: The number of tasks whose futures are not done yet, as an int.
+        """
+        with self._condition:
+            return self._unfinished
+
+    def submit(self, task_id: str) -> Future:
+        """
+        Method for starting to wait on a task.
+
+        :param task_id: The ID of the task, as a string.
+        :returns: A ``concurrent.futures.Future`` which resolves to the result of the task as returned by
+            GetTaskResult() once the task completes, or raises a TaskFailedError if the task fails or is cancelled.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit a task to a TaskScheduler that has been closed.")
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._unfinished += 1
+            future.add_done_callback(self._task_done)
+            self._schedule(_Task(task_id, future, self.initial_interval), self.initial_interval)
+        return future
+
+    def wait(self, task_id: str, timeout: float = None):
+        """
+        Method for waiting on a task.
+
+        :param task_id: The ID of the task, as a string.
+        :param timeout: Maximum number of seconds to wait, or None to wait until the task finishes.
+        :returns: The result of the task as returned by GetTaskResult().
+        """
+        return self.submit(task_id).result(timeout)
+
+    async def wait_async(self, task_id: str):
+        """
+        Method for waiting on a task, for use with asyncio.
+
+        :param task_id: The ID of the task, as a string.
+        :returns: The result of the task as returned by GetTaskResult().
+        """
+        import asyncio  # Only needed, and so only imported, when used from asyncio.
+        return await asyncio.wrap_future(self.submit(task_id))
+
+    def close(self):
+        """
+        Method for stopping the scheduler.  Tasks still being waited on are cancelled (the tasks themselves keep running
+        on the server).
+        """
+        with self._condition:
+            self._closed = True
+            pending = [task.future for _, _, task in self._queue]
+            self._queue.clear()
+            self._condition.notify_all()
+        for future in pending:
+            future.cancel()
+        if self._thread is not None:
+            self._thread.join()
+            self._executor.shutdown(wait=True)
+
+    def _task_done(self, future: Future):
+        with self._condition:
+            self._unfinished -= 1
+
+    def _schedule(self, task: '_Task', delay: float):
+        if self._closed:
+            task.future.cancel()
+            return
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        heapq.heappush(self._queue, (time.monotonic() + delay, next(self._sequence), task))
+        self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    if self._queue:
+                        wait = max(self._queue[0][0], self._next_request_time) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                _, _, task = heapq.heappop(self._queue)
+                if task.future.cancelled():
+                    continue
+                self._next_request_time = time.monotonic() + 1.0 / self.max_requests_per_second
+            self._executor.submit(self._call, task)
+
+    def _call(self, task: '_Task'):
+        try:
+            if task.status is None:
+                status = self._tasks_service.GetTaskStatus(task.task_id).Status
+                with self._condition:
+                    if status == TASK_STATUS_COMPLETED or status in TASK_STATUSES_FAILED:
+                        task.status = status
+                        self._schedule(task, 0)
+                    else:
+                        task.interval = min(task.interval * self.backoff, self.max_interval)
+                        self._schedule(task, task.interval)
+            else:
+                result = self._tasks_service.GetTaskResult(task.task_id)
+                if task.status == TASK_STATUS_COMPLETED:
+                    task.future.set_result(result)
+                else:
+                    task.future.set_exception(TaskFailedError(task.task_id, task.status, result))
+        except Exception as e:
+            if not task.future.done():
+                task.future.set_exception(e)
+
+
+class _Task(object):
+    """Class holding the polling state of a task."""
+
+    __slots__ = ('task_id', 'future', 'interval', 'status')
+
+    def __init__(self, task_id: str, future: Future, interval: float):
+        self.task_id = task_id
+        self.future = future
+        self.interval = interval
+        # Set once the task has finished, at which point its result is fetched.
+        self.status = None
@@ -0,0 +1,390 @@
+"""
+Module for streaming the contents of term bases, such as the CSV and MultiTerm XML exports of a memoQ server.
+
+Exports are parsed incrementally as they are received, one chunk at a time, and imports are encoded one entry at a time
+as they are sent, so memory use does not grow with the size of the term base.
+
+This code is released under the MIT License.
+"""
+import codecs
+import csv
+import io
+from collections import deque
+
+from lxml import etree
+
+
+DEFAULT_CSV_ENCODING = 'utf-16'
+DEFAULT_CSV_DELIMITER = '\t'
+DEFAULT_MULTITERM_ENCODING = 'utf-16'
+_CSV_DELIMITERS = ('\t', ',', ';')
+# Number of entries encoded into each chunk of a CSV or MultiTerm XML import.
+_ENTRIES_PER_CHUNK = 1024
+
+
+class TermEntry(object):
+    """
+    Class that represents an entry (a row) of a term base exported as CSV.
+
+    The column names are shared by every entry of an export, so each entry only holds its own values.
+    """
+
+    __slots__ = ('columns', 'values')
+
+    def __init__(self, columns: tuple, values: tuple):
+        """
+        Initializer for the class.
+
+        :param columns: The names of the columns of the export e.g. ('Entry_ID', 'English', 'German'), as a tuple.
+        :param values: The values of the entry, in the same order as the columns, as a tuple of strings.
+        """
+        self.columns = columns
+        self.values = values
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self.as_dict()!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TermEntry):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __getitem__(self, column: str) -> str:
+        try:
+            return self.values[self.columns.index(column)]
+        except (ValueError, IndexError):
+            raise KeyError(column) from None
+
+    def get(self, column: str, default=None):
+        """
+        Method for retrieving the value of a column of the entry.
+
+        :param column: The name of the column, as a string e.g. 'Entry_ID'
+        :param default: Value returned if the entry has no such column.
+        :returns: The value of the column, as a string.
+        """
+        try:
+            return self[column]
+        except KeyError:
+            return default
+
+    def terms(self, language: str) -> list:
+        """
+        Method for retrieving the terms of the entry in a given language.
+
+        :param language: The name of the language column, as a string e.g. 'English'
+        :returns: A list of the non-empty values of every column with that name.
+        """
+        return [value for column, value in zip(self.columns, self.values) if column == language and value]
+
+    def as_dict(self) -> dict:
+        """
+        Method for getting the entry as a dict.
+
+        :returns: A dict mapping each column name to its value.  Repeated columns keep their last value.
+        """
+        return dict(zip(self.columns, self.values))
+
+
+class ConceptEntry(object):
+    """Class that represents a concept (``<conceptGrp>``) of a term base exported as MultiTerm XML."""
+
+    __slots__ = ('concept_id', 'descriptions', 'terms')
+
+    def __init__(self, concept_id: str, descriptions: list, terms: list):
+        """
+        Initializer for the class.
+
+        :param concept_id: The ID of the concept, as a string.
+        :param descriptions: The concept level descriptions, as a list of (type, text) tuples.
+        :param terms: The terms of the concept, as a list of (language, term) tuples.
+        """
+        self.concept_id = concept_id
+        self.descriptions = descriptions
+        self.terms = terms
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(concept_id={self.concept_id!r}, terms={self.terms!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ConceptEntry):
+            return NotImplemented
+        return (self.concept_id, self.descriptions, self.terms) == (other.concept_id, other.descriptions, other.terms)
+
+
+class _LineDecoder(object):
+    """
+    Class for decoding chunks of bytes into lines of text, detecting UTF-16 from its byte order mark and falling back
+    to UTF-8.  Lines are only split at line feeds and keep their line endings, as required by the csv module for quoted
+    fields spanning lines.
+    """
+
+    def __init__(self):
+        self._decoder = None
+        self._pending = ''
+        # Start of the data, held back until it is long enough to hold a byte order mark.
+        self._head = b''
+
+    def decode(self, chunk) -> list:
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) < 2:
+                return []
+            chunk, self._head = self._head, b''
+            encoding = 'utf-16' if chunk[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else 'utf-8-sig'
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+        lines = (self._pending + self._decoder.decode(chunk)).split('\n')
+        self._pending = lines.pop()
+        return [line + '\n' for line in lines]
+
+    def close(self) -> list:
+        if self._decoder is None and self._head:
+            self._pending = self._head.decode('utf-8-sig')
+        elif self._decoder is not None:
+            self._pending += self._decoder.decode(b'', final=True)
+        return [self._pending] if self._pending else []
+
+
+def _iter_text(chunks):
+    """
+    Generator for decoding chunks of bytes into lines of text.  See _LineDecoder.
+    """
+    decoder = _LineDecoder()
+    for chunk in chunks:
+        yield from decoder.decode(chunk)
+    yield from decoder.close()
+
+
+class _LineQueue(deque):
+    """
+    Class for a queue of lines which a csv.reader can read from as they are received.  Iterating over the queue stops
+    whenever it is empty, and resumes once more lines are added.
+    """
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return self.popleft()
+        except IndexError:
+            raise StopIteration from None
+
+
+class _TermEntryReader(object):
+    """
+    Class for parsing the entries of a CSV export from lines pushed as they are received, e.g. using asyncio.
+
+    A row is only parsed once all of its lines have been received, which is known from its quotes being balanced, so
+    the reader never sees the end of the lines received so far in the middle of a quoted field.
+    """
+
+    def __init__(self, delimiter: str = None):
+        self.delimiter = delimiter
+        self._lines = _LineQueue()
+        self._reader = None
+        self._columns = None
+        # Number of the queued lines which make up complete rows, and quotes in the lines of the incomplete row.
+        self._complete = 0
+        self._quotes = 0
+
+    def feed(self, lines, final: bool = False):
+        """
+        Generator for parsing the rows completed by more lines.
+
+        :param lines: Iterable of lines, as strings.
+        :param final: Whether these are the last lines, as a bool.
+        :returns: A generator yielding each entry completed by the lines as a TermEntry instance.
+        """
+        for line in lines:
+            self._lines.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                self._complete = len(self._lines)
+                self._quotes = 0
+        if final:
+            self._complete = len(self._lines)
+        while self._complete:
+            if self._reader is None:
+                if self.delimiter is None:
+                    self.delimiter = max(_CSV_DELIMITERS, key=self._lines[0].count)
+                self._reader = csv.reader(self._lines, delimiter=self.delimiter)
+            queued = len(self._lines)
+            row = next(self._reader, None)
+            self._complete = max(0, self._complete - (queued - len(self._lines)))
+            if row is None:
+                return
+            if self._columns is None:
+                self._columns = tuple(row)
+            elif row:
+                yield TermEntry(self._columns, tuple(row))
+
+
+def iter_term_entries(chunks, delimiter: str = None):
+    """
+    Generator for parsing the entries of a term base exported as CSV incrementally.
+
+    :param chunks: Iterable of the contents of the CSV export, as chunks of bytes.  Chunks are only read as the entries
+        they contain are needed.
+    :param delimiter: The delimiter of the CSV, as a string.  If not specified, it is detected from the header row.
+    :returns: A generator yielding each entry as a TermEntry instance.
+    """
+    lines = _iter_text(chunks)
+    header = next(lines, None)
+    if header is None:
+        return
+    if delimiter is None:
+        delimiter = max(_CSV_DELIMITERS, key=header.count)
+    reader = csv.reader(_chain_first(header, lines), delimiter=delimiter)
+    columns = tuple(next(reader))
+    for row in reader:
+        if row:
+            yield TermEntry(columns, tuple(row))
+
+
+async def aiter_term_entries(chunks, delimiter: str = None):
+    """
+    Asynchronous generator for parsing the entries of a term base exported as CSV incrementally, e.g. as it is received
+    using asyncio.
+
+    :param chunks: Asynchronous iterable of the contents of the CSV export, as chunks of bytes.
+    :param delimiter: The delimiter of the CSV, as a string.  If not specified, it is detected from the header row.
+    :returns: An asynchronous generator yielding each entry as a TermEntry instance.
+    """
+    decoder = _LineDecoder()
+    reader = _TermEntryReader(delimiter)
+    async for chunk in chunks:
+        for entry in reader.feed(decoder.decode(chunk)):
+            yield entry
+    for entry in reader.feed(decoder.close(), final=True):
+        yield entry
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+def encode_term_entries(entries, columns: tuple = None, encoding: str = DEFAULT_CSV_ENCODING,
+                        delimiter: str = DEFAULT_CSV_DELIMITER):
+    """
+    Generator for encoding term base entries as CSV, a batch of entries at a time.
+
+    :param entries: Iterable of TermEntry instances, or of dicts mapping column names to values.
+    :param columns: The columns to write, as a tuple of strings.  Defaults to the columns of the first entry.
+    :param encoding: The encoding of the CSV, as a string.  Defaults to UTF-16, which memoQ uses for its CSV exports.
+    :param delimiter: The delimiter of the CSV, as a string.
+    :returns: A generator yielding the CSV as chunks of bytes.
+    """
+    encoder = codecs.getincrementalencoder(encoding)()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\r\n')
+    count = 0
+    for entry in entries:
+        if isinstance(entry, TermEntry):
+            if columns is None:
+                columns = entry.columns
+            row = entry.values if entry.columns == columns else [entry.get(column, '') for column in columns]
+        else:
+            if columns is None:
+                columns = tuple(entry)
+            row = [entry.get(column, '') for column in columns]
+        if count == 0:
+            writer.writerow(columns)
+        writer.writerow(row)
+        count += 1
+        if count % _ENTRIES_PER_CHUNK == 0:
+            yield encoder.encode(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    if count == 0:
+        return
+    data = encoder.encode(buffer.getvalue(), final=True)
+    if data:
+        yield data
+
+
+def iter_concept_entries(chunks):
+    """
+    Generator for parsing the concepts of a term base exported as MultiTerm XML incrementally.
+
+    :param chunks: Iterable of the contents of the XML export, as chunks of bytes.  Chunks are only read as the
+        concepts they contain are needed.
+    :returns: A generator yielding each concept as a ConceptEntry instance.
+    """
+    parser = _concept_parser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _read_concepts(parser)
+    parser.close()
+
+
+async def aiter_concept_entries(chunks):
+    """
+    Asynchronous generator for parsing the concepts of a term base exported as MultiTerm XML incrementally, e.g. as it
+    is received using asyncio.
+
+    :param chunks: Asynchronous iterable of the contents of the XML export, as chunks of bytes.
+    :returns: An asynchronous generator yielding each concept as a ConceptEntry instance.
+    """
+    parser = _concept_parser()
+    async for chunk in chunks:
+        parser.feed(chunk)
+        for concept in _read_concepts(parser):
+            yield concept
+    parser.close()
+
+
+def _concept_parser():
+    return etree.XMLPullParser(events=('end',), tag='conceptGrp', resolve_entities=False, huge_tree=True)
+
+
+def _read_concepts(parser):
+    for _, concept in parser.read_events():
+        descriptions = [(descrip.get('type'), ''.join(descrip.itertext()))
+                        for descrip in concept.iterfind('descripGrp/descrip')]
+        terms = []
+        for language_group in concept.iterfind('languageGrp'):
+            language = language_group.find('language')
+            language = (language.get('lang') or language.get('type')) if language is not None else None
+            terms.extend((language, ''.join(term.itertext())) for term in language_group.iterfind('termGrp/term'))
+        yield ConceptEntry(concept.findtext('concept'), descriptions, terms)
+        # Drop the concept, and anything before it, from the tree so the tree stays small.
+        concept.clear()
+        while concept.getprevious() is not None:
+            del concept.getparent()[0]
+
+
+def _concept_element(entry: ConceptEntry):
+    concept = etree.Element('conceptGrp')
+    etree.SubElement(concept, 'concept').text = entry.concept_id
+    for description_type, text in entry.descriptions:
+        etree.SubElement(etree.SubElement(concept, 'descripGrp'), 'descrip', type=description_type).text = text
+    language_group = None
+    for language, term in entry.terms:
+        # Consecutive terms in the same language share a language group.
+        if language_group is None or language_group[0].get('lang') != language:
+            language_group = etree.SubElement(concept, 'languageGrp')
+            etree.SubElement(language_group, 'language', lang=language)
+        etree.SubElement(etree.SubElement(language_group, 'termGrp'), 'term').text = term
+    return concept
+
+
+def encode_concept_entries(entries, encoding: str = DEFAULT_MULTITERM_ENCODING):
+    """
+    Generator for encoding term base concepts as MultiTerm XML, a batch of concepts at a time.
+
+    :param entries: Iterable of ConceptEntry instances.
+    :param encoding: The encoding of the XML, as a string.  Defaults to UTF-16, which MultiTerm uses for its exports.
+    :returns: A generator yielding the XML as chunks of bytes.
+    """
+    encoder = codecs.getincrementalencoder(encoding)()
+    buffer = [f'<?xml version="1.0" encoding="{encoding.upper()}"?>\r\n<mtf>\r\n']
+    for count, entry in enumerate(entries, 1):
+        buffer.append(etree.tostring(_concept_element(entry), encoding='unicode'))
+        buffer.append('\r\n')
+        if count % _ENTRIES_PER_CHUNK == 0:
+            yield encoder.encode(''.join(buffer))
+            buffer.clear()
+    buffer.append('</mtf>\r\n')
+    yield encoder.encode(''.join(buffer), final=True)
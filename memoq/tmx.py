@@ -0,0 +1,157 @@
+"""
+Module for streaming the contents of TMX files, such as the translation memories exported by a memoQ server.
+
+The TMX is parsed incrementally as it is received, one chunk at a time, and every translation unit is discarded from the
+parse tree as soon as it has been yielded, so memory use does not grow with the size of the translation memory.
+
+This code is released under the MIT License.
+"""
+import json
+
+from lxml import etree
+
+
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+
+class TranslationUnit(object):
+    """Class that represents a translation unit (``<tu>``) of a TMX file."""
+
+    __slots__ = ('attributes', 'properties', 'variants')
+
+    def __init__(self, attributes: dict, properties: list, variants: list):
+        """
+        Initializer for the class.
+
+        :param attributes: The attributes of the ``<tu>`` element e.g. 'creationdate', 'changeid', as a dict.
+        :param properties: The ``<prop>`` elements of the unit, as a list of (type, value) tuples.
+        :param variants: The ``<tuv>`` elements of the unit, as a list of (language, segment) tuples.  Inline markup in
+            the segments is kept as XML.
+        """
+        self.attributes = attributes
+        self.properties = properties
+        self.variants = variants
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(variants={self.variants!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TranslationUnit):
+            return NotImplemented
+        return (self.attributes, self.properties, self.variants) == \
+            (other.attributes, other.properties, other.variants)
+
+    def segment(self, language: str):
+        """
+        Method for retrieving the segment of the unit in a given language.
+
+        :param language: The language code, as a string e.g. 'en-us'.  Matched case-insensitively.
+        :returns: The segment, as a string, or None if the unit has no variant in the language.
+        """
+        language = language.lower()
+        for variant_language, segment in self.variants:
+            if variant_language.lower() == language:
+                return segment
+        return None
+
+    def as_dict(self) -> dict:
+        """
+        Method for getting the translation unit as a dict.
+
+        :returns: The translation unit, as a dict with the keys 'attributes', 'properties' and 'variants'.
+        """
+        return {'attributes': self.attributes, 'properties': self.properties, 'variants': self.variants}
+
+
+def _segment(seg) -> str:
+    return (seg.text or '') + ''.join(etree.tostring(child, encoding='unicode') for child in seg)
+
+
+def _translation_unit(tu) -> TranslationUnit:
+    properties = []
+    variants = []
+    for child in tu:
+        if child.tag == 'prop':
+            properties.append((child.get('type'), child.text or ''))
+        elif child.tag == 'tuv':
+            seg = child.find('seg')
+            variants.append((child.get(XML_LANG) or child.get('lang'), _segment(seg) if seg is not None else ''))
+    return TranslationUnit(dict(tu.attrib), properties, variants)
+
+
+def iter_translation_units(chunks):
+    """
+    Generator for parsing the translation units of a TMX file incrementally.
+
+    :param chunks: Iterable of the contents of the TMX file, as chunks of bytes.  Chunks are only read as the
+        translation units they contain are needed.
+    :returns: A generator yielding each translation unit as a TranslationUnit instance.
+    """
+    parser = _translation_unit_parser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _read_translation_units(parser)
+    parser.close()
+
+
+async def aiter_translation_units(chunks):
+    """
+    Asynchronous generator for parsing the translation units of a TMX file incrementally, e.g. as it is received using
+    asyncio.
+
+    :param chunks: Asynchronous iterable of the contents of the TMX file, as chunks of bytes.
+    :returns: An asynchronous generator yielding each translation unit as a TranslationUnit instance.
+    """
+    parser = _translation_unit_parser()
+    async for chunk in chunks:
+        parser.feed(chunk)
+        for unit in _read_translation_units(parser):
+            yield unit
+    parser.close()
+
+
+def _translation_unit_parser():
+    return etree.XMLPullParser(events=('end',), tag='tu', resolve_entities=False, huge_tree=True)
+
+
+def _read_translation_units(parser):
+    for _, tu in parser.read_events():
+        yield _translation_unit(tu)
+        # Drop the unit, and anything before it, from the tree so the tree stays small.
+        tu.clear()
+        while tu.getprevious() is not None:
+            del tu.getparent()[0]
+
+
+def write_translation_units_json_lines(units, fp) -> int:
+    """
+    Function for writing translation units to a file as JSON Lines, one unit per line.
+
+    :param units: Iterable of TranslationUnit instances, which may be a generator.
+    :param fp: Text file object to write to.
+    :returns: The number of units written, as an int.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    count = 0
+    for unit in units:
+        fp.write(encoder.encode(unit.as_dict()))
+        fp.write('\n')
+        count += 1
+    return count
+
+
+async def awrite_translation_units_json_lines(units, fp) -> int:
+    """
+    Function for writing translation units received using asyncio to a file as JSON Lines, one unit per line.
+
+    :param units: Asynchronous iterable of TranslationUnit instances.
+    :param fp: Text file object to write to.
+    :returns: The number of units written, as an int.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    count = 0
+    async for unit in units:
+        fp.write(encoder.encode(unit.as_dict()))
+        fp.write('\n')
+        count += 1
+    return count
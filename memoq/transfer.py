@@ -0,0 +1,587 @@
+"""
+Module for the chunked transfer helpers used by the memoQ services.
+
+Several of the memoQ services move large payloads (files, TMX, term bases) in chunks using Begin/AddNext/End style
+operations.  The helpers in this module read those payloads in flat memory: files are memory-mapped and chunks are
+passed along as ``memoryview`` slices, other file objects are read into a small ring of reusable buffers, and the size
+of each chunk adapts to how quickly the previous chunks were transferred.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import io
+import logging
+import mmap
+import os
+import queue
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 512 * 1024
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+TARGET_CHUNK_SECONDS = 1.0
+
+_END = object()
+
+
+class AdaptiveChunkSize(object):
+    """
+    Class for picking the size of the next chunk to transfer.
+
+    The chunk size is adjusted after every chunk so that each chunk takes roughly ``target_seconds`` to transfer:
+    large enough that per-call overhead is negligible on a fast link, small enough to stay responsive on a slow one.
+    """
+
+    def __init__(self, initial: int = DEFAULT_CHUNK_SIZE, minimum: int = MIN_CHUNK_SIZE,
+                 maximum: int = MAX_CHUNK_SIZE, target_seconds: float = TARGET_CHUNK_SECONDS):
+        """
+        Initializer for the class.
+
+        :param initial: Size of the first chunk in bytes, as an int.
+        :param minimum: Minimum chunk size in bytes, as an int.
+        :param maximum: Maximum chunk size in bytes, as an int.
+        :param target_seconds: Time each chunk should take to transfer, in seconds.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.size = max(minimum, min(initial, maximum))
+
+    def update(self, num_bytes: int, seconds: float) -> int:
+        """
+        Method for recording how long a chunk took to transfer.
+
+        :param num_bytes: Number of bytes transferred, as an int.
+        :param seconds: Time taken to transfer the chunk, in seconds.
+        :returns: The size of the next chunk in bytes, as an int.
+        """
+        if num_bytes and seconds > 0:
+            ideal = num_bytes / seconds * self.target_seconds
+            # Never more than double or halve the chunk size in one step, to ride out the odd slow call.
+            ideal = max(self.size / 2, min(ideal, self.size * 2))
+            self.size = int(max(self.minimum, min(ideal, self.maximum))) // MIN_CHUNK_SIZE * MIN_CHUNK_SIZE or \
+                self.minimum
+        return self.size
+
+
+class _Source(object):
+    """Class wrapping a path or file object to read chunks from."""
+
+    def __init__(self, path_or_fileobj):
+        if isinstance(path_or_fileobj, (str, bytes, os.PathLike)):
+            self.fileobj = open(path_or_fileobj, 'rb')
+            self._close_fileobj = True
+        else:
+            self.fileobj = path_or_fileobj
+            self._close_fileobj = False
+        self.mmap = None
+        try:
+            start = self.fileobj.tell()
+            if os.fstat(self.fileobj.fileno()).st_size > start:
+                self.mmap = mmap.mmap(self.fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+                self.position = start
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            self.mmap = None
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+        if self._close_fileobj:
+            self.fileobj.close()
+
+
+def iter_chunks(path_or_fileobj, chunk_size: AdaptiveChunkSize, read_ahead: int = 0):
+    """
+    Generator for reading a file in chunks, without copying the file into memory.
+
+    Regular files are memory-mapped and yielded as ``memoryview`` slices of the mapping.  Other file objects are read
+    into a ring of reusable buffers.  Each yielded chunk is only valid until the next one is requested.
+
+    :param path_or_fileobj: Path of the file, or a binary file object, to read from.
+    :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.
+    :param read_ahead: Number of chunks to read ahead in a background thread while the current chunk is being sent,
+        as an int.  Defaults to 0, which reads each chunk on demand.
+    :returns: A generator yielding each chunk as a ``memoryview``.
+    """
+    source = _Source(path_or_fileobj)
+    try:
+        if source.mmap is not None:
+            chunks = _iter_mmap_chunks(source, chunk_size, read_ahead)
+        else:
+            chunks = _iter_buffered_chunks(source.fileobj, chunk_size, read_ahead)
+        yield from chunks
+    finally:
+        source.close()
+
+
+def _iter_mmap_chunks(source: _Source, chunk_size: AdaptiveChunkSize, read_ahead: int):
+    mapping = source.mmap
+    position = source.position
+    with memoryview(mapping) as view:
+        while position < len(mapping):
+            end = min(position + chunk_size.size, len(mapping))
+            start = end // mmap.PAGESIZE * mmap.PAGESIZE
+            if read_ahead and hasattr(mapping, 'madvise') and start < len(mapping):
+                # Ask the OS to start paging in the following chunks while this one is being sent.
+                mapping.madvise(mmap.MADV_WILLNEED, start, min(chunk_size.size * read_ahead, len(mapping) - start))
+            with view[position:end] as chunk:
+                yield chunk
+            position = end
+
+
+def _read_chunk(fileobj, buffers: list, index: int, size: int):
+    """
+    Function for reading a chunk into one of a ring of buffers.  Buffers are sized to the chunks read into them, and
+    only replaced by a larger one when the chunk size grows; chunks already yielded from the old buffer stay valid.
+
+    :returns: The chunk as a ``memoryview``, or None at the end of the file.
+    """
+    if len(buffers[index]) < size:
+        buffers[index] = bytearray(size)
+    buffer = memoryview(buffers[index])
+    num_bytes = fileobj.readinto(buffer[:size])
+    return buffer[:num_bytes] if num_bytes else None
+
+
+def _iter_buffered_chunks(fileobj, chunk_size: AdaptiveChunkSize, read_ahead: int):
+    # One buffer being sent, one being filled and up to read_ahead waiting in the queue.
+    buffers = [bytearray() for _ in range(read_ahead + 2 if read_ahead else 1)]
+    if not read_ahead:
+        while True:
+            chunk = _read_chunk(fileobj, buffers, 0, chunk_size.size)
+            if chunk is None:
+                return
+            yield chunk
+
+    filled = queue.Queue(maxsize=read_ahead)
+    stop = threading.Event()
+
+    def reader():
+        try:
+            index = 0
+            while not stop.is_set():
+                chunk = _read_chunk(fileobj, buffers, index % len(buffers), chunk_size.size)
+                if chunk is None:
+                    break
+                filled.put(chunk)
+                index += 1
+        except BaseException as e:
+            filled.put(e)
+        filled.put(_END)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = filled.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        while thread.is_alive():
+            try:
+                filled.get_nowait()
+            except queue.Empty:
+                thread.join(0.01)
+
+
+class _Sink(object):
+    """Class wrapping a path or file object to write chunks to."""
+
+    def __init__(self, path_or_fileobj, pipeline: bool):
+        if isinstance(path_or_fileobj, (str, bytes, os.PathLike)):
+            self.fileobj = open(path_or_fileobj, 'wb')
+            self._close_fileobj = True
+        else:
+            self.fileobj = path_or_fileobj
+            self._close_fileobj = False
+        self._queue = None
+        self._error = None
+        if pipeline:
+            self._queue = queue.Queue(maxsize=2)
+            self._thread = threading.Thread(target=self._writer, daemon=True)
+            self._thread.start()
+
+    def _writer(self):
+        while True:
+            data = self._queue.get()
+            if data is _END:
+                return
+            if self._error is None:
+                try:
+                    self.fileobj.write(data)
+                except BaseException as e:
+                    self._error = e
+
+    def write(self, data: bytes):
+        if self._error is not None:
+            raise self._error
+        if self._queue is not None:
+            self._queue.put(data)
+        else:
+            self.fileobj.write(data)
+
+    def close(self):
+        if self._queue is not None:
+            self._queue.put(_END)
+            self._thread.join()
+        if self._close_fileobj:
+            self.fileobj.close()
+        if self._error is not None:
+            raise self._error
+
+
+class TransferLimiter(object):
+    """
+    Class for capping the number of transfers running at the same time and the bandwidth they use between them.
+
+    A limiter is shared by the transfers it caps.  A transfer holds one of the limiter's slots while it runs (by using
+    the limiter as a context manager), and calls ``throttle()`` before sending each chunk.  Chunks are paced so that
+    all of the transfers together stay under ``max_bytes_per_second``.
+    """
+
+    def __init__(self, max_concurrency: int = None, max_bytes_per_second: float = None):
+        """
+        Initializer for the class.
+
+        :param max_concurrency: Maximum number of transfers running at the same time, as an int, or None for no cap.
+        :param max_bytes_per_second: Maximum number of bytes sent per second across all transfers, or None for no cap.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_bytes_per_second = max_bytes_per_second
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def __enter__(self):
+        if self._slots is not None:
+            self._slots.acquire()
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        if self._slots is not None:
+            self._slots.release()
+
+    def throttle(self, num_bytes: int):
+        """
+        Method for waiting until a chunk can be sent without going over the bandwidth cap.
+
+        :param num_bytes: Size of the chunk about to be sent, in bytes.
+        """
+        delay = self._reserve(num_bytes)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _reserve(self, num_bytes: int) -> float:
+        """
+        Method for reserving the bandwidth needed to send a chunk.
+
+        :param num_bytes: Size of the chunk about to be sent, in bytes.
+        :returns: Number of seconds to wait before sending the chunk, as a float.
+        """
+        if not self.max_bytes_per_second:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + num_bytes / self.max_bytes_per_second
+        return start - now
+
+
+class AsyncTransferLimiter(TransferLimiter):
+    """
+    Class for capping the number of transfers running at the same time and the bandwidth they use between them, for
+    transfers using asyncio.
+
+    A transfer holds one of the limiter's slots while it runs (by using the limiter as an asynchronous context manager),
+    and awaits ``athrottle()`` before sending each chunk.  A limiter is bound to the event loop it is first used on.
+    """
+
+    def __init__(self, max_concurrency: int = None, max_bytes_per_second: float = None):
+        """
+        Initializer for the class.
+
+        :param max_concurrency: Maximum number of transfers running at the same time, as an int, or None for no cap.
+        :param max_bytes_per_second: Maximum number of bytes sent per second across all transfers, or None for no cap.
+        """
+        super().__init__(None, max_bytes_per_second)
+        self.max_concurrency = max_concurrency
+
+    def __enter__(self):
+        raise TypeError(f"{self.__class__.__name__} must be used with 'async with'.")
+
+    async def __aenter__(self):
+        if self.max_concurrency:
+            # Created on first use, so that the semaphore belongs to the running event loop.
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_concurrency)
+            await self._slots.acquire()
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None):
+        if self._slots is not None:
+            self._slots.release()
+
+    async def athrottle(self, num_bytes: int):
+        """
+        Method for waiting, without blocking the event loop, until a chunk can be sent without going over the
+        bandwidth cap.
+
+        :param num_bytes: Size of the chunk about to be sent, in bytes.
+        """
+        delay = self._reserve(num_bytes)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class TransferReport(object):
+    """Class that represents the outcome of a chunked transfer."""
+
+    __slots__ = ('name', 'bytes', 'seconds', 'result')
+
+    def __init__(self, name: str, num_bytes: int, seconds: float, result=None):
+        """
+        Initializer for the class.
+
+        :param name: Name of what was transferred e.g. the GUID of a TM, as a string.
+        :param num_bytes: Number of bytes transferred, as an int.
+        :param seconds: Number of seconds the transfer took, including waiting on the server to finish it.
+        :param result: The value returned by the server once the transfer finished, if any.
+        """
+        self.name = name
+        self.bytes = num_bytes
+        self.seconds = seconds
+        self.result = result
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(name='{self.name}', bytes={self.bytes}, seconds={self.seconds:.3f})"
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    @property
+    def counts(self) -> dict:
+        """
+        Method for retrieving the counts reported by the server once the transfer finished, e.g. the number of
+        segments imported.
+
+        :returns: A dict mapping the name of each integer field of the result to its value.
+        """
+        values = getattr(self.result, '__values__', None) or {}
+        return {name: value for name, value in values.items()
+                if isinstance(value, int) and not isinstance(value, bool)}
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Class for reading from an iterable of chunks of bytes as from a binary file, e.g. to upload data as it is
+    generated.
+    """
+
+    def __init__(self, chunks):
+        """
+        Initializer for the class.
+
+        :param chunks: Iterable of chunks, as bytes.
+        """
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._chunk = b''
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._position >= len(self._chunk):
+            self._chunk = next(self._chunks, None)
+            self._position = 0
+            if self._chunk is None:
+                self._chunk = b''
+                return 0
+        num_bytes = min(len(buffer), len(self._chunk) - self._position)
+        buffer[:num_bytes] = self._chunk[self._position:self._position + num_bytes]
+        self._position += num_bytes
+        return num_bytes
+
+
+def upload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size: AdaptiveChunkSize = None,
+                  read_ahead: int = 0, abort=None, limiter: TransferLimiter = None):
+    """
+    Function for driving a Begin/AddNextChunk/End style chunked upload.
+
+    :param begin: Callable taking no arguments which starts the upload and returns the session id.
+    :param add_next_chunk: Callable taking the session id and a chunk, which sends the chunk.
+    :param end: Callable taking the session id which finishes the upload.  Its return value is returned.  It is only
+        called once every chunk has been sent, since ending an import commits what the server has received so far.
+    :param path_or_fileobj: Path of the file, or a binary file object, to upload.
+    :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+    :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+    :param abort: Optional callable taking the session id, called instead of ``end`` if the upload fails to clean up
+        after it.  Errors raised by it are logged, and the error which failed the upload is raised.
+    :param limiter: Optional TransferLimiter shared with other uploads, capping their concurrency and bandwidth.
+    :returns: A tuple of the session id and the return value of ``end``.
+    """
+    if limiter is not None:
+        with limiter:
+            return _upload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size, read_ahead, abort, limiter)
+    return _upload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size, read_ahead, abort, None)
+
+
+def _upload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size: AdaptiveChunkSize, read_ahead: int, abort,
+                   limiter: TransferLimiter):
+    chunk_size = chunk_size if chunk_size is not None else AdaptiveChunkSize()
+    session_id = begin()
+    try:
+        for chunk in iter_chunks(path_or_fileobj, chunk_size, read_ahead):
+            if limiter is not None:
+                limiter.throttle(len(chunk))
+            started = time.perf_counter()
+            add_next_chunk(session_id, chunk)
+            chunk_size.update(len(chunk), time.perf_counter() - started)
+    except BaseException:
+        if abort is not None:
+            try:
+                abort(session_id)
+            except Exception:
+                logger.warning("Aborting upload session %r failed", session_id, exc_info=True)
+        raise
+    return session_id, end(session_id)
+
+
+def iter_downloaded_chunks(get_next_chunk, chunk_size: AdaptiveChunkSize = None, total_size: int = None):
+    """
+    Generator for driving the GetNextChunk part of a chunked download.
+
+    :param get_next_chunk: Callable taking the number of bytes to request, which returns the next chunk as bytes, or an
+        empty value once the download is complete.
+    :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+    :param total_size: Total number of bytes to download, as an int, if known in advance.
+    :returns: A generator yielding each chunk as bytes.
+    """
+    chunk_size = chunk_size if chunk_size is not None else AdaptiveChunkSize()
+    received = 0
+    while total_size is None or received < total_size:
+        started = time.perf_counter()
+        chunk = get_next_chunk(chunk_size.size)
+        if not chunk:
+            return
+        chunk_size.update(len(chunk), time.perf_counter() - started)
+        received += len(chunk)
+        yield chunk
+
+
+def download_chunks(chunks, path_or_fileobj, pipeline: bool = False) -> int:
+    """
+    Function for writing downloaded chunks to a file.
+
+    :param chunks: Iterable of chunks, as bytes.
+    :param path_or_fileobj: Path of the file, or a binary file object, to write to.
+    :param pipeline: Whether to write to the file in a background thread while the next chunk is requested, as a bool.
+    :returns: The number of bytes written, as an int.
+    """
+    sink = _Sink(path_or_fileobj, pipeline)
+    written = 0
+    try:
+        for chunk in chunks:
+            sink.write(chunk)
+            written += len(chunk)
+    finally:
+        sink.close()
+    return written
+
+
+async def aupload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size: AdaptiveChunkSize = None,
+                         read_ahead: int = 0, abort=None, limiter: AsyncTransferLimiter = None):
+    """
+    Function for driving a Begin/AddNextChunk/End style chunked upload using asyncio.  Each chunk is only read once the
+    previous one has been sent, exactly as in ``upload_chunks()``.
+
+    :param begin: Callable taking no arguments which starts the upload, returning an awaitable for the session id.
+    :param add_next_chunk: Callable taking the session id and a chunk, returning an awaitable which sends the chunk.
+    :param end: Callable taking the session id, returning an awaitable which finishes the upload.  Its result is
+        returned.  It is only called once every chunk has been sent, as in ``upload_chunks()``.
+    :param path_or_fileobj: Path of the file, or a binary file object, to upload.
+    :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+    :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+    :param abort: Optional callable taking the session id and returning an awaitable, awaited instead of ``end`` if the
+        upload fails.  Errors raised by it are logged, and the error which failed the upload is raised.
+    :param limiter: Optional AsyncTransferLimiter shared with other uploads, capping their concurrency and bandwidth.
+    :returns: A tuple of the session id and the result of ``end``.
+    """
+    if limiter is not None:
+        async with limiter:
+            return await _aupload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size, read_ahead, abort,
+                                         limiter)
+    return await _aupload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size, read_ahead, abort, None)
+
+
+async def _aupload_chunks(begin, add_next_chunk, end, path_or_fileobj, chunk_size: AdaptiveChunkSize,
+                          read_ahead: int, abort, limiter: AsyncTransferLimiter):
+    chunk_size = chunk_size if chunk_size is not None else AdaptiveChunkSize()
+    session_id = await begin()
+    try:
+        for chunk in iter_chunks(path_or_fileobj, chunk_size, read_ahead):
+            if limiter is not None:
+                await limiter.athrottle(len(chunk))
+            started = time.perf_counter()
+            await add_next_chunk(session_id, chunk)
+            chunk_size.update(len(chunk), time.perf_counter() - started)
+    except BaseException:
+        if abort is not None:
+            try:
+                await abort(session_id)
+            except Exception:
+                logger.warning("Aborting upload session %r failed", session_id, exc_info=True)
+        raise
+    return session_id, await end(session_id)
+
+
+async def aiter_downloaded_chunks(get_next_chunk, chunk_size: AdaptiveChunkSize = None, total_size: int = None):
+    """
+    Asynchronous generator for driving the GetNextChunk part of a chunked download using asyncio.
+
+    :param get_next_chunk: Callable taking the number of bytes to request, returning an awaitable for the next chunk as
+        bytes, or for an empty value once the download is complete.
+    :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+    :param total_size: Total number of bytes to download, as an int, if known in advance.
+    :returns: An asynchronous generator yielding each chunk as bytes.
+    """
+    chunk_size = chunk_size if chunk_size is not None else AdaptiveChunkSize()
+    received = 0
+    while total_size is None or received < total_size:
+        started = time.perf_counter()
+        chunk = await get_next_chunk(chunk_size.size)
+        if not chunk:
+            return
+        chunk_size.update(len(chunk), time.perf_counter() - started)
+        received += len(chunk)
+        yield chunk
+
+
+async def adownload_chunks(chunks, path_or_fileobj, pipeline: bool = False) -> int:
+    """
+    Function for writing chunks downloaded using asyncio to a file.
+
+    :param chunks: Asynchronous iterable of chunks, as bytes.
+    :param path_or_fileobj: Path of the file, or a binary file object, to write to.
+    :param pipeline: Whether to write to the file in a background thread while the next chunk is requested, as a bool.
+    :returns: The number of bytes written, as an int.
+    """
+    sink = _Sink(path_or_fileobj, pipeline)
+    written = 0
+    try:
+        async for chunk in chunks:
+            sink.write(chunk)
+            written += len(chunk)
+    finally:
+        sink.close()
+    return written
@@ -0,0 +1,247 @@
+"""
+Module for the HTTP transport shared between the memoQ Web Service API services.
+
+Every memoQ service lives on the same host, so rather than having each service open its own connection pool, a single
+transport (and its underlying ``requests.Session``) can be created once and handed to every service that talks to the
+server.
+
+This code is released under the MIT License.
+"""
+import logging
+import os
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from zeep.transports import AsyncTransport, Transport
+
+from .cache import get_default_cache
+from .stats import Instrumentation, record_post, record_post_async
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+DEFAULT_POOL_SIZE = 10
+
+# Every transport in the process, so that their connection pools can be reset in child processes after a fork.
+_transports = weakref.WeakSet()
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE, keep_alive: bool = True, gzip: bool = True) -> requests.Session:
+    """
+    Function for creating a pooled ``requests.Session`` suitable for talking to a memoQ server.
+
+    :param pool_size: Maximum number of connections to keep open per host, as an int.
+    :param keep_alive: Whether or not to keep connections open between requests, as a bool.
+    :param gzip: Whether or not to ask the server for compressed responses, as a bool.
+    :returns: A configured ``requests.Session`` instance.
+    """
+    session = requests.Session()
+    _mount_adapter(session, pool_size)
+    session.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+    session.headers['Accept-Encoding'] = _accept_encoding(gzip)
+    return session
+
+
+def _accept_encoding(gzip: bool) -> str:
+    return 'gzip, deflate' if gzip else 'identity'
+
+
+def _mount_adapter(session: requests.Session, pool_size: int):
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def _reset_after_fork():
+    """
+    Function for giving every transport fresh connection pools in a child process after a fork.  The connections of
+    the parent are left to the parent rather than being shared, or closed, by the child.
+    """
+    for transport in list(_transports):
+        transport._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class MemoQTransport(Transport):
+    """
+    Class for a zeep transport backed by a pooled, keep-alive HTTP session.
+
+    A single instance of this class can be shared between any number of memoQ web services so that they all reuse the
+    same warm connections to the memoQ server.
+
+    The transport can be pickled, e.g. along with a service sent to a ``multiprocessing`` worker, in which case the
+    unpickled transport opens its own connections.  In child processes forked from a process using the transport, the
+    transport starts over with fresh connection pools.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, keep_alive: bool = True, gzip: bool = True, cache=None,
+                 timeout: int = 300, operation_timeout: int = None, instrumentation: Instrumentation = None):
+        """
+        Initializer for the class.
+
+        :param pool_size: Maximum number of connections to keep open per host, as an int.
+        :param keep_alive: Whether or not to keep connections open between requests, as a bool.
+        :param gzip: Whether or not to ask the server for compressed responses, as a bool.
+        :param cache: The zeep cache used for WSDL and XSD files.  Defaults to the
+            ``memoq.cache.WSDLCache`` shared by the process.
+        :param timeout: Timeout in seconds for loading WSDL and XSD files, as an int.
+        :param operation_timeout: Timeout in seconds for web service operations, as an int.  Defaults to no timeout.
+        :param instrumentation: Optional Instrumentation instance, recording the operations called through services
+            using this transport.
+        """
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.gzip = gzip
+        self.instrumentation = instrumentation
+        super().__init__(cache=cache if cache is not None else get_default_cache(),
+                         timeout=timeout,
+                         operation_timeout=operation_timeout,
+                         session=create_session(pool_size, keep_alive, gzip))
+        # The session is created (and therefore owned) by this transport.
+        self._close_session = True
+        _transports.add(self)
+
+    def __getstate__(self) -> dict:
+        return {'pool_size': self.pool_size, 'keep_alive': self.keep_alive, 'gzip': self.gzip, 'cache': self.cache,
+                'timeout': self.load_timeout, 'operation_timeout': self.operation_timeout,
+                'instrumentation': self.instrumentation}
+
+    def __setstate__(self, state: dict):
+        self.__init__(**state)
+
+    def _reset_after_fork(self):
+        _mount_adapter(self.session, self.pool_size)
+
+    def close(self):
+        """
+        Method for closing the underlying HTTP session and releasing any pooled connections.
+        """
+        self.session.close()
+
+    def post(self, address, message, headers):
+        """
+        Method for posting a request to the memoQ server, timing it if the operation being called is instrumented.
+        """
+        return record_post(super().post, address, message, headers)
+
+    def post_stream(self, address, message, headers) -> requests.Response:
+        """
+        Method for posting a request to the memoQ server without reading the body of the response, so that it can be
+        streamed e.g. by raw operations.  The POST is timed like those of ``post()``.
+
+        :param address: The URL to post to, as a string.
+        :param message: The body of the request, as bytes.
+        :param headers: The HTTP headers of the request, as a dict.
+        :returns: The response, whose body has to be read (or the response closed) to release the connection.
+        """
+        return record_post(self._post_stream, address, message, headers, stream=True)
+
+    def _post_stream(self, address, message, headers) -> requests.Response:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("HTTP Post to %s:\n%s", address, message.decode('utf-8'))
+        return self.session.post(address, data=message, headers=headers, timeout=self.operation_timeout, stream=True)
+
+
+class AsyncMemoQTransport(AsyncTransport):
+    """
+    Class for an asyncio zeep transport backed by a pooled, keep-alive ``httpx.AsyncClient``.
+
+    Note that, as with zeep's own ``AsyncTransport``, the WSDL and XSD files are still loaded synchronously.  Only the
+    web service operations are asynchronous.
+
+    As with MemoQTransport, the transport can be pickled, and the unpickled transport opens its own connections.  In
+    child processes forked from a process using the transport, the transport starts over with new HTTP clients, to be
+    used from the event loops of the child.
+
+    This requires the zeep async extras, which can be installed with ``pip install pymemoq[async]``.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, keep_alive: bool = True, gzip: bool = True, cache=None,
+                 timeout: int = 300, operation_timeout: int = None, instrumentation: Instrumentation = None):
+        """
+        Initializer for the class.
+
+        :param pool_size: Maximum number of connections to keep open to the server, as an int.
+        :param keep_alive: Whether or not to keep connections open between requests, as a bool.
+        :param gzip: Whether or not to ask the server for compressed responses, as a bool.
+        :param cache: The zeep cache used for WSDL and XSD files.  Defaults to the
+            ``memoq.cache.WSDLCache`` shared by the process.
+        :param timeout: Timeout in seconds for loading WSDL and XSD files, as an int.
+        :param operation_timeout: Timeout in seconds for web service operations, as an int.  Defaults to no timeout.
+        :param instrumentation: Optional Instrumentation instance, recording the operations called through services
+            using this transport.
+        """
+        if httpx is None:
+            raise RuntimeError("AsyncMemoQTransport requires httpx.  Install it with `pip install pymemoq[async]`.")
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.gzip = gzip
+        self.instrumentation = instrumentation
+        # zeep's AsyncTransport passes the timeouts on to the httpx clients without keeping them.
+        self.load_timeout = timeout
+        self.operation_timeout = operation_timeout
+        client, wsdl_client = self._create_clients()
+        super().__init__(client=client,
+                         wsdl_client=wsdl_client,
+                         cache=cache if cache is not None else get_default_cache(),
+                         timeout=timeout,
+                         operation_timeout=operation_timeout)
+        # zeep's AsyncTransport replaces the headers of the clients with its own.
+        self.client.headers['Accept-Encoding'] = self.wsdl_client.headers['Accept-Encoding'] = _accept_encoding(gzip)
+        _transports.add(self)
+
+    def __getstate__(self) -> dict:
+        return {'pool_size': self.pool_size, 'keep_alive': self.keep_alive, 'gzip': self.gzip, 'cache': self.cache,
+                'timeout': self.load_timeout, 'operation_timeout': self.operation_timeout,
+                'instrumentation': self.instrumentation}
+
+    def __setstate__(self, state: dict):
+        self.__init__(**state)
+
+    def _create_clients(self) -> tuple:
+        """
+        Method for creating the HTTP clients of the transport.  Their headers are set separately, as zeep replaces them.
+
+        :returns: The ``httpx.AsyncClient`` for the web service operations and the ``httpx.Client`` for loading WSDL
+            and XSD files, as a tuple.
+        """
+        limits = httpx.Limits(max_connections=self.pool_size,
+                              max_keepalive_connections=self.pool_size if self.keep_alive else 0)
+        return httpx.AsyncClient(limits=limits, timeout=self.operation_timeout), httpx.Client(timeout=self.load_timeout)
+
+    def _reset_after_fork(self):
+        # The connections of the clients belong to the parent, and the async client to the event loop of the parent.
+        client, wsdl_client = self._create_clients()
+        client.headers, wsdl_client.headers = self.client.headers, self.wsdl_client.headers
+        self.client, self.wsdl_client = client, wsdl_client
+
+    async def post(self, address, message, headers):
+        """
+        Method for posting a request to the memoQ server, timing it if the operation being called is instrumented.
+        """
+        return await record_post_async(super().post, address, message, headers)
+
+    def synchronous_transport(self) -> MemoQTransport:
+        """
+        Method for creating a synchronous transport with the same settings, cache and instrumentation as this one, for
+        services called from threads rather than from the event loop (e.g. the services polled by a TaskScheduler).
+
+        :returns: A new MemoQTransport instance, with connection pools of its own.
+        """
+        return MemoQTransport(pool_size=self.pool_size, keep_alive=self.keep_alive, gzip=self.gzip, cache=self.cache,
+                              timeout=self.load_timeout, operation_timeout=self.operation_timeout,
+                              instrumentation=self.instrumentation)
+
+    async def aclose(self):
+        """
+        Method for closing the underlying HTTP clients and releasing any pooled connections.
+        """
+        self.wsdl_client.close()
+        await self.client.aclose()
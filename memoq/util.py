@@ -3,7 +3,157 @@ Module for utility functions.
 
 This code is released under the MIT License.
 """
+import base64
+import json
+import keyword
+import re
+import sys
+import weakref
+from collections import namedtuple
+from datetime import date, datetime, time
+from decimal import Decimal
+
 from zeep.helpers import serialize_object
+from zeep.xsd.types.simple import AnySimpleType
+from zeep.xsd.valueobjects import CompoundValue
+
+
+# Compiled converters, keyed by zeep object class.  Every client builds its own classes, so the converters are dropped
+# along with the classes once a client is no longer used.
+_converters = weakref.WeakKeyDictionary()
+_record_converters = weakref.WeakKeyDictionary()
+
+# Fields whose values tend to repeat across the items of a list (e.g. the client of every project), and which are
+# therefore interned in compact records.
+INTERNED_FIELD_SUFFIXES = ('Client', 'Creator', 'Domain', 'LanguageCode', 'Project', 'Status', 'Subject', 'Type')
+
+
+def _compile_converter(o: CompoundValue):
+    """
+    Function for compiling a converter for the class of a zeep object into a dict.
+
+    The fields of the class are looked up once from its XSD type.  Fields of simple types are copied as is, and only
+    fields that may hold nested objects or lists are converted recursively.
+
+    :param o: An instance of the zeep object class, a subclass of ``zeep.xsd.valueobjects.CompoundValue``.
+    :returns: A function converting an instance of the class into a dict.
+    """
+    xsd_type = getattr(o, '_xsd_type', None)
+    if xsd_type is None:
+        return lambda o: {key: _serialize(value) for key, value in o.__values__.items()}
+    simple = _simple_fields(xsd_type)
+    nested = tuple(name for name in o.__values__ if name not in simple)
+    if not nested:
+        return lambda o: dict(o.__values__)
+
+    def convert(o: CompoundValue) -> dict:
+        result = dict(o.__values__)
+        for name in nested:
+            result[name] = _serialize(result[name])
+        return result
+    return convert
+
+
+def _simple_fields(xsd_type) -> set:
+    simple = {name for name, element in xsd_type.elements
+              if not element.accepts_multiple and isinstance(element.type, AnySimpleType)}
+    simple.update(name for name, _ in xsd_type.attributes)
+    return simple
+
+
+def record_field_names(names) -> tuple:
+    """
+    Function for mapping the names of the fields of a type onto the names of the fields of its records.
+
+    Names that are valid namedtuple field names are kept as they are.  Otherwise, characters that are not valid in
+    identifiers are replaced with underscores, leading underscores are dropped (e.g. the ``_value_1`` field zeep gives
+    to the content of a choice or of an ``xsd:any`` becomes ``value_1``) and keywords are followed by an underscore
+    (e.g. ``from`` becomes ``from_``).
+
+    :param names: Iterable of the names of the fields, as strings.
+    :returns: The names of the fields of the records, as a tuple of strings.
+    :raises ValueError: If a name cannot be mapped onto a valid field name, or two fields are mapped onto the same one.
+    """
+    mapped = []
+    for name in names:
+        field = re.sub(r'\W', '_', name).lstrip('_')
+        if keyword.iskeyword(field):
+            field += '_'
+        if not field.isidentifier():
+            raise ValueError(f"Field '{name}' cannot be mapped onto a record field.")
+        if field in mapped:
+            raise ValueError(f"Field '{name}' is mapped onto '{field}', which is the name of another field.")
+        mapped.append(field)
+    return tuple(mapped)
+
+
+def _compile_record_converter(o: CompoundValue):
+    """
+    Function for compiling a converter for the class of a zeep object into a compact record.
+
+    A namedtuple class with the fields of the zeep class (named according to ``record_field_names()``) is generated
+    once.  Values of fields whose names end with one of ``INTERNED_FIELD_SUFFIXES`` are interned, and fields that may
+    hold nested objects or lists are converted recursively (lists into tuples).
+
+    :param o: An instance of the zeep object class, a subclass of ``zeep.xsd.valueobjects.CompoundValue``.
+    :returns: A function converting an instance of the class into a record.
+    """
+    xsd_type = getattr(o, '_xsd_type', None)
+    names = tuple(o.__values__)
+    simple = _simple_fields(xsd_type) if xsd_type is not None else set()
+    record_class = namedtuple(getattr(xsd_type, 'name', None) or o.__class__.__name__, record_field_names(names))
+    make = record_class._make
+    interned = tuple(index for index, name in enumerate(names)
+                     if name in simple and name.endswith(INTERNED_FIELD_SUFFIXES))
+    nested = tuple(index for index, name in enumerate(names) if name not in simple)
+    if not interned and not nested:
+        return lambda o: make(o.__values__.values())
+
+    def convert(o: CompoundValue):
+        values = list(o.__values__.values())
+        for index in interned:
+            if values[index].__class__ is str:
+                values[index] = sys.intern(values[index])
+        for index in nested:
+            values[index] = _record(values[index])
+        return make(values)
+    return convert
+
+
+def _record(o):
+    if isinstance(o, CompoundValue):
+        try:
+            converter = _record_converters[o.__class__]
+        except KeyError:
+            converter = _record_converters[o.__class__] = _compile_record_converter(o)
+        return converter(o)
+    if isinstance(o, list):
+        return tuple(_record(item) for item in o)
+    return o
+
+
+def _is_record(o) -> bool:
+    return isinstance(o, tuple) and hasattr(o, '_fields')
+
+
+def _converter(o: CompoundValue):
+    try:
+        return _converters[o.__class__]
+    except KeyError:
+        _converters[o.__class__] = _compile_converter(o)
+        return _converters[o.__class__]
+
+
+def _serialize(o):
+    if isinstance(o, CompoundValue):
+        return _converter(o)(o)
+    if _is_record(o):
+        return {name: _serialize(value) for name, value in zip(o._fields, o)}
+    if isinstance(o, (list, tuple)):
+        return [_serialize(item) for item in o]
+    if isinstance(o, dict):
+        return {key: _serialize(value) for key, value in o.items()}
+    return o
 
 
 def response_object_to_dict(o: object) -> dict:
@@ -14,4 +164,110 @@ def response_object_to_dict(o: object) -> dict:
     :param o: The object to serialize
     :returns: The object, serialized as a standard dict.
     """
+    if isinstance(o, CompoundValue) or _is_record(o):
+        return _serialize(o)
     return serialize_object(o, target_cls=dict)
+
+
+def response_object_to_record(o: object):
+    """
+    Utility function for converting a response object into a compact record.
+
+    Records are instances of namedtuple classes generated (once per type) from the WSDL types of the objects.  They
+    have the same fields as the objects, so can be used in their place for reading, but take a fraction of the memory.
+    Nested lists are converted into tuples.  Fields whose names are not valid namedtuple field names are renamed as
+    described in ``record_field_names()`` (e.g. ``_value_1`` becomes ``value_1``), in the records and in the dicts
+    serialized from them.
+
+    :param o: The object to convert.
+    :returns: The object, as a namedtuple.
+    """
+    return _record(o)
+
+
+def response_objects_to_records(objects: list) -> list:
+    """
+    Utility function for converting a list of response objects (e.g. the result of ListProjects()) into compact
+    records.  See ``response_object_to_record()``.
+
+    :param objects: The list of objects to convert.  None (as returned by zeep for an empty list) is treated as empty.
+    :returns: A list of namedtuples.
+    """
+    return [_record(o) for o in objects or ()]
+
+
+def response_objects_to_dicts(objects: list) -> list:
+    """
+    Utility function for serializing a list of response objects (e.g. the result of ListProjects()) into standard
+    dicts.  This is equivalent to calling ``response_object_to_dict()`` on each object, but the conversion for each type
+    of object is only worked out once.
+
+    :param objects: The list of objects to serialize.  None (as returned by zeep for an empty list) is treated as empty.
+    :returns: A list of dicts.
+    """
+    return [_serialize(o) for o in objects or ()]
+
+
+def response_objects_to_tuples(objects: list) -> tuple:
+    """
+    Utility function for serializing a list of response objects of the same type into tuples.
+
+    :param objects: The list of objects to serialize.  None (as returned by zeep for an empty list) is treated as empty.
+    :returns: A tuple of the field names (as a tuple of strings) and a list of tuples, one per object, holding the
+        values of the fields in the same order.
+    """
+    if not objects:
+        return (), []
+    fields = tuple(response_object_to_dict(objects[0]))
+    return fields, [tuple(record.values()) for record in response_objects_to_dicts(objects)]
+
+
+def response_objects_to_columns(objects: list) -> dict:
+    """
+    Utility function for serializing a list of response objects into columns.
+
+    :param objects: The list of objects to serialize.  None (as returned by zeep for an empty list) is treated as empty.
+    :returns: A dict mapping each field name to the list of values of the field, one per object.  Objects missing a
+        field have None for it.
+    """
+    columns = {}
+    for index, record in enumerate(response_objects_to_dicts(objects)):
+        for name, value in record.items():
+            try:
+                columns[name].append(value)
+            except KeyError:
+                columns[name] = [None] * index + [value]
+        for name, column in columns.items():
+            if len(column) <= index:
+                column.append(None)
+    return columns
+
+
+def _json_default(o):
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, (bytes, bytearray)):
+        return base64.b64encode(o).decode('ascii')
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+
+def write_json_lines(objects, fp) -> int:
+    """
+    Utility function for writing response objects to a file as JSON Lines, one object per line.  Objects are written as
+    they are read from ``objects``, which may be a generator.
+
+    Dates and times are written in ISO 8601 format, decimals as strings and binary data base64 encoded.
+
+    :param objects: Iterable of the objects to write.
+    :param fp: Text file object to write to.
+    :returns: The number of objects written, as an int.
+    """
+    encoder = json.JSONEncoder(default=_json_default, ensure_ascii=False)
+    count = 0
+    for o in objects:
+        fp.write(encoder.encode(_serialize(o)))
+        fp.write('\n')
+        count += 1
+    return count
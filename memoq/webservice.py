@@ -8,28 +8,137 @@ https://docs.memoq.com/current/api-docs/wsapi/
 
 This code is released under the MIT License.
 """
+import functools
+import os
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 from zeep import CachingClient  # https://python-zeep.readthedocs.io/en/master/client.html#caching-of-wsdl-and-xsd-files
+from zeep import Client
+from zeep import Settings
+from zeep.transports import AsyncTransport, Transport
+from zeep.wsdl.bindings import Soap12Binding
+from zeep.wsdl.utils import etree_to_string
+
+from .cache import WSDLCache
+from .raw import iter_result_records, result_item_types
+from .stats import Instrumentation, record_parsing, record_reads, time_reply_processing
+from .termbase import encode_concept_entries, encode_term_entries, iter_concept_entries, iter_term_entries
+from .tmx import iter_translation_units, write_translation_units_json_lines
+from .transfer import AdaptiveChunkSize, ChunkReader, TransferLimiter, TransferReport, download_chunks, \
+    iter_downloaded_chunks, upload_chunks
+from .transport import MemoQTransport
 
 
 DEFAULT_BASE_URL = 'http://localhost:8080'
+DEFAULT_EXPORT_WORKERS = 4
+DEFAULT_IMPORT_WORKERS = 4
+DEFAULT_IMPORT_READ_AHEAD = 2
+# Chunks of up to MAX_CHUNK_SIZE bytes are base64 encoded into text nodes over the 10 MB lxml allows by default.
+CLIENT_SETTINGS = Settings(xml_huge_tree=True)
+
+# Every service in the process, so that their locks can be replaced in child processes after a fork.
+_services = weakref.WeakSet()
+
+
+def _reinit_after_fork():
+    for service in list(_services):
+        service._MemoQWebServiceBase__client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _run_concurrently(func, arguments: dict, max_workers: int) -> dict:
+    """
+    Function for calling a function on several items on a thread pool.
+
+    :param func: Callable taking a key and its value from ``arguments``.
+    :param arguments: A dict mapping each key (e.g. the GUID of a TM) to the value to call ``func`` with.
+    :param max_workers: Maximum number of calls running at the same time, as an int.
+    :returns: A dict mapping each key to the return value of ``func``, or to the exception it raised.
+    """
+    results = {}
+    if not arguments:
+        return results
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(arguments))) as executor:
+        futures = {key: executor.submit(func, key, value) for key, value in arguments.items()}
+        for key, future in futures.items():
+            error = future.exception()
+            results[key] = error if error is not None else future.result()
+    return results
+
+
+def _upload_file_name(path_or_fileobj, file_name: str = None) -> str:
+    """
+    Function for working out the name of a file being uploaded.
+
+    :param path_or_fileobj: Path of the file, or a binary file object, being uploaded.
+    :param file_name: Name of the file on the server, as a string, if specified by the caller.
+    :returns: The name of the file on the server, as a string.
+    """
+    if file_name is not None:
+        return file_name
+    name = getattr(path_or_fileobj, 'name', path_or_fileobj)
+    if not isinstance(name, (str, bytes, os.PathLike)):
+        raise ValueError("file_name must be specified when uploading a file object without a name.")
+    return os.path.basename(os.fsdecode(name))
+
+
+class _RawOperations(object):
+    """Class for looking up the operations of a service in raw mode, e.g. ``service.raw.ListProjects(list_filter)``."""
+
+    __slots__ = ('_service',)
+
+    def __init__(self, service: 'MemoQWebServiceBase'):
+        self._service = service
+
+    def __getattr__(self, item):
+        return functools.partial(self._service.iter_raw, item)
 
 
 class MemoQWebServiceBase(ABC):
     """
     Abstract Base Class for memoQ Web Service API Services.
+
+    Services can be pickled, e.g. to send them to ``multiprocessing`` workers.  The client is not pickled: it is built
+    again from the service definitions carried over by the WSDL cache of the transport, without calling the server.
+    Child processes forked after the client was built (see ``prewarm()``) keep using it.
     """
 
-    def __init__(self, base_url: str = None):
+    _client_class = CachingClient
+    _transport_class = MemoQTransport
+
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
         self.base_url = base_url if base_url is not None else DEFAULT_BASE_URL
-        self.__client = CachingClient(wsdl=self.service_url)
+        self.transport = transport if transport is not None else self._transport_class()
+        self.__client = None
+        self.__client_lock = threading.Lock()
+        _services.add(self)
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state['_MemoQWebServiceBase__client']
+        del state['_MemoQWebServiceBase__client_lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__client = None
+        self.__client_lock = threading.Lock()
+        _services.add(self)
 
     def __dir__(self) -> list:
         """
@@ -43,7 +152,7 @@ class MemoQWebServiceBase(ABC):
         return sorted(set(
             super().__dir__() +
             list(self.__dict__.keys()) +
-            self.__client.service.__dir__()
+            self._client.service.__dir__()
         ))
 
     def __getattr__(self, item):
@@ -52,7 +161,129 @@ class MemoQWebServiceBase(ABC):
 
         :param item: Item attribute to lookup.
         """
-        return getattr(self.__client.service, item)
+        operation = getattr(self._client.service, item)
+        instrumentation = getattr(self.transport, 'instrumentation', None)
+        if instrumentation is None or not instrumentation.enabled:
+            return operation
+        return self._instrument(instrumentation, f"{self.__class__.__name__}.{item}", operation)
+
+    def _instrument(self, instrumentation: Instrumentation, name: str, operation):
+        """
+        Method for wrapping an operation so that its calls are recorded.
+
+        :param instrumentation: The Instrumentation instance recording the calls.
+        :param name: Name of the operation, as a string e.g. 'MemoQTMService.ListTMs'
+        :param operation: The operation to wrap.
+        :returns: The wrapped operation.
+        """
+        return instrumentation.wrap(name, operation)
+
+    def prewarm(self) -> 'MemoQWebServiceBase':
+        """
+        Method for building the client of the service ahead of its first use, e.g. before forking worker processes so
+        that they all share the parsed service definitions rather than each parsing them again.
+
+        :returns: The service itself.
+        """
+        self._client
+        return self
+
+    @property
+    def raw(self) -> _RawOperations:
+        """
+        Method for looking up operations in raw mode, as an alternative to ``iter_raw()`` e.g.
+
+            >>> for project in server_project_service.raw.ListProjects(list_filter):
+            ...     print(project.Name)
+
+        :returns: An object whose attributes are the operations of the service, each returning a generator of records.
+        """
+        return _RawOperations(self)
+
+    def iter_raw(self, operation: str, *args, **kwargs):
+        """
+        Method for calling an operation in raw mode, for large list responses such as ListProjects or ListUsers.
+
+        The request is built by zeep as usual, but the response is streamed and the items of its result are decoded
+        into compact records (namedtuples, converted according to the XSD type of the items) as they are received,
+        rather than parsing the whole response and then materialising a zeep object for every item.  The call is made
+        when the generator is first advanced, and is instrumented like any other call.  Raw calls require a
+        synchronous MemoQTransport, which streams the response.
+
+        :param operation: Name of the operation, as a string e.g. 'ListProjects'
+        :param args: Positional arguments of the operation.
+        :param kwargs: Keyword arguments of the operation.
+        :returns: A generator yielding each item of the result of the operation as a namedtuple.
+        """
+        if not callable(getattr(self.transport, 'post_stream', None)):
+            raise TypeError(f"Raw operations require a synchronous MemoQTransport, not "
+                            f"{type(self.transport).__name__}.")
+        instrumentation = getattr(self.transport, 'instrumentation', None)
+        if instrumentation is None or not instrumentation.enabled:
+            return self._iter_raw(operation, args, kwargs)
+        iter_raw = instrumentation.wrap_generator(f"{self.__class__.__name__}.{operation}", self._iter_raw)
+        return iter_raw(operation, args, kwargs)
+
+    def _iter_raw(self, operation: str, args: tuple, kwargs: dict):
+        client = self._client
+        port = next(iter(next(iter(client.wsdl.services.values())).ports.values()))
+        binding_operation = port.binding.get(operation)
+        envelope = client.create_message(client.service, operation, *args, **kwargs)
+        soap_action = binding_operation.soapaction or ''
+        if isinstance(port.binding, Soap12Binding):
+            headers = {'Content-Type': f'application/soap+xml; charset=utf-8; action="{soap_action}"'}
+        else:
+            headers = {'Content-Type': 'text/xml; charset=utf-8', 'SOAPAction': f'"{soap_action}"'}
+        response = self.transport.post_stream(port.binding_options['address'], etree_to_string(envelope), headers)
+        with response:
+            if response.status_code != 200:
+                # Let zeep raise the SOAP fault (or transport error) as it would for a regular call.
+                port.binding.process_reply(client, binding_operation, response)
+            response.raw.decode_content = True
+            yield from record_parsing(iter_result_records(record_reads(response.raw), operation,
+                                                          result_item_types(binding_operation)))
+
+    @property
+    def _client(self):
+        """
+        Method for getting the underlying client.  The client (and the service definition it is built from) is only
+        created the first time an operation is looked up.
+
+        :returns: The underlying zeep client.
+        """
+        if self.__client is None:
+            with self.__client_lock:
+                if self.__client is None:
+                    cache = getattr(self.transport, 'cache', None)
+                    if isinstance(cache, WSDLCache):
+                        cache.ensure_validated(self.base_url, lambda: self._fetch_api_version(cache))
+                        wsdl = cache.load_document(self.service_url, self.transport)
+                    else:
+                        wsdl = self.service_url
+                    client = self._client_class(wsdl=wsdl, transport=self.transport, settings=CLIENT_SETTINGS)
+                    time_reply_processing(client.wsdl.bindings.values())
+                    self.__client = client
+        return self.__client
+
+    def _fetch_api_version(self, cache: WSDLCache) -> str:
+        """
+        Method for retrieving the API version of the server, used for validating the cached service definitions.
+
+        :param cache: The cache holding the service definitions.
+        :returns: The API version, as a string.
+        """
+        url = urljoin(self.base_url, '/memoqservices/serverproject?wsdl')
+        document = cache.load_document(url, self.transport)
+        if not isinstance(self.transport, AsyncTransport):
+            return Client(wsdl=document, transport=self.transport).service.GetApiVersion()
+        # The operations of an asynchronous transport can only be awaited, so the version is retrieved through a
+        # temporary synchronous transport, whose session is closed straight away.
+        transport = Transport(cache=cache, timeout=getattr(self.transport, 'load_timeout', 300),
+                              operation_timeout=getattr(self.transport, 'operation_timeout', None))
+        try:
+            return Client(wsdl=document, transport=transport).service.GetApiVersion()
+        finally:
+            transport.session.close()
 
     @property
     @abstractmethod
@@ -74,13 +305,15 @@ class MemoQAsynchronousTasksService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/tasksservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -101,13 +334,15 @@ class MemoQELMService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/elmservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -128,13 +363,15 @@ class MemoQFileManagerService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/filemanagerservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -145,6 +382,63 @@ class MemoQFileManagerService(MemoQWebServiceBase):
         """
         return urljoin(self.base_url, '/memoqservices/filemanager?wsdl')
 
+    def upload(self, path_or_fileobj, file_name: str = None, is_zipped: bool = False,
+               chunk_size: AdaptiveChunkSize = None, read_ahead: int = 0) -> str:
+        """
+        Method for uploading a file to the memoQ server.  This wraps around the BeginChunkedFileUpload(),
+        AddNextFileChunk() and EndChunkedFileUpload() methods of the File Manager service API.
+
+        The file is memory-mapped where possible and sent in chunks whose size adapts to the speed of the link, so
+        memory use stays flat regardless of the size of the file.
+
+        :param path_or_fileobj: Path of the file, or a binary file object, to upload.
+        :param file_name: Name of the file on the server, as a string.  Defaults to the name of the file being uploaded,
+            and must be specified when uploading a file object without a name.
+        :param is_zipped: Whether or not the file being uploaded is zipped, as a bool.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :returns: The GUID of the uploaded file, as a string.
+        """
+        file_name = _upload_file_name(path_or_fileobj, file_name)
+        file_guid, _ = upload_chunks(lambda: self.BeginChunkedFileUpload(file_name, is_zipped),
+                                     self.AddNextFileChunk,
+                                     self.EndChunkedFileUpload,
+                                     path_or_fileobj,
+                                     chunk_size=chunk_size,
+                                     read_ahead=read_ahead,
+                                     abort=self._abort_upload)
+        return file_guid
+
+    def _abort_upload(self, file_guid: str):
+        # Close the upload session, then delete the partial file it left behind.
+        self.EndChunkedFileUpload(file_guid)
+        self.DeleteFile(file_guid)
+
+    def download(self, file_guid: str, dest, zipped: bool = False, chunk_size: AdaptiveChunkSize = None,
+                 pipeline: bool = False) -> str:
+        """
+        Method for downloading a file from the memoQ server.  This wraps around the BeginChunkedFileDownload(),
+        GetNextFileChunk() and EndChunkedFileDownload() methods of the File Manager service API.
+
+        :param file_guid: The GUID of the file to download, as a string.
+        :param dest: Path of the file, or a binary file object, to write the downloaded file to.
+        :param zipped: Whether or not the server should zip the file before sending it, as a bool.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param pipeline: Whether to write to ``dest`` in a background thread while the next chunk is requested, as a
+            bool.
+        :returns: The name of the file on the server, as a string.
+        """
+        response = self.BeginChunkedFileDownload(file_guid, zipped)
+        session_id = response.BeginChunkedFileDownloadResult
+        try:
+            chunks = iter_downloaded_chunks(lambda byte_count: self.GetNextFileChunk(session_id, byte_count),
+                                            chunk_size=chunk_size,
+                                            total_size=response.fileSize)
+            download_chunks(chunks, dest, pipeline=pipeline)
+        finally:
+            self.EndChunkedFileDownload(session_id)
+        return response.fileName
+
 
 class MemoQLightResourceService(MemoQWebServiceBase):
     """
@@ -155,13 +449,15 @@ class MemoQLightResourceService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/lightresourceservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -182,13 +478,15 @@ class MemoQLiveDocsService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/livedocsservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -209,13 +507,15 @@ class MemoQSecurityService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/securityservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -236,13 +536,15 @@ class MemoQServerProjectService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/serverprojectservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -263,13 +565,15 @@ class MemoQTBService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/tbservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -280,6 +584,174 @@ class MemoQTBService(MemoQWebServiceBase):
         """
         return urljoin(self.base_url, '/memoqservices/tb?wsdl')
 
+    def iter_csv_chunks(self, tb_guid: str):
+        """
+        Generator for exporting a TB as CSV, one chunk at a time.  This wraps around the BeginChunkedCSVExport(),
+        GetNextExportChunk() and EndChunkedExport() methods of the Term base API.  Chunks are only requested from the
+        server as they are consumed.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: A generator yielding the CSV as chunks of bytes.
+        """
+        session_id = self.BeginChunkedCSVExport(tb_guid)
+        try:
+            yield from iter_downloaded_chunks(lambda _: self.GetNextExportChunk(session_id))
+        finally:
+            self.EndChunkedExport(session_id)
+
+    def iter_term_entries(self, tb_guid: str):
+        """
+        Generator for exporting the entries of a TB one at a time.  The CSV is parsed as it is received, so memory use
+        does not grow with the size of the TB.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: A generator yielding each entry as a ``memoq.termbase.TermEntry`` instance.
+        """
+        return iter_term_entries(self.iter_csv_chunks(tb_guid))
+
+    def export_csv(self, tb_guid: str, dest, pipeline: bool = False) -> int:
+        """
+        Method for exporting a TB to a CSV file.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :param dest: Path of the file, or a binary file object, to write to.
+        :param pipeline: Whether to write to ``dest`` in a background thread while the next chunk is requested, as a
+            bool.
+        :returns: The number of bytes written, as an int.
+        """
+        return download_chunks(self.iter_csv_chunks(tb_guid), dest, pipeline=pipeline)
+
+    def export_csvs(self, destinations: dict, max_workers: int = DEFAULT_EXPORT_WORKERS) -> dict:
+        """
+        Method for exporting several TBs to CSV files in parallel.
+
+        :param destinations: A dict mapping the GUID of each TB to export to the path of the file to write it to.
+        :param max_workers: Maximum number of TBs to export at the same time, as an int.
+        :returns: A dict mapping the GUID of each TB to the number of bytes written for it, or to the exception raised
+            if its export failed.
+        """
+        return _run_concurrently(self.export_csv, destinations, max_workers)
+
+    def import_csv(self, tb_guid: str, source, chunk_size: AdaptiveChunkSize = None,
+                   read_ahead: int = DEFAULT_IMPORT_READ_AHEAD, limiter: TransferLimiter = None) -> TransferReport:
+        """
+        Method for importing entries into a TB from CSV.  This wraps around the BeginChunkedCSVImport(),
+        AddNextCSVChunk() and EndChunkedCSVImport() methods of the Term base API.
+
+        If the import fails part-way, it is left unfinished rather than ended, so that the TB is not left with only the
+        entries sent so far.
+
+        :param tb_guid: The GUID of the TB to import into, as a string.
+        :param source: Path of a CSV file, or a binary file object, to import.  Alternatively, an iterable (e.g. a
+            generator) of ``memoq.termbase.TermEntry`` instances or of dicts, which are encoded as they are sent.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :param limiter: Optional TransferLimiter shared with other imports, capping their concurrency and bandwidth.
+        :returns: A TransferReport instance, whose result is the value returned by EndChunkedCSVImport().
+        """
+        if not isinstance(source, (str, bytes, os.PathLike)) and not hasattr(source, 'read'):
+            source = ChunkReader(encode_term_entries(source))
+        return self._import(tb_guid, self.BeginChunkedCSVImport, self.AddNextCSVChunk, self.EndChunkedCSVImport, source,
+                            chunk_size, read_ahead, limiter)
+
+    def import_csvs(self, sources: dict, max_workers: int = DEFAULT_IMPORT_WORKERS,
+                    max_bytes_per_second: float = None, limiter: TransferLimiter = None) -> dict:
+        """
+        Method for importing entries into several TBs concurrently.
+
+        :param sources: A dict mapping the GUID of each TB to import into to its source, as accepted by
+            ``import_csv()``.
+        :param max_workers: Maximum number of imports running at the same time, as an int.
+        :param max_bytes_per_second: Maximum number of bytes sent per second across all of the imports, or None for no
+            cap.
+        :param limiter: TransferLimiter to use instead of one created from ``max_workers`` and ``max_bytes_per_second``,
+            e.g. to share the caps with other imports.
+        :returns: A dict mapping the GUID of each TB to the TransferReport of its import, or to the exception raised if
+            its import failed.
+        """
+        limiter = limiter if limiter is not None else TransferLimiter(max_workers, max_bytes_per_second)
+        return _run_concurrently(lambda tb_guid, source: self.import_csv(tb_guid, source, limiter=limiter), sources,
+                                 max_workers)
+
+    def iter_multiterm_chunks(self, tb_guid: str):
+        """
+        Generator for exporting a TB as MultiTerm XML, one chunk at a time.  This wraps around the
+        BeginChunkedMultiTermExport(), GetNextExportChunk() and EndChunkedExport() methods of the Term base API.  Chunks
+        are only requested from the server as they are consumed.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: A generator yielding the XML as chunks of bytes.
+        """
+        session_id = self.BeginChunkedMultiTermExport(tb_guid)
+        try:
+            yield from iter_downloaded_chunks(lambda _: self.GetNextExportChunk(session_id))
+        finally:
+            self.EndChunkedExport(session_id)
+
+    def iter_concept_entries(self, tb_guid: str):
+        """
+        Generator for exporting the concepts of a TB one at a time.  The MultiTerm XML is parsed as it is received, so
+        memory use does not grow with the size of the TB.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :returns: A generator yielding each concept as a ``memoq.termbase.ConceptEntry`` instance.
+        """
+        return iter_concept_entries(self.iter_multiterm_chunks(tb_guid))
+
+    def export_multiterm(self, tb_guid: str, dest, pipeline: bool = False) -> int:
+        """
+        Method for exporting a TB to a MultiTerm XML file.
+
+        :param tb_guid: The GUID of the TB to export, as a string.
+        :param dest: Path of the file, or a binary file object, to write to.
+        :param pipeline: Whether to write to ``dest`` in a background thread while the next chunk is requested, as a
+            bool.
+        :returns: The number of bytes written, as an int.
+        """
+        return download_chunks(self.iter_multiterm_chunks(tb_guid), dest, pipeline=pipeline)
+
+    def import_multiterm(self, tb_guid: str, source, chunk_size: AdaptiveChunkSize = None,
+                         read_ahead: int = DEFAULT_IMPORT_READ_AHEAD,
+                         limiter: TransferLimiter = None) -> TransferReport:
+        """
+        Method for importing concepts into a TB from MultiTerm XML.  This wraps around the
+        BeginChunkedMultiTermImport(), AddNextMultiTermChunk() and EndChunkedMultiTermImport() methods of the Term base
+        API.
+
+        If the import fails part-way, it is left unfinished rather than ended, as in ``import_csv()``.
+
+        :param tb_guid: The GUID of the TB to import into, as a string.
+        :param source: Path of a MultiTerm XML file, or a binary file object, to import.  Alternatively, an iterable
+            (e.g. a generator) of ``memoq.termbase.ConceptEntry`` instances, which are encoded as they are sent.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :param limiter: Optional TransferLimiter shared with other imports, capping their concurrency and bandwidth.
+        :returns: A TransferReport instance, whose result is the value returned by EndChunkedMultiTermImport().
+        """
+        if not isinstance(source, (str, bytes, os.PathLike)) and not hasattr(source, 'read'):
+            source = ChunkReader(encode_concept_entries(source))
+        return self._import(tb_guid, self.BeginChunkedMultiTermImport, self.AddNextMultiTermChunk,
+                            self.EndChunkedMultiTermImport, source, chunk_size, read_ahead, limiter)
+
+    def _import(self, tb_guid: str, begin, add_next_chunk, end, source, chunk_size: AdaptiveChunkSize, read_ahead: int,
+                limiter: TransferLimiter) -> TransferReport:
+        sent = 0
+
+        def add_next_counted_chunk(session_id: str, chunk):
+            nonlocal sent
+            add_next_chunk(session_id, chunk)
+            sent += len(chunk)
+
+        started = time.perf_counter()
+        _, result = upload_chunks(lambda: begin(tb_guid),
+                                  add_next_counted_chunk,
+                                  end,
+                                  source,
+                                  chunk_size=chunk_size,
+                                  read_ahead=read_ahead,
+                                  limiter=limiter)
+        return TransferReport(tb_guid, sent, time.perf_counter() - started, result)
+
 
 class MemoQTMService(MemoQWebServiceBase):
     """
@@ -290,13 +762,15 @@ class MemoQTMService(MemoQWebServiceBase):
     https://docs.memoq.com/current/api-docs/wsapi/memoqservices/tmservice.html
     """
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, transport: MemoQTransport = None):
         """
         Initializer for the class.
 
         :param base_url: Base URL of the memoQ Web Service API, as a string.  For example: "http://localhost:8080"
+        :param transport: Transport to use for talking to the memoQ server.  Pass in a shared transport to reuse its
+            connection pool.  If not specified, a new transport is created.
         """
-        super().__init__(base_url)
+        super().__init__(base_url, transport)
 
     @property
     def service_url(self) -> str:
@@ -306,3 +780,112 @@ class MemoQTMService(MemoQWebServiceBase):
         :returns: The service URL associated with the Translation Memory management endpoint, as a string.
         """
         return urljoin(self.base_url, '/memoqservices/tm?wsdl')
+
+    def iter_tmx_chunks(self, tm_guid: str):
+        """
+        Generator for exporting a TM as TMX, one chunk at a time.  This wraps around the BeginChunkedTMXExport(),
+        GetNextTMXChunk() and EndChunkedTMXExport() methods of the Translation Memory API.  Chunks are only requested
+        from the server as they are consumed.
+
+        :param tm_guid: The GUID of the TM to export, as a string.
+        :returns: A generator yielding the TMX as chunks of bytes.
+        """
+        session_id = self.BeginChunkedTMXExport(tm_guid)
+        try:
+            yield from iter_downloaded_chunks(lambda _: self.GetNextTMXChunk(session_id))
+        finally:
+            self.EndChunkedTMXExport(session_id)
+
+    def iter_translation_units(self, tm_guid: str):
+        """
+        Generator for exporting the translation units of a TM one at a time.  The TMX is parsed as it is received, so
+        memory use does not grow with the size of the TM.
+
+        :param tm_guid: The GUID of the TM to export, as a string.
+        :returns: A generator yielding each translation unit as a ``memoq.tmx.TranslationUnit`` instance.
+        """
+        return iter_translation_units(self.iter_tmx_chunks(tm_guid))
+
+    def export_tmx(self, tm_guid: str, dest, json_lines: bool = False, pipeline: bool = False) -> int:
+        """
+        Method for exporting a TM to a file.
+
+        :param tm_guid: The GUID of the TM to export, as a string.
+        :param dest: Path of the file, or a file object, to write to.  File objects must be binary when writing TMX and
+            text when writing JSON Lines.
+        :param json_lines: Whether to write the translation units as JSON Lines rather than the TMX as is, as a bool.
+        :param pipeline: Whether to write the TMX in a background thread while the next chunk is requested, as a bool.
+        :returns: The number of bytes written for TMX, or the number of translation units written for JSON Lines.
+        """
+        if not json_lines:
+            return download_chunks(self.iter_tmx_chunks(tm_guid), dest, pipeline=pipeline)
+        if hasattr(dest, 'write'):
+            return write_translation_units_json_lines(self.iter_translation_units(tm_guid), dest)
+        with open(dest, 'w', encoding='utf-8') as f:
+            return write_translation_units_json_lines(self.iter_translation_units(tm_guid), f)
+
+    def export_tmxs(self, destinations: dict, json_lines: bool = False,
+                    max_workers: int = DEFAULT_EXPORT_WORKERS) -> dict:
+        """
+        Method for exporting several TMs to files in parallel.
+
+        :param destinations: A dict mapping the GUID of each TM to export to the path of the file to write it to.
+        :param json_lines: Whether to write the translation units as JSON Lines rather than the TMX as is, as a bool.
+        :param max_workers: Maximum number of TMs to export at the same time, as an int.
+        :returns: A dict mapping the GUID of each TM to the return value of ``export_tmx()`` for it, or to the exception
+            raised if its export failed.
+        """
+        return _run_concurrently(lambda tm_guid, dest: self.export_tmx(tm_guid, dest, json_lines), destinations,
+                                 max_workers)
+
+    def import_tmx(self, tm_guid: str, path_or_fileobj, chunk_size: AdaptiveChunkSize = None,
+                   read_ahead: int = DEFAULT_IMPORT_READ_AHEAD, limiter: TransferLimiter = None) -> TransferReport:
+        """
+        Method for importing a TMX file into a TM.  This wraps around the BeginChunkedTMXImport(), AddNextTMXChunk()
+        and EndChunkedTMXImport() methods of the Translation Memory API.
+
+        The file is memory-mapped where possible, and the next chunks are read in the background while the current
+        chunk is being sent.  If the import fails part-way, it is left unfinished rather than ended, so that none of
+        the TMX file is committed to the TM.
+
+        :param tm_guid: The GUID of the TM to import into, as a string.
+        :param path_or_fileobj: Path of the TMX file, or a binary file object, to import.
+        :param chunk_size: The AdaptiveChunkSize instance deciding the size of each chunk.  Defaults to a new instance.
+        :param read_ahead: Number of chunks to read ahead while the current chunk is being sent, as an int.
+        :param limiter: Optional TransferLimiter shared with other imports, capping their concurrency and bandwidth.
+        :returns: A TransferReport instance, whose result is the TmxImportResult returned by EndChunkedTMXImport().
+        """
+        sent = 0
+
+        def add_next_chunk(session_id: str, chunk):
+            nonlocal sent
+            self.AddNextTMXChunk(session_id, chunk)
+            sent += len(chunk)
+
+        started = time.perf_counter()
+        _, result = upload_chunks(lambda: self.BeginChunkedTMXImport(tm_guid),
+                                  add_next_chunk,
+                                  self.EndChunkedTMXImport,
+                                  path_or_fileobj,
+                                  chunk_size=chunk_size,
+                                  read_ahead=read_ahead,
+                                  limiter=limiter)
+        return TransferReport(tm_guid, sent, time.perf_counter() - started, result)
+
+    def import_tmxs(self, sources: dict, max_workers: int = DEFAULT_IMPORT_WORKERS,
+                    max_bytes_per_second: float = None, limiter: TransferLimiter = None) -> dict:
+        """
+        Method for importing several TMX files concurrently.
+
+        :param sources: A dict mapping the GUID of each TM to import into to the path of the TMX file to import.
+        :param max_workers: Maximum number of imports running at the same time, as an int.
+        :param max_bytes_per_second: Maximum number of bytes sent per second across all of the imports, or None for no
+            cap.
+        :param limiter: TransferLimiter to use instead of one created from ``max_workers`` and ``max_bytes_per_second``,
+            e.g. to share the caps with other imports.
+        :returns: A dict mapping the GUID of each TM to the TransferReport of its import, or to the exception raised if
+            its import failed.
+        """
+        limiter = limiter if limiter is not None else TransferLimiter(max_workers, max_bytes_per_second)
+        return _run_concurrently(lambda tm_guid, source: self.import_tmx(tm_guid, source, limiter=limiter), sources,
+                                 max_workers)
@@ -0,0 +1,274 @@
+"""
+Module for harvesting the workload of the projects on a memoQ server: their translation documents, word counts and
+progress and, optionally, their statistics.
+
+The projects are harvested concurrently by a bounded pool of workers, and each project is yielded as soon as it has been
+harvested while the totals of the workload are added up, so a report can be built without waiting for every project.
+
+This code is released under the MIT License.
+"""
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .util import response_objects_to_records
+
+
+DEFAULT_HARVEST_WORKERS = 8
+# https://docs.memoq.com/current/api-docs/wsapi/api/serverprojectservice/MemoQServices.StatisticsResultFormat.html
+DEFAULT_STATISTICS_RESULT_FORMAT = 'CSV_MemoQ'
+
+
+def _count(document, field: str) -> int:
+    return getattr(document, field, None) or 0
+
+
+def _target_languages(documents) -> dict:
+    """
+    Function for listing the target languages of the translation documents of a project, to run statistics on.
+
+    :param documents: The translation documents of the project, as returned by ListProjectTranslationDocuments().
+    :returns: The target language codes, as an ArrayOfstring.  zeep only sends the first item of a plain list passed
+        for an ArrayOfstring.
+    """
+    return {'string': sorted({document.TargetLangCode for document in documents})}
+
+
+def _statistics_by_language(result) -> dict:
+    """
+    Function for extracting the per-language results of a statistics task.
+
+    :param result: The result of the task as returned by GetTaskResult().
+    :returns: A dict mapping each target language code to the statistics for that language, as bytes in the format
+        the statistics were requested in.
+    """
+    results = getattr(result, 'ResultsForTargetLangs', None) or ()
+    # zeep does not always unwrap ArrayOfStatisticsResultForLang into a list.
+    results = getattr(results, 'StatisticsResultForLang', results) or ()
+    return {language_result.TargetLangCode: language_result.ResultData for language_result in results}
+
+
+class ProjectWorkload(object):
+    """Class that represents the workload of a single project, as harvested from the memoQ server."""
+
+    __slots__ = ('project', 'documents', 'statistics', 'error', 'seconds')
+
+    def __init__(self, project, documents: list = None, statistics: dict = None, error: Exception = None,
+                 seconds: float = None):
+        """
+        Initializer for the class.
+
+        :param project: The project, as returned by ListProjects().
+        :param documents: The translation documents of the project, as returned by ListProjectTranslationDocuments().
+        :param statistics: The statistics of the project, as a dict mapping each target language code to its
+            statistics, or None if statistics were not harvested.
+        :param error: The exception raised while harvesting the project, if any.
+        :param seconds: Number of seconds it took to harvest the project.
+        """
+        self.project = project
+        self.documents = documents if documents is not None else []
+        self.statistics = statistics
+        self.error = error
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"documents={len(self.documents)}"
+        return f"{self.__class__.__qualname__}(project='{self.project.ServerProjectGuid}', {outcome})"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def word_count(self) -> int:
+        """
+        Method for retrieving the number of words in the translation documents of the project.
+
+        :returns: The total word count, as an int.
+        """
+        return sum(_count(document, 'TotalWordCount') for document in self.documents)
+
+    @property
+    def confirmed_word_count(self) -> int:
+        """
+        Method for retrieving the number of words in confirmed segments of the translation documents of the project.
+
+        :returns: The confirmed word count, as an int.
+        """
+        return sum(_count(document, 'ConfirmedWordCount') for document in self.documents)
+
+    @property
+    def progress(self) -> float:
+        """
+        Method for retrieving the progress of the project.
+
+        :returns: The fraction of the words of the project which are confirmed, as a float between 0 and 1, or None
+            if the project has no words.
+        """
+        word_count = self.word_count
+        return self.confirmed_word_count / word_count if word_count else None
+
+
+class WorkloadTotals(object):
+    """Class that represents the totals of the workload of the projects harvested so far."""
+
+    def __init__(self):
+        """
+        Initializer for the class.
+        """
+        self.projects = 0
+        self.errors = 0
+        self.documents = 0
+        self.word_count = 0
+        self.confirmed_word_count = 0
+        self.proofread_word_count = 0
+        self.word_counts_by_language = Counter()
+        self.confirmed_word_counts_by_language = Counter()
+        self.documents_by_workflow_status = Counter()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(projects={self.projects}, documents={self.documents}, " \
+               f"word_count={self.word_count})"
+
+    def add(self, workload: ProjectWorkload):
+        """
+        Method for adding the workload of a project to the totals.
+
+        :param workload: The workload of the project, as a ProjectWorkload instance.
+        """
+        self.projects += 1
+        if not workload.ok:
+            self.errors += 1
+            return
+        for document in workload.documents:
+            word_count = _count(document, 'TotalWordCount')
+            confirmed_word_count = _count(document, 'ConfirmedWordCount')
+            language = getattr(document, 'TargetLangCode', None)
+            self.documents += 1
+            self.word_count += word_count
+            self.confirmed_word_count += confirmed_word_count
+            self.proofread_word_count += _count(document, 'ProofreadWordCount')
+            self.word_counts_by_language[language] += word_count
+            self.confirmed_word_counts_by_language[language] += confirmed_word_count
+            self.documents_by_workflow_status[getattr(document, 'WorkflowStatus', None)] += 1
+
+    @property
+    def progress(self) -> float:
+        """
+        Method for retrieving the progress of the projects harvested so far.
+
+        :returns: The fraction of their words which are confirmed, as a float between 0 and 1, or None if they have no
+            words.
+        """
+        return self.confirmed_word_count / self.word_count if self.word_count else None
+
+    def as_dict(self) -> dict:
+        """
+        Method for getting the totals as a dict.
+
+        :returns: The totals, as a dict.
+        """
+        return {
+            'projects': self.projects,
+            'errors': self.errors,
+            'documents': self.documents,
+            'word_count': self.word_count,
+            'confirmed_word_count': self.confirmed_word_count,
+            'proofread_word_count': self.proofread_word_count,
+            'progress': self.progress,
+            'word_counts_by_language': dict(self.word_counts_by_language),
+            'confirmed_word_counts_by_language': dict(self.confirmed_word_counts_by_language),
+            'documents_by_workflow_status': dict(self.documents_by_workflow_status),
+        }
+
+
+class WorkloadHarvest(object):
+    """
+    Class that represents the harvest of the workload of a set of projects on a memoQ server.
+
+    Iterating over the harvest runs it: the projects are harvested by a pool of workers, with no more projects in flight
+    than there are workers, and the workload of each project is yielded as soon as it is ready (so not necessarily in
+    the order of the projects).  The totals are kept up to date as the projects are yielded.  A harvest can only be
+    iterated over once.
+    """
+
+    def __init__(self, memoq_server, projects, statistics_options: dict = None,
+                 statistics_result_format: str = DEFAULT_STATISTICS_RESULT_FORMAT,
+                 max_workers: int = DEFAULT_HARVEST_WORKERS):
+        """
+        Initializer for the class.
+
+        :param memoq_server: The MemoQServer instance to harvest the projects from.
+        :param projects: Iterable of the projects to harvest, as returned by ListProjects().
+        :param statistics_options: The options of the statistics to run on each project, as a dict of the fields of
+            StatisticsOptions.  If not specified, statistics are not harvested.
+        :param statistics_result_format: The format of the statistics, as a string e.g. 'CSV_MemoQ'
+        :param max_workers: Maximum number of projects harvested at the same time, as an int.
+        """
+        self.memoq_server = memoq_server
+        self.projects = projects
+        self.statistics_options = statistics_options
+        self.statistics_result_format = statistics_result_format
+        self.max_workers = max_workers
+        self.totals = WorkloadTotals()
+        self._started = False
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self.memoq_server!r}, {self.totals!r})"
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError("A WorkloadHarvest can only be iterated over once.")
+        self._started = True
+        return self._harvest()
+
+    def run(self) -> WorkloadTotals:
+        """
+        Method for harvesting every project, keeping only the totals.
+
+        :returns: The totals of the workload, as a WorkloadTotals instance.
+        """
+        for _ in self:
+            pass
+        return self.totals
+
+    def _harvest(self):
+        projects = iter(self.projects)
+        pending = set()
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        try:
+            for project in projects:
+                pending.add(executor.submit(self._harvest_project, project))
+                if len(pending) < self.max_workers:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._completed(done)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._completed(done)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _completed(self, futures):
+        for future in futures:
+            workload = future.result()
+            self.totals.add(workload)
+            yield workload
+
+    def _harvest_project(self, project) -> ProjectWorkload:
+        started = time.perf_counter()
+        service = self.memoq_server._server_project_service
+        try:
+            documents = service.ListProjectTranslationDocuments(project.ServerProjectGuid) or []
+            if self.memoq_server.compact:
+                documents = response_objects_to_records(documents)
+            statistics = None
+            if self.statistics_options is not None:
+                task = service.StartStatisticsOnProjectTask(project.ServerProjectGuid, _target_languages(documents),
+                                                            self.statistics_options, self.statistics_result_format)
+                statistics = _statistics_by_language(self.memoq_server.task_scheduler.wait(task.TaskId))
+        except Exception as e:
+            return ProjectWorkload(project, error=e, seconds=time.perf_counter() - started)
+        return ProjectWorkload(project, documents, statistics, seconds=time.perf_counter() - started)
@@ -19,7 +19,6 @@ setup(name='pymemoq',
           "License :: OSI Approved :: MIT License",
           "Programming Language :: Python",
           "Programming Language :: Python :: 3",
-          "Programming Language :: Python :: 3.6",
           "Programming Language :: Python :: 3.7",
           "Programming Language :: Python :: 3.8",
           "Topic :: Software Development :: Libraries",
@@ -30,7 +29,9 @@ setup(name='pymemoq',
       author_email='leonidessaguisagjr@gmail.com',
       license='MIT',
       packages=['memoq'],
+      python_requires='>=3.7',
       install_requires=['zeep'],
+      extras_require={'async': ['zeep[async]']},
       include_package_data=True,
       zip_safe=False,
       )
@@ -0,0 +1,25 @@
+"""
+Fixtures shared by the tests.
+
+This code is released under the MIT License.
+"""
+import pytest
+
+import memoq.cache
+from benchmarks.fake_server import FakeMemoQServer
+from memoq.cache import WSDLCache
+
+
+@pytest.fixture(autouse=True)
+def wsdl_cache(tmp_path, monkeypatch):
+    """Cache shared by default between the transports created by a test, kept out of the user's cache directory."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    cache = WSDLCache(str(tmp_path / 'wsdl'))
+    monkeypatch.setattr(memoq.cache, '_default_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def fake_server():
+    with FakeMemoQServer(list_size=10) as server:
+        yield server
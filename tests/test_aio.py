@@ -0,0 +1,555 @@
+"""
+Tests for the asyncio variants of the memoQ services and of the memoQ server.
+
+The services are given stub operations in place of the zeep client, so the tests do not need a memoQ server.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from memoq.aio import AsyncLightResources, AsyncMembershipIndex, AsyncMemoQFileManagerService, AsyncMemoQServer, \
+    AsyncMemoQTBService, AsyncMemoQTMService
+from memoq.termbase import ConceptEntry, TermEntry, aiter_term_entries, encode_concept_entries
+from memoq.transfer import AdaptiveChunkSize, AsyncTransferLimiter, MIN_CHUNK_SIZE, TransferReport
+
+
+class StubFileManagerService(AsyncMemoQFileManagerService):
+    """File Manager service keeping uploaded files in memory."""
+
+    def __init__(self):
+        super().__init__('http://memoq.invalid')
+        self.files = {}
+        self.sessions = {}
+        self.ended = []
+        self.deleted = []
+
+    async def BeginChunkedFileUpload(self, file_name, is_zipped):
+        await asyncio.sleep(0)
+        self.sessions['upload'] = (file_name, bytearray())
+        return 'upload'
+
+    async def AddNextFileChunk(self, session_id, chunk):
+        await asyncio.sleep(0)
+        self.sessions[session_id][1].extend(chunk)
+
+    async def EndChunkedFileUpload(self, session_id):
+        await asyncio.sleep(0)
+        self.ended.append(session_id)
+        file_name, data = self.sessions.pop(session_id)
+        self.files['file-guid'] = (file_name, bytes(data))
+
+    async def DeleteFile(self, file_guid):
+        self.deleted.append(file_guid)
+
+    async def BeginChunkedFileDownload(self, file_guid, zipped):
+        await asyncio.sleep(0)
+        file_name, data = self.files[file_guid]
+        self.sessions['download'] = io.BytesIO(data)
+        return SimpleNamespace(BeginChunkedFileDownloadResult='download', fileName=file_name, fileSize=len(data))
+
+    async def GetNextFileChunk(self, session_id, byte_count):
+        await asyncio.sleep(0)
+        return self.sessions[session_id].read(byte_count)
+
+    async def EndChunkedFileDownload(self, session_id):
+        self.ended.append(session_id)
+        del self.sessions[session_id]
+
+
+def test_file_manager_upload_and_download(tmp_path):
+    data = bytes(range(256)) * (3 * MIN_CHUNK_SIZE // 256 + 7)
+    source = tmp_path / 'source.bin'
+    source.write_bytes(data)
+    service = StubFileManagerService()
+
+    file_guid = asyncio.run(service.upload(source, chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE)))
+    assert file_guid == 'upload'
+    assert service.files['file-guid'] == ('source.bin', data)
+
+    dest = io.BytesIO()
+    file_name = asyncio.run(service.download('file-guid', dest, chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE)))
+    assert file_name == 'source.bin'
+    assert dest.getvalue() == data
+    assert service.ended == ['upload', 'download']
+    assert not service.sessions
+
+
+def test_file_manager_upload_aborts_on_failure():
+    service = StubFileManagerService()
+
+    async def fail(session_id, chunk):
+        raise ConnectionError('lost')
+
+    service.AddNextFileChunk = fail
+    with pytest.raises(ConnectionError):
+        asyncio.run(service.upload(io.BytesIO(b'data'), file_name='a.txt'))
+    assert service.ended == ['upload']
+    assert service.deleted == ['upload']
+
+
+def test_file_manager_upload_needs_a_file_name():
+    with pytest.raises(ValueError):
+        asyncio.run(StubFileManagerService().upload(io.BytesIO(b'data')))
+
+
+class StubLightResourceService(object):
+    """Light resource service counting how many types of light resources are listed at the same time."""
+
+    def __init__(self):
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def ListResources(self, resource_type):
+        self.calls.append(resource_type)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return [f'{resource_type} resource']
+
+
+def test_light_resources_prefetch():
+    server = AsyncMemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_light_resource_service'] = StubLightResourceService()
+
+    async def prefetch():
+        light_resources = await server.light_resources.prefetch(max_workers=4)
+        return light_resources, await light_resources['QASettings']
+
+    light_resources, qa_settings = asyncio.run(prefetch())
+    assert isinstance(light_resources, AsyncLightResources)
+    assert qa_settings == ['QASettings resource']
+    assert sorted(service.calls) == sorted(light_resources._resource_types)
+    assert 1 < service.max_running <= 4
+    assert light_resources._resources['ProjectTemplate'] == ['ProjectTemplate resource']
+
+    light_resources.invalidate('QASettings')
+    assert asyncio.run(light_resources['QASettings']) == ['QASettings resource']
+    assert service.calls.count('QASettings') == 2
+
+
+def test_light_resources_prefetch_rejects_unknown_types():
+    server = AsyncMemoQServer('http://memoq.invalid')
+    server._api_endpoints['_light_resource_service'] = StubLightResourceService()
+    with pytest.raises(KeyError):
+        asyncio.run(server.light_resources.prefetch(['NotAResourceType']))
+
+
+TMX = (b'<?xml version="1.0" encoding="utf-8"?><tmx version="1.4"><header srclang="en-us"/><body>' +
+       b''.join(b'<tu tuid="%d"><tuv xml:lang="en-us"><seg>Source %d</seg></tuv>'
+                b'<tuv xml:lang="de-de"><seg>Ziel %d</seg></tuv></tu>' % (i, i, i) for i in range(50)) +
+       b'</body></tmx>')
+
+
+class StubTMService(AsyncMemoQTMService):
+    """Translation Memory service exporting TMX from memory in small chunks, and importing TMX into memory."""
+
+    def __init__(self, tmx: bytes = TMX, chunk_size: int = 100):
+        super().__init__('http://memoq.invalid')
+        self.tmx = tmx
+        self.chunk_size = chunk_size
+        self.sessions = {}
+        self.ended = []
+        self.imported = {}
+        self.importing = 0
+        self.max_importing = 0
+
+    async def BeginChunkedTMXImport(self, tm_guid):
+        self.importing += 1
+        self.max_importing = max(self.max_importing, self.importing)
+        self.sessions[tm_guid] = bytearray()
+        return tm_guid
+
+    async def AddNextTMXChunk(self, session_id, chunk):
+        await asyncio.sleep(0.001)
+        if bytes(chunk[:6]) == b'broken':
+            raise ConnectionError('lost')
+        self.sessions[session_id].extend(chunk)
+
+    async def EndChunkedTMXImport(self, session_id):
+        self.importing -= 1
+        self.ended.append(session_id)
+        self.imported[session_id] = bytes(self.sessions.pop(session_id))
+        return SimpleNamespace(__values__={'AllSegmentCount': 50, 'StoredSegmentCount': 50})
+
+    async def BeginChunkedTMXExport(self, tm_guid):
+        if tm_guid == 'missing':
+            raise LookupError(tm_guid)
+        self.sessions[tm_guid] = io.BytesIO(self.tmx)
+        return tm_guid
+
+    async def GetNextTMXChunk(self, session_id):
+        await asyncio.sleep(0)
+        return self.sessions[session_id].read(self.chunk_size)
+
+    async def EndChunkedTMXExport(self, session_id):
+        self.ended.append(session_id)
+        del self.sessions[session_id]
+
+
+def test_tm_iter_tmx_chunks():
+    service = StubTMService()
+
+    async def export():
+        return [chunk async for chunk in service.iter_tmx_chunks('tm')]
+
+    chunks = asyncio.run(export())
+    assert len(chunks) > 1
+    assert b''.join(chunks) == TMX
+    assert service.ended == ['tm']
+
+
+def test_tm_iter_translation_units():
+    service = StubTMService()
+
+    async def export():
+        return [unit async for unit in service.iter_translation_units('tm')]
+
+    units = asyncio.run(export())
+    assert len(units) == 50
+    assert units[7].segment('de-de') == 'Ziel 7'
+    assert service.ended == ['tm']
+
+
+def test_tm_export_tmx(tmp_path):
+    service = StubTMService()
+    assert asyncio.run(service.export_tmx('tm', tmp_path / 'tm.tmx')) == len(TMX)
+    assert (tmp_path / 'tm.tmx').read_bytes() == TMX
+
+    assert asyncio.run(service.export_tmx('tm', tmp_path / 'tm.jsonl', json_lines=True)) == 50
+    lines = (tmp_path / 'tm.jsonl').read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[3])['variants'] == [['en-us', 'Source 3'], ['de-de', 'Ziel 3']]
+
+
+def test_tm_export_tmxs(tmp_path):
+    service = StubTMService()
+    destinations = {'a': tmp_path / 'a.tmx', 'b': tmp_path / 'b.tmx', 'missing': tmp_path / 'missing.tmx'}
+    results = asyncio.run(service.export_tmxs(destinations, max_workers=2))
+    assert results['a'] == results['b'] == len(TMX)
+    assert isinstance(results['missing'], LookupError)
+    assert (tmp_path / 'b.tmx').read_bytes() == TMX
+
+
+def test_tm_import_tmx():
+    service = StubTMService()
+    report = asyncio.run(service.import_tmx('tm', io.BytesIO(TMX), chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE)))
+    assert isinstance(report, TransferReport)
+    assert report.name == 'tm'
+    assert report.bytes == len(TMX)
+    assert report.counts == {'AllSegmentCount': 50, 'StoredSegmentCount': 50}
+    assert service.imported['tm'] == TMX
+
+
+def test_tm_import_tmxs(tmp_path):
+    service = StubTMService()
+    sources = {}
+    for name in 'abcd':
+        sources[name] = tmp_path / f'{name}.tmx'
+        sources[name].write_bytes(TMX)
+    sources['broken'] = io.BytesIO(b'broken' + TMX)
+    reports = asyncio.run(service.import_tmxs(sources, max_workers=2))
+    assert all(reports[name].bytes == len(TMX) for name in 'abcd')
+    assert isinstance(reports['broken'], ConnectionError)
+    assert service.imported['d'] == TMX
+    assert 'broken' not in service.ended
+    assert service.max_importing == 2
+
+
+def test_tm_import_tmxs_caps_bandwidth():
+    service = StubTMService()
+    limiter = AsyncTransferLimiter(max_bytes_per_second=len(TMX) * 20)
+
+    async def import_tmxs():
+        started = asyncio.get_running_loop().time()
+        await service.import_tmxs({name: io.BytesIO(TMX) for name in 'ab'}, limiter=limiter)
+        return asyncio.get_running_loop().time() - started
+
+    # The second of the two TMs has to wait for the first to be sent.
+    assert asyncio.run(import_tmxs()) >= 0.04
+
+
+def test_async_transfer_limiter_needs_async_with():
+    with pytest.raises(TypeError):
+        with AsyncTransferLimiter(2):
+            pass
+
+
+CSV = ('Entry_ID\tEnglish\tGerman\n' +
+       ''.join(f'{i}\t"term {i}\nwith ""quotes"""\tBegriff {i}\n' for i in range(40))).encode('utf-16')
+
+CONCEPTS = [ConceptEntry(str(i), [], [('EN-US', f'term {i}'), ('DE-DE', f'Begriff {i}')]) for i in range(40)]
+
+
+class StubTBService(AsyncMemoQTBService):
+    """Term base service exporting CSV from memory in small chunks, and importing CSV into memory."""
+
+    def __init__(self, csv: bytes = CSV, chunk_size: int = 64):
+        super().__init__('http://memoq.invalid')
+        self.csv = csv
+        self.chunk_size = chunk_size
+        self.sessions = {}
+        self.ended = []
+        self.imported = {}
+
+    async def BeginChunkedCSVExport(self, tb_guid):
+        if tb_guid == 'missing':
+            raise LookupError(tb_guid)
+        self.sessions[tb_guid] = io.BytesIO(self.csv)
+        return tb_guid
+
+    async def GetNextExportChunk(self, session_id):
+        await asyncio.sleep(0)
+        return self.sessions[session_id].read(self.chunk_size)
+
+    async def EndChunkedExport(self, session_id):
+        self.ended.append(session_id)
+        del self.sessions[session_id]
+
+    async def BeginChunkedCSVImport(self, tb_guid):
+        self.sessions[tb_guid] = bytearray()
+        return tb_guid
+
+    async def AddNextCSVChunk(self, session_id, chunk):
+        await asyncio.sleep(0)
+        self.sessions[session_id].extend(chunk)
+
+    async def EndChunkedCSVImport(self, session_id):
+        self.ended.append(session_id)
+        self.imported[session_id] = bytes(self.sessions.pop(session_id))
+        return SimpleNamespace(__values__={'SuccessCount': 40})
+
+    async def BeginChunkedMultiTermExport(self, tb_guid):
+        self.sessions[tb_guid] = io.BytesIO(b''.join(encode_concept_entries(CONCEPTS)))
+        return tb_guid
+
+    BeginChunkedMultiTermImport = BeginChunkedCSVImport
+    AddNextMultiTermChunk = AddNextCSVChunk
+    EndChunkedMultiTermImport = EndChunkedCSVImport
+
+
+def test_tb_iter_csv_chunks():
+    service = StubTBService()
+
+    async def export():
+        return [chunk async for chunk in service.iter_csv_chunks('tb')]
+
+    assert b''.join(asyncio.run(export())) == CSV
+    assert service.ended == ['tb']
+
+
+def test_tb_iter_term_entries():
+    service = StubTBService()
+
+    async def export():
+        return [entry async for entry in service.iter_term_entries('tb')]
+
+    entries = asyncio.run(export())
+    assert len(entries) == 40
+    assert entries[5] == TermEntry(('Entry_ID', 'English', 'German'), ('5', 'term 5\nwith "quotes"', 'Begriff 5'))
+
+
+def test_tb_export_csvs(tmp_path):
+    service = StubTBService()
+    assert asyncio.run(service.export_csv('tb', tmp_path / 'tb.csv')) == len(CSV)
+    assert (tmp_path / 'tb.csv').read_bytes() == CSV
+
+    results = asyncio.run(service.export_csvs({'a': tmp_path / 'a.csv', 'missing': tmp_path / 'missing.csv'}))
+    assert results['a'] == len(CSV)
+    assert isinstance(results['missing'], LookupError)
+
+
+def test_tb_import_csvs(tmp_path):
+    service = StubTBService()
+    (tmp_path / 'a.csv').write_bytes(CSV)
+
+    async def copy():
+        entries = [entry async for entry in service.iter_term_entries('tb')]
+        return await service.import_csvs({'a': tmp_path / 'a.csv', 'b': entries}, max_workers=2)
+
+    reports = asyncio.run(copy())
+    assert reports['a'].bytes == len(CSV)
+    assert reports['a'].counts == {'SuccessCount': 40}
+    assert service.imported['a'] == CSV
+    assert reports['b'].bytes == len(service.imported['b'])
+
+    async def parse(data):
+        async def chunks():
+            yield data
+        return [entry async for entry in aiter_term_entries(chunks())]
+
+    assert len(asyncio.run(parse(service.imported['b']))) == 40
+
+
+def test_tb_export_and_import_multiterm():
+    service = StubTBService()
+
+    async def copy():
+        concepts = [concept async for concept in service.iter_concept_entries('tb')]
+        return concepts, await service.import_multiterm('copy', iter(concepts))
+
+    concepts, report = asyncio.run(copy())
+    assert concepts == CONCEPTS
+    assert service.ended == ['tb', 'copy']
+    assert report.bytes == len(service.imported['copy'])
+    assert service.imported['copy'] == b''.join(encode_concept_entries(CONCEPTS))
+
+
+def test_tb_import_csv_is_never_ended_when_it_fails():
+    service = StubTBService()
+
+    def entries():
+        yield TermEntry(('English',), ('term',))
+        raise ConnectionError('lost')
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(service.import_csv('tb', entries()))
+    assert service.ended == []
+    assert not service.imported
+
+
+class StubServerProjectService(object):
+    """Server project service returning the same translation documents for every project."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.statistics_requests = []
+
+    async def ListProjectTranslationDocuments(self, project_guid):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if project_guid == 'broken':
+            raise ConnectionError('lost')
+        return [SimpleNamespace(TargetLangCode=language, TotalWordCount=100, ConfirmedWordCount=25)
+                for language in ('de-de', 'fr-fr')]
+
+    async def StartStatisticsOnProjectTask(self, project_guid, target_languages, options, result_format):
+        self.statistics_requests.append((project_guid, target_languages))
+        return SimpleNamespace(TaskId=f'{project_guid}-task')
+
+
+class StubTaskScheduler(object):
+    async def wait_async(self, task_id):
+        return SimpleNamespace(ResultsForTargetLangs=[SimpleNamespace(TargetLangCode='de-de', ResultData=task_id)])
+
+
+def project(guid: str, closed: bool = False):
+    return SimpleNamespace(ServerProjectGuid=guid, Name=guid, Client='Client', DocumentStatus='TranslationInProgress',
+                           TimeClosed=datetime(2000, 1, 1) if closed else datetime(9999, 1, 1))
+
+
+def test_harvest_workload_of_active_projects():
+    server = AsyncMemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_server_project_service'] = StubServerProjectService()
+
+    async def list_projects():
+        return [project(str(i)) for i in range(10)] + [project('closed', closed=True), project('broken')]
+
+    server._server_project_service.ListProjects = lambda *args: list_projects()
+    server._task_scheduler = StubTaskScheduler()
+
+    async def harvest():
+        harvest = server.harvest_workload(statistics_options={}, max_workers=3)
+        return harvest, [workload async for workload in harvest]
+
+    harvest, workloads = asyncio.run(harvest())
+    assert sorted(workload.project.ServerProjectGuid for workload in workloads) == sorted([str(i) for i in range(10)] +
+                                                                                          ['broken'])
+    assert service.max_running == 3
+    assert harvest.totals.projects == 11
+    assert harvest.totals.errors == 1
+    assert harvest.totals.word_count == 2000
+    assert harvest.totals.progress == 0.25
+    assert {workload.project.ServerProjectGuid: workload.statistics for workload in workloads}['3'] == \
+        {'de-de': '3-task'}
+    assert service.statistics_requests[0][1] == {'string': ['de-de', 'fr-fr']}
+    with pytest.raises(TypeError):
+        iter(server.harvest_workload())
+
+
+def test_harvest_workload_run():
+    server = AsyncMemoQServer('http://memoq.invalid')
+    server._api_endpoints['_server_project_service'] = StubServerProjectService()
+    harvest = server.harvest_workload([project('a'), project('b')])
+    totals = asyncio.run(harvest.run())
+    assert (totals.projects, totals.documents) == (2, 4)
+    with pytest.raises(RuntimeError):
+        harvest.__aiter__()
+
+
+class StubSecurityService(object):
+    """Security service serving groups and their members from a dict."""
+
+    def __init__(self, members: dict):
+        self.members = members
+        self.list_groups_calls = 0
+        self.list_users_calls = []
+
+    async def ListGroups(self):
+        self.list_groups_calls += 1
+        await asyncio.sleep(0.01)
+        return [SimpleNamespace(GroupGuid=group_guid.upper()) for group_guid in self.members]
+
+    async def ListUsersOfGroup(self, group_guid):
+        self.list_users_calls.append(group_guid)
+        await asyncio.sleep(0.01)
+        return [SimpleNamespace(UserGuid=user_guid.upper()) for user_guid in self.members[group_guid.lower()]]
+
+
+def test_membership_index():
+    server = AsyncMemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_security_service'] = StubSecurityService({
+        'translators': ['alice', 'bob'],
+        'reviewers': ['bob'],
+    })
+
+    async def index():
+        first, second = await asyncio.gather(server.membership_index, server.membership_index)
+        assert first is second
+        return first
+
+    membership_index = asyncio.run(index())
+    assert isinstance(membership_index, AsyncMembershipIndex)
+    assert service.list_groups_calls == 1
+    assert sorted(service.list_users_calls) == ['reviewers', 'translators']
+    assert membership_index.users_of('TRANSLATORS') == {'alice', 'bob'}
+    assert membership_index.groups_of('bob') == {'translators', 'reviewers'}
+
+    service.members['managers'] = ['carol']
+    service.members['reviewers'] = ['alice']
+    del service.members['translators']
+    changes = asyncio.run(server.refresh_membership())
+    # Only the new group is retrieved, and the removed one dropped.
+    assert changes.added == {('carol', 'managers')}
+    assert changes.removed == {('alice', 'translators'), ('bob', 'translators')}
+    assert membership_index.groups_of('bob') == {'reviewers'}
+
+    changes = asyncio.run(membership_index.refresh_groups(['REVIEWERS']))
+    assert changes.added == {('alice', 'reviewers')}
+    assert changes.removed == {('bob', 'reviewers')}
+    assert not membership_index.groups_of('bob')
+    assert asyncio.run(server.membership_index) is membership_index
+
+
+def test_membership_index_load_failure_is_retried():
+    server = AsyncMemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_security_service'] = StubSecurityService({'translators': ['alice']})
+    list_groups = service.ListGroups
+
+    async def unavailable():
+        raise ConnectionError('lost')
+
+    service.ListGroups = unavailable
+    with pytest.raises(ConnectionError):
+        asyncio.run(server.membership_index)
+    service.ListGroups = list_groups
+    assert asyncio.run(server.membership_index).users_of('translators') == {'alice'}
@@ -0,0 +1,302 @@
+"""
+Tests for the on-disk cache of the memoQ service definitions, and for the coalescing of concurrent loads by
+InventoryCache.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import memoq.webservice
+from memoq.cache import CachePolicy, InventoryCache, WSDLCache
+from memoq.transport import AsyncMemoQTransport, MemoQTransport
+from memoq.webservice import MemoQTMService
+
+WAITERS = 8
+
+
+class SlowLoader(object):
+    """Loader counting its calls, which takes long enough for every waiter to ask for the key while it runs."""
+
+    def __init__(self, value='value', error: Exception = None, seconds: float = 0.2):
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+        self.calls = 0
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        call = self.calls
+        self.started.set()
+        time.sleep(self.seconds)
+        if self.error is not None:
+            raise self.error
+        return f'{self.value} {call}'
+
+    async def aload(self):
+        self.calls += 1
+        call = self.calls
+        self.started.set()
+        await asyncio.sleep(self.seconds)
+        if self.error is not None:
+            raise self.error
+        return f'{self.value} {call}'
+
+
+def get_concurrently(cache: InventoryCache, loader) -> list:
+    barrier = threading.Barrier(WAITERS)
+
+    def get():
+        barrier.wait()
+        try:
+            return cache.get('tms', loader)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=WAITERS) as executor:
+        return list(executor.map(lambda _: get(), range(WAITERS)))
+
+
+async def aget_concurrently(cache: InventoryCache, loader) -> list:
+    return await asyncio.gather(*(cache.aget('tms', loader) for _ in range(WAITERS)), return_exceptions=True)
+
+
+@pytest.mark.parametrize('policy', [CachePolicy(ttl=None), CachePolicy(ttl=0)], ids=['cached', 'uncached'])
+def test_get_loads_a_cold_key_once(policy):
+    cache = InventoryCache({'tms': policy})
+    loader = SlowLoader()
+    assert get_concurrently(cache, loader) == ['value 1'] * WAITERS
+    assert loader.calls == 1
+
+
+def test_get_gives_every_waiter_the_exception():
+    cache = InventoryCache({'tms': CachePolicy(ttl=None)})
+    error = ConnectionError('memoQ server unavailable')
+    loader = SlowLoader(error=error)
+    assert all(result is error for result in get_concurrently(cache, loader))
+    assert loader.calls == 1
+    # Nothing was cached, so the next request loads again.
+    loader.error = None
+    assert cache.get('tms', loader) == 'value 2'
+
+
+@pytest.mark.parametrize('key', [None, 'tms'], ids=['all', 'key'])
+def test_invalidate_during_get_discards_the_load(key):
+    cache = InventoryCache({'tms': CachePolicy(ttl=None)})
+    loader = SlowLoader()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        in_flight = executor.submit(cache.get, 'tms', loader)
+        loader.started.wait()
+        cache.invalidate(key)
+        # The load started before the invalidation still completes for its caller, but is not stored.
+        assert in_flight.result() == 'value 1'
+    assert cache.get('tms', loader) == 'value 2'
+    assert cache.get('tms', loader) == 'value 2'
+    assert loader.calls == 2
+
+
+@pytest.mark.parametrize('policy', [CachePolicy(ttl=None), CachePolicy(ttl=0)], ids=['cached', 'uncached'])
+def test_aget_loads_a_cold_key_once(policy):
+    cache = InventoryCache({'tms': policy})
+    loader = SlowLoader()
+    assert asyncio.run(aget_concurrently(cache, loader.aload)) == ['value 1'] * WAITERS
+    assert loader.calls == 1
+
+
+def test_aget_gives_every_waiter_the_exception():
+    cache = InventoryCache({'tms': CachePolicy(ttl=None)})
+    error = ConnectionError('memoQ server unavailable')
+    loader = SlowLoader(error=error)
+    assert all(result is error for result in asyncio.run(aget_concurrently(cache, loader.aload)))
+    assert loader.calls == 1
+    loader.error = None
+    assert asyncio.run(cache.aget('tms', loader.aload)) == 'value 2'
+
+
+@pytest.mark.parametrize('key', [None, 'tms'], ids=['all', 'key'])
+def test_invalidate_during_aget_discards_the_load(key):
+    cache = InventoryCache({'tms': CachePolicy(ttl=None)})
+    loader = SlowLoader()
+
+    async def invalidate_in_flight():
+        in_flight = asyncio.ensure_future(cache.aget('tms', loader.aload))
+        while not loader.started.is_set():
+            await asyncio.sleep(0)
+        cache.invalidate(key)
+        # A request made after the invalidation starts a new load, rather than waiting for the discarded one.
+        loader.seconds = 0.4
+        reloaded = asyncio.ensure_future(cache.aget('tms', loader.aload))
+        discarded = await in_flight
+        # The discarded load completing does not stop later requests from waiting for the new one.
+        joined = asyncio.ensure_future(cache.aget('tms', loader.aload))
+        return discarded, await reloaded, await joined, await cache.aget('tms', loader.aload)
+
+    assert asyncio.run(invalidate_in_flight()) == ('value 1', 'value 2', 'value 2', 'value 2')
+    assert loader.calls == 2
+
+
+class FakeClock(object):
+    """Stand-in for the time module, whose clock only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memoq.cache, 'time', clock)
+    return clock
+
+
+def test_values_expire_after_their_ttl(clock):
+    cache = InventoryCache({'tms': CachePolicy(ttl=60)})
+    loader = SlowLoader(seconds=0)
+    assert cache.get('tms', loader) == 'value 1'
+    clock.now += 59
+    assert cache.get('tms', loader) == 'value 1'
+    clock.now += 1
+    assert cache.get('tms', loader) == 'value 2'
+    assert loader.calls == 2
+
+
+def test_keys_without_a_policy_are_not_cached():
+    cache = InventoryCache({'tms': CachePolicy(ttl=None)})
+    loader = SlowLoader(seconds=0)
+    assert [cache.get('users', loader) for _ in range(2)] == ['value 1', 'value 2']
+    cache = InventoryCache(default_policy=CachePolicy(ttl=None))
+    assert [cache.get('users', loader) for _ in range(2)] == ['value 3', 'value 3']
+
+
+def test_stale_values_are_returned_while_they_are_refreshed(clock):
+    cache = InventoryCache({'tms': CachePolicy(ttl=10, max_age=60, stale_while_revalidate=True)})
+    loader = SlowLoader(seconds=0.1)
+    assert cache.get('tms', loader) == 'value 1'
+    clock.now += 20
+    assert cache.get('tms', loader) == 'value 1'
+    # The value is only refreshed once, however many times it is asked for in the meantime.
+    assert cache.get('tms', loader) == 'value 1'
+    while cache._refreshing:
+        time.sleep(0.01)
+    assert cache.get('tms', loader) == 'value 2'
+    assert loader.calls == 2
+    # Past their max_age, values are loaded again before being returned.
+    clock.now += 60
+    assert cache.get('tms', loader) == 'value 3'
+
+
+def test_stale_values_are_refreshed_in_the_background_for_asyncio(clock):
+    cache = InventoryCache({'tms': CachePolicy(ttl=10, stale_while_revalidate=True)})
+    loader = SlowLoader(seconds=0)
+
+    async def get_stale_then_fresh():
+        stale = await cache.aget('tms', loader.aload)
+        while cache._refreshing:
+            await asyncio.sleep(0.01)
+        return stale, await cache.aget('tms', loader.aload)
+
+    assert asyncio.run(cache.aget('tms', loader.aload)) == 'value 1'
+    clock.now += 20
+    assert asyncio.run(get_stale_then_fresh()) == ('value 1', 'value 2')
+
+
+def test_failed_background_refreshes_are_logged_and_the_stale_value_kept(clock, caplog):
+    cache = InventoryCache({'tms': CachePolicy(ttl=10, stale_while_revalidate=True)})
+    loader = SlowLoader(seconds=0)
+    assert cache.get('tms', loader) == 'value 1'
+    clock.now += 20
+    loader.error = ConnectionError('lost')
+    assert cache.get('tms', loader) == 'value 1'
+    while cache._refreshing:
+        time.sleep(0.01)
+
+    async def get_stale():
+        stale = await cache.aget('tms', loader.aload)
+        while cache._refreshing:
+            await asyncio.sleep(0.01)
+        return stale
+
+    assert asyncio.run(get_stale()) == 'value 1'
+    assert loader.calls == 3
+    failures = [record for record in caplog.records if record.name == 'memoq.cache']
+    assert len(failures) == 2
+    assert all(isinstance(record.exc_info[1], ConnectionError) for record in failures)
+
+
+def test_invalidate_discards_a_key_or_every_key():
+    cache = InventoryCache({'tms': CachePolicy(ttl=None), 'tbs': CachePolicy(ttl=None)})
+    tms, tbs = SlowLoader('tms', seconds=0), SlowLoader('tbs', seconds=0)
+    cache.get('tms', tms)
+    cache.get('tbs', tbs)
+    cache.invalidate('tms')
+    assert (cache.get('tms', tms), cache.get('tbs', tbs)) == ('tms 2', 'tbs 1')
+    cache.invalidate()
+    assert (cache.get('tms', tms), cache.get('tbs', tbs)) == ('tms 3', 'tbs 2')
+
+
+def list_tms(base_url: str, cache: WSDLCache) -> list:
+    return MemoQTMService(base_url, MemoQTransport(cache=cache)).ListTMs()
+
+
+def test_service_definitions_are_kept_on_disk(fake_server, tmp_path):
+    list_tms(fake_server.base_url, WSDLCache(str(tmp_path)))
+    assert fake_server.calls['tm?wsdl'] == 1
+    # A new cache on the same directory, as in another process, only asks the server for its API version.
+    cache = WSDLCache(str(tmp_path))
+    assert cache.version(fake_server.base_url) == '9.2.5'
+    fake_server.calls.clear()
+    list_tms(fake_server.base_url, cache)
+    assert fake_server.calls == {'GetApiVersion': 1, 'ListTMs': 1}
+
+
+def test_service_definitions_are_discarded_when_the_api_version_changes(fake_server, tmp_path):
+    list_tms(fake_server.base_url, WSDLCache(str(tmp_path)))
+    fake_server.api_version = '10.0.1'
+    fake_server.calls.clear()
+    cache = WSDLCache(str(tmp_path))
+    assert cache.ensure_validated(fake_server.base_url, lambda: fake_server.api_version)
+    assert cache.version(fake_server.base_url) == '10.0.1'
+    assert not cache.ensure_validated(fake_server.base_url, lambda: pytest.fail('validated twice'))
+    list_tms(fake_server.base_url, cache)
+    assert fake_server.calls == {'tm?wsdl': 1, 'ListTMs': 1}
+    server_path = cache._server_path(fake_server.base_url)
+    assert sorted(os.listdir(server_path)) == ['10.0.1', 'VERSION']
+
+
+class RecordingTransport(memoq.webservice.Transport):
+    """zeep transport keeping track of its instances."""
+
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+def test_api_version_is_fetched_through_the_transport_of_the_service(fake_server, wsdl_cache, monkeypatch):
+    monkeypatch.setattr(memoq.webservice, 'Transport', RecordingTransport)
+    RecordingTransport.instances.clear()
+    cache = wsdl_cache
+    service = MemoQTMService(fake_server.base_url, MemoQTransport(cache=cache))
+    assert service._fetch_api_version(cache) == '9.2.5'
+    assert not RecordingTransport.instances
+
+
+def test_api_version_of_an_async_service_is_fetched_through_a_closed_transport(fake_server, wsdl_cache, monkeypatch):
+    monkeypatch.setattr(memoq.webservice, 'Transport', RecordingTransport)
+    RecordingTransport.instances.clear()
+    cache = wsdl_cache
+    service = MemoQTMService(fake_server.base_url, AsyncMemoQTransport(cache=cache, operation_timeout=5))
+    assert service._fetch_api_version(cache) == '9.2.5'
+    transport, = RecordingTransport.instances
+    assert transport.operation_timeout == 5
+    assert not transport.session.adapters['http://'].poolmanager.pools
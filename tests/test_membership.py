@@ -0,0 +1,97 @@
+"""
+Tests for the index of the members of the groups on a memoQ server.
+
+The server is given a stub Security service in place of the zeep client, so the tests do not need a memoQ server.
+
+This code is released under the MIT License.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+from memoq.membership import MembershipIndex
+from memoq.server import MemoQServer
+
+
+class StubSecurityService(object):
+    """Security service serving groups and their members from a dict."""
+
+    def __init__(self, members: dict):
+        self.members = members
+        self.list_users_calls = []
+        self._lock = threading.Lock()
+
+    def ListGroups(self):
+        return [SimpleNamespace(GroupGuid=group_guid.upper()) for group_guid in self.members]
+
+    def ListUsersOfGroup(self, group_guid):
+        with self._lock:
+            self.list_users_calls.append(group_guid)
+        time.sleep(0.01)
+        return [SimpleNamespace(UserGuid=user_guid.upper()) for user_guid in self.members[group_guid.lower()]]
+
+
+def test_membership_index():
+    server = MemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_security_service'] = StubSecurityService({
+        'translators': ['alice', 'bob'],
+        'reviewers': ['bob'],
+    })
+    membership_index = server.membership_index
+    assert isinstance(membership_index, MembershipIndex)
+    assert server.membership_index is membership_index
+    assert sorted(service.list_users_calls) == ['reviewers', 'translators']
+    assert membership_index.users_of('TRANSLATORS') == {'alice', 'bob'}
+    assert membership_index.groups_of('Bob') == {'translators', 'reviewers'}
+    assert membership_index.is_member('alice', 'translators') and not membership_index.is_member('alice', 'reviewers')
+    assert 'reviewers' in membership_index and len(membership_index) == 2
+
+
+def test_refresh_membership_adds_and_removes_memberships():
+    server = MemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_security_service'] = StubSecurityService({
+        'translators': ['alice', 'bob'],
+        'reviewers': ['bob'],
+    })
+    membership_index = server.membership_index
+
+    service.members['managers'] = ['carol', 'bob']
+    del service.members['translators']
+    service.list_users_calls.clear()
+    changes = server.refresh_membership()
+    # Only the new group is retrieved, and the removed one dropped.
+    assert service.list_users_calls == ['managers']
+    assert changes.added == {('carol', 'managers'), ('bob', 'managers')}
+    assert changes.removed == {('alice', 'translators'), ('bob', 'translators')}
+    assert membership_index.users_of('translators') == set() and 'translators' not in membership_index
+    assert membership_index.groups_of('alice') == set()
+    assert membership_index.groups_of('bob') == {'reviewers', 'managers'}
+    assert membership_index.groups_of('carol') == {'managers'}
+
+    # Members added to and removed from groups already in the index are only seen when the groups are retrieved again.
+    service.members['reviewers'] = ['alice']
+    assert server.refresh_membership() == (set(), set())
+    changes = server.refresh_membership(full=True)
+    assert changes.added == {('alice', 'reviewers')}
+    assert changes.removed == {('bob', 'reviewers')}
+    assert membership_index.users_of('reviewers') == {'alice'}
+    assert membership_index.groups_of('alice') == {'reviewers'}
+    assert membership_index.groups_of('bob') == {'managers'}
+
+    service.members['managers'] = ['carol']
+    changes = membership_index.refresh_groups(['MANAGERS'])
+    assert (changes.added, changes.removed) == (set(), {('bob', 'managers')})
+    assert membership_index.groups_of('bob') == set()
+    assert membership_index.last_refresh is not None
+
+
+def test_refresh_membership_retrieves_groups_older_than_max_age():
+    server = MemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_security_service'] = StubSecurityService({'translators': ['alice']})
+    membership_index = server.membership_index
+    service.members['translators'] = ['bob']
+    assert server.refresh_membership(max_age=60) == (set(), set())
+    time.sleep(0.02)
+    changes = server.refresh_membership(max_age=0.01)
+    assert (changes.added, changes.removed) == ({('bob', 'translators')}, {('alice', 'translators')})
+    assert membership_index.groups_of('bob') == {'translators'}
@@ -0,0 +1,98 @@
+"""
+Tests for mirroring the inventory of a memoQ server into a local SQLite database, against the local stand-in memoQ
+server used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import pytest
+
+from memoq.mirror import COLLECTIONS, InventoryMirror
+from memoq.server import MemoQServer
+
+
+@pytest.fixture
+def server(fake_server):
+    return MemoQServer(fake_server.base_url)
+
+
+@pytest.fixture
+def mirror(server, tmp_path):
+    with InventoryMirror(str(tmp_path / 'inventory.db'), server) as mirror:
+        yield mirror
+
+
+def test_database_uses_write_ahead_logging(mirror, tmp_path):
+    mirror.refresh(['tms'])
+    assert mirror.query("PRAGMA journal_mode")[0][0] == 'wal'
+    # Readers open the mirror without a server, and see what was written while they were open.
+    with InventoryMirror(mirror.path) as reader:
+        assert len(reader.select('tms')) == 10
+        mirror.refresh(['users'])
+        assert len(reader.select('users')) == 10
+        with pytest.raises(RuntimeError):
+            reader.refresh()
+
+
+def test_only_changed_rows_are_written(mirror, fake_server):
+    assert mirror.refresh(['users', 'tms']) == {'users': {'upserted': 10, 'deleted': 0},
+                                                'tms': {'upserted': 10, 'deleted': 0}}
+    assert mirror.refresh(['users', 'tms']) == {'users': {'upserted': 0, 'deleted': 0},
+                                                'tms': {'upserted': 0, 'deleted': 0}}
+    mirror.query("UPDATE users SET FullName = 'Changed' WHERE UserGuid = 'UserGuid-3'")
+    fake_server.list_size = 12
+    assert mirror.refresh(['users']) == {'users': {'upserted': 3, 'deleted': 0}}
+    assert mirror.select('users', {'UserGuid': 'UserGuid-3'})[0]['FullName'] == 'FullName-3'
+    assert mirror.state()['users']['rows'] == 12
+
+
+def test_deleted_items_are_removed(mirror, fake_server):
+    mirror.refresh(['groups', 'tbs'])
+    fake_server.list_size = 7
+    assert mirror.refresh(['groups', 'tbs']) == {'groups': {'upserted': 0, 'deleted': 3},
+                                                 'tbs': {'upserted': 0, 'deleted': 3}}
+    assert mirror.count_by('tbs', 'Name') == {f'Name-{number}': 1 for number in range(7)}
+
+
+def test_projects_are_listed_unless_the_server_syncs_them(mirror, server, fake_server):
+    assert mirror.refresh(['projects']) == {'projects': {'upserted': 10, 'deleted': 0}}
+    fake_server.list_size = 8
+    assert mirror.refresh(['projects']) == {'projects': {'upserted': 0, 'deleted': 2}}
+    assert fake_server.calls['ListProjects'] == 2
+    assert not server.syncs_projects
+
+
+def test_projects_are_synced_incrementally(mirror, server, fake_server):
+    server.sync_projects()
+    assert mirror.refresh(['projects']) == {'projects': {'upserted': 10, 'deleted': 0}}
+    last_full_sync = server.project_store.last_full_sync
+    fake_server.list_size = 12
+    statements = []
+    mirror._connection.set_trace_callback(statements.append)
+    assert mirror.refresh(['projects']) == {'projects': {'upserted': 2, 'deleted': 0}}
+    mirror._connection.set_trace_callback(None)
+    # Only the projects changed by the sync are written, without reading back the rows of the other projects.
+    assert not any(statement.startswith('SELECT "ServerProjectGuid"') for statement in statements)
+    assert server.project_store.last_full_sync == last_full_sync
+    assert server.project_store.last_sync > last_full_sync
+    # Deleted projects are only noticed by a full sync, which may have been made elsewhere e.g. by the server itself.
+    fake_server.list_size = 8
+    assert mirror.refresh(['projects']) == {'projects': {'upserted': 0, 'deleted': 0}}
+    server.sync_projects(full=True)
+    assert mirror.refresh(['projects']) == {'projects': {'upserted': 0, 'deleted': 4}}
+    assert mirror.count_by('projects', 'TimeClosed') == {'2000-01-01T00:00:00': 3, '2100-01-01T00:00:00': 5}
+    assert mirror.select('projects', order_by='Name', limit=1)[0]['Name'] == 'Name-0'
+
+
+def test_columns_cover_the_fields_of_every_record(mirror):
+    records = [{'Guid': 'a', 'Name': 'A'}, {'Guid': 'b', 'Name': 'B', 'Owner': 'someone'}]
+    assert mirror._write(COLLECTIONS['tbs'], records) == {'upserted': 2, 'deleted': 0}
+    assert mirror.columns('tbs') == ('Guid', 'Name', 'Owner')
+    assert mirror.select('tbs', {'Owner': 'someone'})[0]['Guid'] == 'b'
+
+
+def test_unknown_collections_and_fields_are_rejected(mirror):
+    with pytest.raises(KeyError):
+        mirror.refresh(['corpora'])
+    mirror.refresh(['tms'])
+    with pytest.raises(KeyError):
+        mirror.select('tms', {'Owner': 'someone'})
@@ -0,0 +1,46 @@
+"""
+Tests for the lazy imports of the memoq package.
+
+Each test imports the package in a fresh interpreter, so that nothing is already in ``sys.modules``.
+
+This code is released under the MIT License.
+"""
+import subprocess
+import sys
+
+import pytest
+
+import memoq
+
+
+def imported_after(statement: str) -> set:
+    """Function for listing which of the heavy dependencies of the package a statement imports."""
+    code = f"import sys\n{statement}\n" \
+           f"print(' '.join(name for name in ('asyncio', 'lxml', 'requests', 'zeep', 'memoq.server', " \
+           f"'memoq.webservice') if name in sys.modules))"
+    process = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, universal_newlines=True,
+                             check=True)
+    return set(process.stdout.split())
+
+
+def test_import_memoq_does_not_import_its_dependencies():
+    assert imported_after('import memoq') == set()
+
+
+def test_lightweight_modules_do_not_need_zeep():
+    assert imported_after('import memoq.projects') == set()
+    assert 'zeep' not in imported_after('import memoq.tmx')
+
+
+def test_names_are_imported_on_first_use():
+    assert imported_after('from memoq import MemoQServer') >= {'zeep', 'memoq.server', 'memoq.webservice'}
+    assert 'memoq.webservice' in imported_after('import memoq\nmemoq.webservice')
+
+
+def test_exports():
+    from memoq.server import MemoQServer
+    assert memoq.MemoQServer is MemoQServer
+    assert memoq.util is sys.modules['memoq.util']
+    assert {'MemoQServer', 'aio', 'webservice'} <= set(dir(memoq))
+    with pytest.raises(AttributeError):
+        memoq.MemoQClient
@@ -0,0 +1,105 @@
+"""
+Tests for sending servers, services and transports to other processes, by pickling them or by forking, against the
+local stand-in memoQ server used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import os
+import pickle
+
+import pytest
+
+import memoq.cache
+from memoq.aio import AsyncMemoQServer
+from memoq.cache import WSDLCache
+from memoq.server import MemoQServer
+from memoq.stats import Instrumentation
+from memoq.transport import AsyncMemoQTransport
+
+
+@pytest.fixture
+def receiving_process(tmp_path, monkeypatch):
+    """Function unpickling an object as another process would, with a default cache of its own."""
+    def unpickle(data: bytes):
+        monkeypatch.setattr(memoq.cache, '_default_cache', WSDLCache(str(tmp_path / 'receiver')))
+        return pickle.loads(data)
+    return unpickle
+
+
+def test_unpickled_servers_do_not_fetch_the_service_definitions_again(fake_server, receiving_process):
+    server = MemoQServer(fake_server.base_url)
+    assert len(server.tms) == 10
+    data = pickle.dumps(server)
+    fake_server.calls.clear()
+    clone = receiving_process(data)
+    assert clone.base_url == server.base_url and clone.transport is not server.transport
+    assert len(clone.tms) == 10
+    assert fake_server.calls == {'ListTMs': 1}
+
+
+def test_unpickled_services_do_not_fetch_the_service_definitions_again(fake_server, receiving_process):
+    service = MemoQServer(fake_server.base_url)._security_service.prewarm()
+    data = pickle.dumps(service)
+    fake_server.calls.clear()
+    clone = receiving_process(data)
+    assert len(clone.ListUsers()) == 10
+    assert fake_server.calls == {'ListUsers': 1}
+
+
+def test_async_transports_can_be_pickled(fake_server, receiving_process):
+    instrumentation = Instrumentation()
+    transport = AsyncMemoQTransport(pool_size=3, gzip=False, timeout=10, operation_timeout=20,
+                                    instrumentation=instrumentation)
+    clone = pickle.loads(pickle.dumps(transport))
+    assert (clone.pool_size, clone.keep_alive, clone.gzip) == (3, True, False)
+    assert (clone.load_timeout, clone.operation_timeout) == (10, 20)
+    assert clone.client is not transport.client
+    assert clone.client.headers['Accept-Encoding'] == 'identity'
+    assert clone.client.timeout.read == 20 and clone.wsdl_client.timeout.read == 10
+    assert isinstance(clone.instrumentation, Instrumentation)
+
+    async def list_tms(server: AsyncMemoQServer) -> list:
+        try:
+            return await server.tms
+        finally:
+            await server.transport.aclose()
+
+    server = AsyncMemoQServer(fake_server.base_url)
+    assert len(asyncio.run(list_tms(server))) == 10
+    data = pickle.dumps(server)
+    fake_server.calls.clear()
+    assert len(asyncio.run(list_tms(receiving_process(data)))) == 10
+    assert fake_server.calls == {'ListTMs': 1}
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="os.fork() is not available")
+def test_forked_children_start_with_fresh_connections(fake_server):
+    server = MemoQServer(fake_server.base_url)
+    async_server = AsyncMemoQServer(fake_server.base_url)
+    server.tms
+    # The connections of the async client are left bound to the (closed) event loop of this call.
+    asyncio.run(async_server.tms)
+    adapter = server.transport.session.get_adapter('http://')
+    client, wsdl_client = async_server.transport.client, async_server.transport.wsdl_client
+    lock = server._lock
+    fake_server.calls.clear()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            server.cache.invalidate()
+            async_server.cache.invalidate()
+            assert server.transport.session.get_adapter('http://') is not adapter
+            assert async_server.transport.client is not client and async_server.transport.wsdl_client is not wsdl_client
+            assert async_server.transport.client.headers['Accept-Encoding'] == 'gzip, deflate'
+            assert server._lock is not lock
+            assert len(server.tms) == 10
+            assert len(asyncio.run(async_server.tms)) == 10
+            status = 0
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    # The child used the clients of the parent, with their parsed service definitions.
+    assert fake_server.calls == {'ListTMs': 2}
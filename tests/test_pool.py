@@ -0,0 +1,74 @@
+"""
+Tests for querying several memoQ servers at once, against local stand-in memoQ servers used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import time
+
+import pytest
+
+from benchmarks.fake_server import FakeMemoQServer
+from memoq.pool import MemoQServerPool
+from memoq.server import MemoQServer
+from memoq.transport import MemoQTransport
+
+
+@pytest.fixture
+def slow_server():
+    with FakeMemoQServer(list_size=5, latency=1.0) as server:
+        yield server
+
+
+class ClosingTransport(MemoQTransport):
+    """Transport keeping track of whether it was closed."""
+
+    closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+def test_query_merges_the_results_of_every_server(fake_server):
+    with FakeMemoQServer(list_size=3) as other_server:
+        with MemoQServerPool([fake_server.base_url, other_server.base_url]) as pool:
+            result = pool.tms
+    assert result.complete and not result.errors
+    assert [base_url for base_url, _ in result.items] == [fake_server.base_url] * 10 + [other_server.base_url] * 3
+    assert all(seconds > 0 for seconds in result.timings.values())
+
+
+def test_calls_are_bounded_by_the_timeout(fake_server, slow_server):
+    pool = MemoQServerPool([fake_server.base_url, slow_server.base_url], timeout=0.3)
+    result = pool.users
+    assert not result.complete
+    assert list(result.values) == [fake_server.base_url]
+    assert isinstance(result.errors[slow_server.base_url], TimeoutError)
+    assert result.timings[slow_server.base_url] is None
+    # The transports created by the pool time out as well, so the call left running does not hold up closing it.
+    started = time.perf_counter()
+    pool.close()
+    assert time.perf_counter() - started < 0.9
+
+
+def test_a_hanging_server_only_holds_up_its_own_queries(fake_server, slow_server):
+    servers = [MemoQServer(fake_server.base_url), MemoQServer(slow_server.base_url)]
+    with MemoQServerPool(servers, max_concurrency_per_server=1) as pool:
+        for _ in range(3):
+            result = pool.map(lambda server: server.users, timeout=0.3)
+            assert list(result.values) == [fake_server.base_url]
+        # Only the first query was running on the slow server (still validating its cached service definitions), and
+        # the others were dropped rather than left queued.
+        assert slow_server.calls == {'serverproject?wsdl': 1, 'GetApiVersion': 1}
+
+
+def test_close_only_closes_the_transports_of_the_pool(fake_server, slow_server):
+    transport = ClosingTransport()
+    server = MemoQServer(fake_server.base_url, transport)
+    with MemoQServerPool([server, slow_server.base_url]) as pool:
+        created = pool.servers[slow_server.base_url].transport
+        assert created.operation_timeout is None
+    assert not transport.closed
+    assert server.tms
+    with pytest.raises(RuntimeError):
+        pool.tms
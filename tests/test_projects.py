@@ -0,0 +1,164 @@
+"""
+Tests for indexing and keeping local copies of the projects on a memoQ server.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from memoq.aio import AsyncMemoQServer, AsyncMemoQServerProjectService
+from memoq.cache import CachePolicy, InventoryCache
+from memoq.projects import ProjectIndex, ProjectStore, guid_key
+from memoq.server import MemoQServer
+from memoq.webservice import MemoQServerProjectService
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def project(number: int, closed_in_days: int, client: str = 'ACME', status: str = 'TranslationInProgress',
+            name: str = None):
+    time_closed = (NOW + timedelta(days=closed_in_days)).replace(tzinfo=None)
+    return SimpleNamespace(ServerProjectGuid=f'0000000{number}-AAAA-BBBB-CCCC-DDDDDDDDDDDD',
+                           Name=name if name is not None else f'Project {number}', Client=client,
+                           DocumentStatus=status, TimeClosed=time_closed)
+
+
+@pytest.fixture
+def projects() -> list:
+    return [project(1, 10), project(2, -5, client='Initech'), project(3, -30, status='ProofreadingFinished'),
+            project(4, 365), project(5, 0)]
+
+
+def test_active_and_closed_projects_are_split_by_time_closed(projects):
+    index = ProjectIndex(projects)
+    assert [proj.Name for proj in index.active(NOW)] == ['Project 1', 'Project 4']
+    assert [proj.Name for proj in index.closed(NOW)] == ['Project 3', 'Project 2']
+    # Projects closing exactly now are neither active nor closed yet.
+    assert len(index.active(NOW - timedelta(seconds=1))) == 3
+    assert len(index.closed(NOW + timedelta(seconds=1))) == 3
+    assert index.active(NOW - timedelta(days=100)) == index.closed(NOW + timedelta(days=400))
+
+
+def test_projects_are_looked_up_by_guid_name_client_and_status(projects):
+    index = ProjectIndex(projects)
+    assert index.by_guid('00000002-aaaa-bbbb-cccc-dddddddddddd') is projects[1]
+    assert '00000003-AAAA-BBBB-CCCC-DDDDDDDDDDDD' in index
+    assert index.by_guid('00000009-aaaa-bbbb-cccc-dddddddddddd') is None
+    assert index.by_name('Project 4') is projects[3]
+    assert index.by_client('Initech') == [projects[1]]
+    assert index.by_document_status('ProofreadingFinished') == [projects[2]]
+    assert index.client_counts() == {'ACME': 4, 'Initech': 1}
+    assert index.document_status_counts() == {'TranslationInProgress': 4, 'ProofreadingFinished': 1}
+    assert list(index) == projects and len(index) == 5
+
+
+def test_store_replace_merge_and_remove(projects):
+    store = ProjectStore()
+    changes = store.replace(projects[:3], NOW)
+    assert (len(changes.added), changes.updated, changes.removed, changes.full) == (3, [], [], True)
+    snapshot = store.projects
+    renamed = project(1, 10, name='Renamed')
+    changes = store.merge([renamed, projects[1], projects[3]], NOW + timedelta(hours=1))
+    assert (changes.added, changes.updated, changes.removed, changes.full) == ([projects[3]], [renamed], [], False)
+    assert store.last_sync == NOW + timedelta(hours=1) and store.last_full_sync == NOW
+    assert store.projects is not snapshot and len(snapshot) == 3
+    assert ProjectIndex(store.projects).by_name('Renamed') is renamed
+    assert store.remove([projects[2].ServerProjectGuid, projects[4].ServerProjectGuid]) == \
+        [projects[2].ServerProjectGuid]
+    changes = store.replace([renamed], NOW + timedelta(days=1))
+    assert sorted(changes.removed) == [projects[1].ServerProjectGuid, projects[3].ServerProjectGuid]
+    assert len(store) == 1 and renamed.ServerProjectGuid.lower() in store
+
+
+def test_guid_keys_ignore_case():
+    guid = uuid.UUID('6F8E1B3C-0D2A-4E5B-9C7D-1A2B3C4D5E6F')
+    assert guid_key(guid) == guid_key(str(guid).upper()) == '6f8e1b3c-0d2a-4e5b-9c7d-1a2b3c4d5e6f'
+
+
+def test_server_splits_its_projects_through_the_index(fake_server):
+    # The stand-in server closes every third project in 2000, and the others in 2100.
+    server = MemoQServer(fake_server.base_url)
+    assert [proj.Name for proj in server.closed_projects] == ['Name-0', 'Name-3', 'Name-6', 'Name-9']
+    assert len(server.active_projects) == fake_server.list_size - 4
+    index = server.project_index
+    assert server.project_index is index
+    # The index is rebuilt when the projects are retrieved again.
+    server.refresh('all_projects')
+    assert server.project_index is not index
+    assert fake_server.calls['ListProjects'] == 2
+
+
+class RecordingServerProjectService(MemoQServerProjectService):
+    """Server project service keeping track of the filters projects are listed with."""
+
+    def __init__(self, base_url: str = None, transport=None):
+        super().__init__(base_url, transport)
+        self.filters = []
+
+    def ListProjects(self, list_filter: dict):
+        self.filters.append(list_filter)
+        return self._client.service.ListProjects(list_filter)
+
+
+class RecordingMemoQServer(MemoQServer):
+    _server_project_service_class = RecordingServerProjectService
+
+
+def test_synced_projects_are_refreshed_by_syncing(fake_server):
+    server = RecordingMemoQServer(fake_server.base_url)
+    changes = server.sync_projects()
+    assert (len(changes.added), changes.full) == (fake_server.list_size, True)
+    assert server.all_projects is server.project_store.projects
+    last_sync = server.project_store.last_sync
+    assert server.refresh('all_projects') is server.project_store.projects
+    assert len(server.all_projects) == fake_server.list_size
+    assert server.project_store.last_sync > last_sync
+    assert ['LastChanged' in list_filter for list_filter in server._server_project_service.filters] == [False, True]
+    assert len(server.active_projects) == fake_server.list_size - 4
+
+
+def test_synced_projects_are_refreshed_by_syncing_once_they_expire(fake_server):
+    server = RecordingMemoQServer(fake_server.base_url, cache=InventoryCache({'all_projects': CachePolicy(ttl=0)}),
+                                  compact=True)
+    server.sync_projects()
+    server.all_projects
+    server.all_projects
+    assert ['LastChanged' in list_filter for list_filter in server._server_project_service.filters] == \
+           [False, True, True]
+    assert all(hasattr(proj, '_fields') for proj in server.all_projects)
+
+
+class AsyncRecordingServerProjectService(AsyncMemoQServerProjectService):
+    """Asyncio server project service keeping track of the filters projects are listed with."""
+
+    def __init__(self, base_url: str = None, transport=None):
+        super().__init__(base_url, transport)
+        self.filters = []
+
+    async def ListProjects(self, list_filter: dict):
+        self.filters.append(list_filter)
+        return await self._client.service.ListProjects(list_filter)
+
+
+class AsyncRecordingMemoQServer(AsyncMemoQServer):
+    _server_project_service_class = AsyncRecordingServerProjectService
+
+
+def test_async_synced_projects_are_refreshed_by_syncing(fake_server):
+    async def sync_then_refresh():
+        async with AsyncRecordingMemoQServer(fake_server.base_url) as server:
+            await server.sync_projects()
+            synced = await server.all_projects
+            last_sync = server.project_store.last_sync
+            refreshed = await server.refresh('all_projects')
+            return synced, refreshed, last_sync, server
+
+    synced, refreshed, last_sync, server = asyncio.run(sync_then_refresh())
+    assert len(synced) == fake_server.list_size
+    assert refreshed is server.project_store.projects
+    assert server.project_store.last_sync > last_sync
+    assert ['LastChanged' in list_filter for list_filter in server._server_project_service.filters] == [False, True]
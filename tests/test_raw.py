@@ -0,0 +1,168 @@
+"""
+Tests for decoding the raw SOAP responses of the memoQ Web Service API, against the local stand-in memoQ server used
+by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import io
+from datetime import datetime
+
+import pytest
+from zeep import Client
+
+from memoq.aio import AsyncMemoQServerProjectService
+from memoq.raw import iter_result_records, result_item_types
+from memoq.server import MemoQServer
+from memoq.stats import Instrumentation
+from memoq.transport import AsyncMemoQTransport, MemoQTransport
+from memoq.util import response_objects_to_records
+
+
+@pytest.fixture
+def project_service(fake_server):
+    return MemoQServer(fake_server.base_url)._server_project_service
+
+
+def test_records_match_the_compact_records_of_zeep_objects(project_service):
+    raw = list(project_service.raw.ListProjects())
+    assert raw == response_objects_to_records(project_service.ListProjects())
+    assert type(raw[0]).__name__ == 'ServerProjectInfo'
+
+
+def test_arrays_are_decoded_according_to_their_type(project_service):
+    # The stand-in server sends target languages of zero, one and two items in turn.
+    raw = list(project_service.raw.ListProjects())[:3]
+    compact = response_objects_to_records(project_service.ListProjects())[:3]
+    assert [project.TargetLanguageCodes for project in raw] == [project.TargetLanguageCodes for project in compact]
+    assert raw[0].TargetLanguageCodes is None
+    assert raw[1].TargetLanguageCodes.string == ('fre',)
+    assert raw[2].TargetLanguageCodes.string == ('fre', 'ger')
+    assert type(raw[2].TargetLanguageCodes).__name__ == 'ArrayOfstring'
+
+
+def test_raw_calls_are_posted_through_the_transport_and_instrumented(fake_server):
+    class RecordingTransport(MemoQTransport):
+        def post_stream(self, address, message, headers):
+            self.posted.append(headers)
+            return super().post_stream(address, message, headers)
+
+    instrumentation = Instrumentation()
+    transport = RecordingTransport(instrumentation=instrumentation)
+    transport.posted = []
+    project_service = MemoQServer(fake_server.base_url, transport=transport)._server_project_service
+    records = project_service.raw.ListProjects()
+    # The call is only made once the generator is advanced.
+    assert fake_server.calls['ListProjects'] == 0
+    assert len(list(records)) == 10
+    assert [headers['SOAPAction'] for headers in transport.posted] == \
+        ['"http://kilgray.com/memoqservices/2007/IServerProjectService/ListProjects"']
+    stats = instrumentation.snapshot()['MemoQServerProjectService.ListProjects']
+    assert stats['count'] == 1 and stats['errors'] == 0
+    assert stats['request_bytes'] > 0 and stats['response_bytes'] > 0
+    assert stats['network_seconds'] > 0 and stats['parse_seconds'] > 0
+    assert stats['network_seconds'] + stats['parse_seconds'] + stats['local_seconds'] == \
+        pytest.approx(stats['total_seconds'])
+
+
+def test_raw_calls_need_a_synchronous_transport():
+    service = AsyncMemoQServerProjectService('http://memoq.invalid', transport=AsyncMemoQTransport())
+    # Raised on the call itself, not once the generator is advanced.
+    with pytest.raises(TypeError):
+        service.iter_raw('ListProjects')
+
+
+# Service definition in which the item elements are named differently from their types, and the strings of an
+# ArrayOfstring are in another namespace, as in the service definitions of WCF.
+THINGS_WSDL = """<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+        xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:things" xmlns:arr="urn:arrays"
+        targetNamespace="urn:things">
+  <wsdl:types>
+    <xs:schema targetNamespace="urn:arrays" elementFormDefault="qualified">
+      <xs:complexType name="ArrayOfstring">
+        <xs:sequence><xs:element name="string" type="xs:string" minOccurs="0" maxOccurs="unbounded"/></xs:sequence>
+      </xs:complexType>
+    </xs:schema>
+    <xs:schema targetNamespace="urn:things" elementFormDefault="qualified">
+      <xs:import namespace="urn:arrays"/>
+      <xs:complexType name="ThingInfo">
+        <xs:sequence>
+          <xs:element name="Name" type="xs:string" minOccurs="0"/>
+          <xs:element name="Created" type="xs:dateTime" minOccurs="0"/>
+          <xs:element name="Codes" type="arr:ArrayOfstring" minOccurs="0" nillable="true"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="ArrayOfThingInfo">
+        <xs:sequence><xs:element name="Thing" type="tns:ThingInfo" minOccurs="0" maxOccurs="unbounded"/></xs:sequence>
+      </xs:complexType>
+      <xs:element name="ListThings"><xs:complexType><xs:sequence/></xs:complexType></xs:element>
+      <xs:element name="ListThingsResponse"><xs:complexType><xs:sequence>
+        <xs:element name="ListThingsResult" type="tns:ArrayOfThingInfo" minOccurs="0"/>
+      </xs:sequence></xs:complexType></xs:element>
+      <xs:element name="ListCodes"><xs:complexType><xs:sequence/></xs:complexType></xs:element>
+      <xs:element name="ListCodesResponse"><xs:complexType><xs:sequence>
+        <xs:element name="ListCodesResult" type="arr:ArrayOfstring" minOccurs="0"/>
+      </xs:sequence></xs:complexType></xs:element>
+    </xs:schema>
+  </wsdl:types>
+  <wsdl:message name="ListThingsIn"><wsdl:part name="parameters" element="tns:ListThings"/></wsdl:message>
+  <wsdl:message name="ListThingsOut"><wsdl:part name="parameters" element="tns:ListThingsResponse"/></wsdl:message>
+  <wsdl:message name="ListCodesIn"><wsdl:part name="parameters" element="tns:ListCodes"/></wsdl:message>
+  <wsdl:message name="ListCodesOut"><wsdl:part name="parameters" element="tns:ListCodesResponse"/></wsdl:message>
+  <wsdl:portType name="IThingService">
+    <wsdl:operation name="ListThings">
+      <wsdl:input message="tns:ListThingsIn"/><wsdl:output message="tns:ListThingsOut"/>
+    </wsdl:operation>
+    <wsdl:operation name="ListCodes">
+      <wsdl:input message="tns:ListCodesIn"/><wsdl:output message="tns:ListCodesOut"/>
+    </wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="ThingBinding" type="tns:IThingService">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="ListThings">
+      <soap:operation soapAction="urn:things/ListThings" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+    <wsdl:operation name="ListCodes">
+      <soap:operation soapAction="urn:things/ListCodes" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="ThingService">
+    <wsdl:port name="ThingPort" binding="tns:ThingBinding">
+      <soap:address location="http://memoq.invalid/things"/>
+    </wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+
+def test_item_types_are_resolved_from_the_output_message(tmp_path):
+    (tmp_path / 'things.wsdl').write_text(THINGS_WSDL)
+    binding = Client(str(tmp_path / 'things.wsdl')).wsdl.bindings['{urn:things}ThingBinding']
+    response = b'<Envelope><Body><ListThingsResponse xmlns="urn:things" xmlns:a="urn:arrays"><ListThingsResult>' \
+               b'<Thing><Name>one</Name><Created>2020-01-02T03:04:05</Created><Codes><a:string>fre</a:string></Codes>' \
+               b'</Thing><Thing><Name>two</Name></Thing>' \
+               b'</ListThingsResult></ListThingsResponse></Body></Envelope>'
+    records = list(iter_result_records(io.BytesIO(response), 'ListThings',
+                                       result_item_types(binding.get('ListThings'))))
+    assert type(records[0]).__name__ == 'ThingInfo'
+    assert records[0].Created == datetime(2020, 1, 2, 3, 4, 5)
+    # A single code is still an array, as the type says so.
+    assert records[0].Codes.string == ('fre',)
+    assert (records[1].Name, records[1].Created, records[1].Codes) == ('two', None, None)
+    response = b'<Envelope><Body><ListCodesResponse xmlns="urn:things" xmlns:a="urn:arrays"><ListCodesResult>' \
+               b'<a:string>fre</a:string><a:string>ger</a:string>' \
+               b'</ListCodesResult></ListCodesResponse></Body></Envelope>'
+    assert list(iter_result_records(io.BytesIO(response), 'ListCodes', result_item_types(binding.get('ListCodes')))) \
+        == ['fre', 'ger']
+
+
+def test_items_without_a_known_type_keep_their_text():
+    response = b'<Envelope><Body><ListThingsResponse><ListThingsResult>' \
+               b'<Thing><Name>one</Name><Codes><string>fre</string><string>ger</string></Codes></Thing>' \
+               b'<Thing><Name>two</Name><Codes><string>fre</string></Codes></Thing>' \
+               b'</ListThingsResult></ListThingsResponse></Body></Envelope>'
+    records = list(iter_result_records(io.BytesIO(response), 'ListThings'))
+    assert [(record.Name, record.Codes) for record in records] == \
+        [('one', {'string': ('fre', 'ger')}), ('two', {'string': 'fre'})]
@@ -0,0 +1,82 @@
+"""
+Tests for the memoQ server, against the local stand-in memoQ server used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import time
+
+from benchmarks.fake_server import FakeMemoQServer
+from memoq.aio import AsyncMemoQServer
+from memoq.cache import CachePolicy, InventoryCache
+from memoq.server import MemoQServer
+
+
+def test_inventory_is_cached_according_to_the_default_policies(fake_server):
+    server = MemoQServer(fake_server.base_url)
+    server.api_version, server.api_version
+    server.all_projects, server.all_projects
+    server.tms, server.tms
+    # The API version is also asked for once when validating the cached service definitions.
+    assert (fake_server.calls['GetApiVersion'], fake_server.calls['ListProjects'], fake_server.calls['ListTMs']) == \
+           (2, 1, 2)
+
+
+def test_invalidate_and_refresh(fake_server):
+    server = MemoQServer(fake_server.base_url, cache=InventoryCache(default_policy=CachePolicy(ttl=None)))
+    tms = server.tms
+    assert server.tms is tms
+    assert server.refresh('tms') is not tms
+    server.users
+    server.invalidate('tms', 'users')
+    server.tms, server.users
+    server.invalidate()
+    server.tms, server.users
+    assert (fake_server.calls['ListTMs'], fake_server.calls['ListUsers']) == (4, 3)
+
+
+def test_compact_servers_return_records(fake_server):
+    server = MemoQServer(fake_server.base_url, compact=True)
+    tms = server.tms
+    assert type(tms[0]).__name__ == 'TMInfo' and not hasattr(tms[0], '__dict__')
+    assert tms[0].Name == 'Name-0' and tms[0].NumEntries == 0
+    # The values of fields that repeat across items, such as the client, are shared between records.
+    assert server.refresh('tms')[1].Client is tms[1].Client
+    assert len(server.closed_projects) == 4
+    server.sync_projects()
+    assert all(hasattr(proj, '_fields') for proj in server.project_store.projects)
+
+
+def test_compact_async_servers_return_records(fake_server):
+    async def inventory():
+        async with AsyncMemoQServer(fake_server.base_url, compact=True) as server:
+            return await asyncio.gather(server.tms, server.users, server.active_projects)
+
+    tms, users, active_projects = asyncio.run(inventory())
+    assert [type(items[0]).__name__ for items in (tms, users, active_projects)] == \
+           ['TMInfo', 'UserInfo', 'ServerProjectInfo']
+    assert len(active_projects) == fake_server.list_size - 4
+
+
+def test_light_resources_prefetch():
+    with FakeMemoQServer(list_size=3, latency=0.05) as fake_server:
+        server = MemoQServer(fake_server.base_url)
+        server._light_resource_service.prewarm()
+        light_resources = server.light_resources
+        started = time.monotonic()
+        assert light_resources.prefetch(max_workers=6) is light_resources
+        elapsed = time.monotonic() - started
+        resource_types = light_resources._resource_types
+        # Every type is listed once, six at a time rather than one after the other.
+        assert fake_server.calls['ListResources'] == len(resource_types)
+        assert elapsed < len(resource_types) * fake_server.latency / 2
+        assert [resource.Name for resource in light_resources['QASettings']] == ['Name-0', 'Name-1', 'Name-2']
+        assert fake_server.calls['ListResources'] == len(resource_types)
+
+        fake_server.list_size = 1
+        light_resources.invalidate('QASettings')
+        assert len(light_resources['QASettings']) == 1
+        assert len(light_resources['ProjectTemplate']) == 3
+        light_resources.invalidate()
+        assert len(light_resources['ProjectTemplate']) == 1
+        assert fake_server.calls['ListResources'] == len(resource_types) + 2
@@ -0,0 +1,95 @@
+"""
+Tests for instrumenting the calls made to the memoQ Web Service API.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from memoq.server import MemoQServer
+from memoq.stats import Instrumentation, time_reply_processing
+from memoq.transport import MemoQTransport
+
+
+def failing_hook(record: dict):
+    raise RuntimeError('hook failed')
+
+
+def list_tms():
+    return ['tm']
+
+
+def list_tbs():
+    raise ConnectionError('memoQ server unavailable')
+
+
+async def alist_tms():
+    return ['tm']
+
+
+async def alist_tbs():
+    raise ConnectionError('memoQ server unavailable')
+
+
+def test_failing_hooks_do_not_change_results(caplog):
+    instrumentation = Instrumentation(hook=failing_hook)
+    with caplog.at_level(logging.ERROR, logger='memoq.stats'):
+        assert instrumentation.wrap('ListTMs', list_tms)() == ['tm']
+        with pytest.raises(ConnectionError):
+            instrumentation.wrap('ListTBs', list_tbs)()
+        assert asyncio.run(instrumentation.wrap_async('ListTMs', alist_tms)()) == ['tm']
+        with pytest.raises(ConnectionError):
+            asyncio.run(instrumentation.wrap_async('ListTBs', alist_tbs)())
+    assert [record.getMessage() for record in caplog.records] == \
+           ['Instrumentation hook failed for ListTMs', 'Instrumentation hook failed for ListTBs'] * 2
+    snapshot = instrumentation.snapshot()
+    assert (snapshot['ListTMs']['count'], snapshot['ListTMs']['errors']) == (2, 0)
+    assert (snapshot['ListTBs']['count'], snapshot['ListTBs']['errors']) == (2, 2)
+
+
+def test_operations_are_recorded(fake_server):
+    records = []
+    instrumentation = Instrumentation(hook=records.append)
+    server = MemoQServer(fake_server.base_url, transport=MemoQTransport(instrumentation=instrumentation))
+    server.tms
+    server.tms
+    stats = server.stats()['MemoQTMService.ListTMs']
+    assert stats['count'] == 2 and stats['errors'] == 0
+    assert stats['request_bytes'] > 0 and stats['response_bytes'] > 0
+    assert sum(stats['histogram'].values()) == 2
+    assert stats['network_seconds'] > 0 and stats['parse_seconds'] > 0 and stats['local_seconds'] > 0
+    assert stats['network_seconds'] + stats['parse_seconds'] + stats['local_seconds'] == \
+        pytest.approx(stats['total_seconds'])
+    assert all(record['parse_seconds'] > 0 for record in records)
+    assert [record['operation'] for record in records][-2:] == ['MemoQTMService.ListTMs'] * 2
+    instrumentation.enabled = False
+    server.tms
+    assert server.stats()['MemoQTMService.ListTMs']['count'] == 2
+    instrumentation.reset()
+    assert server.stats() == {}
+
+
+def test_reply_processing_is_timed():
+    def process_reply(client, operation, response):
+        time.sleep(0.05)
+        return response
+
+    binding = SimpleNamespace(process_reply=process_reply)
+    time_reply_processing([binding])
+    timed = binding.process_reply
+    # Timing the same bindings again, e.g. for another client of the same service definition, leaves them as they are.
+    time_reply_processing([binding])
+    assert binding.process_reply is timed
+    records = []
+    instrumentation = Instrumentation(hook=records.append)
+    assert instrumentation.wrap('ListTMs', lambda: binding.process_reply(None, None, 'reply'))() == 'reply'
+    # Replies processed outside of an instrumented call are not recorded.
+    assert binding.process_reply(None, None, 'reply') == 'reply'
+    [record] = records
+    assert record['parse_seconds'] >= 0.05
+    assert record['network_seconds'] == 0
+    assert record['local_seconds'] < 0.05
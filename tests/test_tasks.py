@@ -0,0 +1,127 @@
+"""
+Tests for waiting on memoQ asynchronous tasks.
+
+The scheduler is given a stub Asynchronous Tasks service, so the tests do not need a memoQ server.
+
+This code is released under the MIT License.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError
+from types import SimpleNamespace
+
+import pytest
+
+from memoq.aio import AsyncMemoQServer
+from memoq.stats import Instrumentation
+from memoq.tasks import TaskFailedError, TaskScheduler
+from memoq.transport import AsyncMemoQTransport, MemoQTransport
+
+
+class StubTasksService(object):
+    """Asynchronous Tasks service whose tasks finish after a given number of status polls."""
+
+    def __init__(self, polls: int = 1, status: str = 'Completed'):
+        self.polls = polls
+        self.status = status
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, operation: str, task_id: str) -> int:
+        with self._lock:
+            self.calls.append((time.monotonic(), operation, task_id))
+            return sum(1 for _, called, polled in self.calls if called == operation and polled == task_id)
+
+    def GetTaskStatus(self, task_id):
+        count = self._record('GetTaskStatus', task_id)
+        return SimpleNamespace(Status=self.status if count >= self.polls else 'Executing')
+
+    def GetTaskResult(self, task_id):
+        self._record('GetTaskResult', task_id)
+        return f'result of {task_id}'
+
+    def times(self, operation: str = None) -> list:
+        return [called_at for called_at, called, _ in self.calls if operation is None or called == operation]
+
+
+def test_polls_back_off_exponentially():
+    service = StubTasksService(polls=5)
+    with TaskScheduler(service, max_requests_per_second=1000.0, initial_interval=0.02, backoff=2.0, max_interval=0.1,
+                       jitter=0.0) as scheduler:
+        submitted_at = time.monotonic()
+        assert scheduler.wait('task') == 'result of task'
+    times = [submitted_at] + service.times('GetTaskStatus')
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    # 0.02 before the first poll, then doubling after each poll finding the task still running, up to 0.1.
+    for gap, expected in zip(gaps, (0.02, 0.04, 0.08, 0.1, 0.1)):
+        assert expected * 0.9 <= gap < expected + 0.05
+
+
+def test_polls_are_capped_to_the_requests_per_second():
+    service = StubTasksService()
+    with TaskScheduler(service, max_requests_per_second=50.0, initial_interval=0.0, jitter=0.0) as scheduler:
+        futures = [scheduler.submit(f'task-{number}') for number in range(10)]
+        assert [future.result(5) for future in futures] == [f'result of task-{number}' for number in range(10)]
+    times = sorted(service.times())
+    assert len(times) == 20
+    assert all(later - earlier >= 0.018 for earlier, later in zip(times, times[1:]))
+
+
+def test_failed_tasks_raise():
+    service = StubTasksService(polls=2, status='Failed')
+    with TaskScheduler(service, initial_interval=0.0) as scheduler:
+        with pytest.raises(TaskFailedError) as excinfo:
+            scheduler.wait('task', timeout=5)
+    assert (excinfo.value.task_id, excinfo.value.status, excinfo.value.result) == ('task', 'Failed', 'result of task')
+
+
+def test_close_cancels_pending_tasks():
+    scheduler = TaskScheduler(StubTasksService(polls=1000), initial_interval=60.0)
+    future = scheduler.submit('task')
+    assert len(scheduler) == 1
+    scheduler.close()
+    assert future.cancelled()
+    with pytest.raises(CancelledError):
+        future.result()
+    with pytest.raises(RuntimeError):
+        scheduler.submit('task')
+    assert len(scheduler) == 0
+
+
+def test_tasks_being_polled_are_counted():
+    class BlockingTasksService(StubTasksService):
+        def GetTaskStatus(self, task_id):
+            polling.set()
+            release.wait(5)
+            return super().GetTaskStatus(task_id)
+
+    polling, release = threading.Event(), threading.Event()
+    with TaskScheduler(BlockingTasksService(), initial_interval=0.0) as scheduler:
+        future = scheduler.submit('task')
+        assert polling.wait(5)
+        # The task is out of the queue while its status is being polled, but is still being waited on.
+        assert len(scheduler) == 1
+        release.set()
+        assert future.result(5) == 'result of task'
+        assert len(scheduler) == 0
+
+
+def test_wait_async():
+    async def wait(scheduler: TaskScheduler) -> list:
+        return await asyncio.wait_for(asyncio.gather(scheduler.wait_async('a'), scheduler.wait_async('b')), 5)
+
+    with TaskScheduler(StubTasksService(polls=2), initial_interval=0.0) as scheduler:
+        assert asyncio.run(wait(scheduler)) == ['result of a', 'result of b']
+
+
+def test_async_server_polls_through_a_transport_with_its_settings(wsdl_cache):
+    instrumentation = Instrumentation()
+    transport = AsyncMemoQTransport(pool_size=3, cache=wsdl_cache, operation_timeout=7,
+                                    instrumentation=instrumentation)
+    server = AsyncMemoQServer('http://memoq.invalid', transport=transport)
+    tasks_transport = server.task_scheduler._tasks_service.transport
+    assert isinstance(tasks_transport, MemoQTransport)
+    assert (tasks_transport.pool_size, tasks_transport.cache, tasks_transport.operation_timeout,
+            tasks_transport.instrumentation) == (3, wsdl_cache, 7, instrumentation)
+    assert server.task_scheduler is server.task_scheduler
@@ -0,0 +1,177 @@
+"""
+Tests for streaming CSV and MultiTerm XML exports and imports through the Term base service, against the local stand-in
+memoQ server used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import codecs
+import io
+
+import pytest
+from zeep.exceptions import Fault
+
+from benchmarks.fake_server import FakeMemoQServer
+from memoq.termbase import ConceptEntry, TermEntry, encode_concept_entries, encode_term_entries, \
+    iter_concept_entries, iter_term_entries
+from memoq.transfer import TransferReport
+from memoq.webservice import MemoQTBService
+
+COLUMNS = ('Entry_ID', 'English', 'German')
+CSV = ('Entry_ID\tEnglish\tGerman\r\n' +
+       ''.join(f'{i}\t"term {i}\r\nwith ""quotes"""\tBegriff {i}\r\n' for i in range(40))).encode('utf-16')
+
+CONCEPTS = [ConceptEntry(str(i), [('Definition', f'definition <{i}> & more')],
+                         [('EN-US', f'term {i}'), ('EN-US', f'synonym {i}'), ('DE-DE', f'Begriff {i}')])
+            for i in range(40)]
+MULTITERM = b''.join(encode_concept_entries(CONCEPTS))
+
+
+def chunked(data: bytes, size: int) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.fixture
+def fake_server():
+    # Chunks of an odd size split the UTF-16 code units as well as the rows.
+    with FakeMemoQServer(export_chunk_size=63) as server:
+        server.csv.update({'tb': CSV, 'a': CSV})
+        server.multiterm.update({'tb': MULTITERM})
+        yield server
+
+
+@pytest.fixture
+def service(fake_server):
+    return MemoQTBService(fake_server.base_url)
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 63, 4096])
+def test_term_entries_split_across_chunks(size):
+    entries = list(iter_term_entries(chunked(CSV, size)))
+    assert len(entries) == 40
+    assert entries[5] == TermEntry(COLUMNS, ('5', 'term 5\r\nwith "quotes"', 'Begriff 5'))
+
+
+def test_a_row_spanning_a_chunk_boundary():
+    data = CSV.decode('utf-16')
+    # Split inside the quoted field of the second entry, between the two lines of the field.
+    boundary = len(codecs.BOM_UTF16) + 2 * (data.index('term 1\r\n') + len('term 1\r'))
+    entries = list(iter_term_entries([CSV[:boundary], CSV[boundary:]]))
+    assert entries[1]['English'] == 'term 1\r\nwith "quotes"'
+    assert entries[1].terms('German') == ['Begriff 1']
+
+
+def test_utf8_and_other_delimiters():
+    data = 'ID,English,German\n1,"a, b",c\n\n2,d,\n'.encode('utf-8-sig')
+    entries = list(iter_term_entries(chunked(data, 5)))
+    assert [entry.as_dict() for entry in entries] == [{'ID': '1', 'English': 'a, b', 'German': 'c'},
+                                                      {'ID': '2', 'English': 'd', 'German': ''}]
+    assert list(iter_term_entries([])) == []
+    assert list(iter_term_entries([b'ID'])) == []
+
+
+def test_entries_are_encoded_in_batches():
+    entries = [TermEntry(COLUMNS, (str(i), f'term {i}', f'Begriff {i}')) for i in range(2500)]
+    chunks = list(encode_term_entries(iter(entries)))
+    # A chunk for every 1024 entries, and a last one for the rest.  Only the first chunk starts with a BOM.
+    assert len(chunks) == 3
+    assert chunks[0].startswith(codecs.BOM_UTF16) and not any(chunk.startswith(codecs.BOM_UTF16)
+                                                              for chunk in chunks[1:])
+    assert b''.join(chunks).decode('utf-16').count('Entry_ID') == 1
+    assert list(iter_term_entries(chunks)) == entries
+
+
+def test_dicts_and_other_columns_are_encoded():
+    entries = [{'English': 'a', 'German': 'b'}, TermEntry(('German', 'English', 'Note'), ('d', 'c', 'x'))]
+    data = b''.join(encode_term_entries(entries, encoding='utf-8', delimiter=','))
+    assert data == b'English,German\r\na,b\r\nc,d\r\n'
+    assert list(encode_term_entries([])) == []
+
+
+def test_tb_iter_csv_chunks(service, fake_server):
+    chunks = list(service.iter_csv_chunks('tb'))
+    assert len(chunks) == len(CSV) // 63 + 1
+    assert b''.join(chunks) == CSV
+    assert fake_server.calls['EndChunkedExport'] == 1
+
+
+def test_tb_iter_term_entries(service, fake_server):
+    entries = list(service.iter_term_entries('tb'))
+    assert len(entries) == 40
+    assert entries[39] == TermEntry(COLUMNS, ('39', 'term 39\r\nwith "quotes"', 'Begriff 39'))
+    # Only the chunks holding the entries consumed are requested, and the export is ended when the consumer stops.
+    entries = service.iter_term_entries('tb')
+    next(entries)
+    assert fake_server.calls['GetNextExportChunk'] < 2 * len(CSV) // 63
+    entries.close()
+    assert fake_server.calls['EndChunkedExport'] == 2
+
+
+def test_tb_export_csvs(service, tmp_path):
+    assert service.export_csv('tb', tmp_path / 'tb.csv', pipeline=True) == len(CSV)
+    assert (tmp_path / 'tb.csv').read_bytes() == CSV
+    results = service.export_csvs({'a': tmp_path / 'a.csv', 'missing': tmp_path / 'missing.csv'})
+    assert results['a'] == len(CSV)
+    assert isinstance(results['missing'], Fault)
+
+
+def test_tb_import_csvs(service, fake_server, tmp_path):
+    (tmp_path / 'a.csv').write_bytes(CSV)
+    entries = service.iter_term_entries('tb')
+    reports = service.import_csvs({'a': tmp_path / 'a.csv', 'b': entries, 'c': io.BytesIO(CSV)}, max_workers=2)
+    assert all(isinstance(report, TransferReport) for report in reports.values())
+    assert reports['a'].bytes == reports['c'].bytes == len(CSV)
+    assert reports['a'].counts == reports['b'].counts == {'ErrorCount': 0, 'SuccessCount': 40}
+    assert fake_server.imported['a'] == fake_server.imported['c'] == CSV
+    # Entries are encoded as they are sent, and read back as they were exported.
+    assert reports['b'].bytes == len(fake_server.imported['b'])
+    assert list(iter_term_entries([fake_server.imported['b']])) == list(iter_term_entries([CSV]))
+
+
+def test_tb_import_csv_is_never_ended_when_it_fails(service, fake_server):
+    def entries():
+        yield from service.iter_term_entries('tb')
+        raise ConnectionError('lost')
+
+    with pytest.raises(ConnectionError):
+        service.import_csv('tb', entries())
+    # Ending the import would import the entries read so far, leaving a truncated term base.
+    assert fake_server.calls['EndChunkedCSVImport'] == 0
+    assert 'tb' not in fake_server.imported
+
+
+@pytest.mark.parametrize('size', [1, 7, 4096])
+def test_concept_entries_split_across_chunks(size):
+    assert list(iter_concept_entries(chunked(MULTITERM, size))) == CONCEPTS
+
+
+def test_encode_concept_entries():
+    chunks = list(encode_concept_entries(ConceptEntry(str(i), [], [('EN-US', 'term')]) for i in range(2500)))
+    # Concepts are encoded a batch at a time, and only the first chunk starts with a byte order mark.
+    assert len(chunks) == 3
+    assert [chunk.startswith(codecs.BOM_UTF16) for chunk in chunks] == [True, False, False]
+    assert len(list(iter_concept_entries(chunks))) == 2500
+    assert list(iter_concept_entries(encode_concept_entries([]))) == []
+    # MultiTerm XML written by other tools names languages by their type.
+    data = b'<mtf><conceptGrp><concept>7</concept><languageGrp><language type="English"/><termGrp><term>a</term>' \
+           b'</termGrp></languageGrp></conceptGrp></mtf>'
+    assert list(iter_concept_entries([data])) == [ConceptEntry('7', [], [('English', 'a')])]
+
+
+def test_tb_iter_concept_entries(service, fake_server, tmp_path):
+    assert list(service.iter_concept_entries('tb')) == CONCEPTS
+    assert fake_server.calls['GetNextExportChunk'] > 2
+    assert fake_server.calls['EndChunkedExport'] == 1
+    assert service.export_multiterm('tb', tmp_path / 'tb.xml', pipeline=True) == len(MULTITERM)
+    assert (tmp_path / 'tb.xml').read_bytes() == MULTITERM
+    with pytest.raises(Fault):
+        service.export_multiterm('missing', tmp_path / 'missing.xml')
+
+
+def test_tb_import_multiterm(service, fake_server, tmp_path):
+    (tmp_path / 'tb.xml').write_bytes(MULTITERM)
+    for source in (tmp_path / 'tb.xml', io.BytesIO(MULTITERM), service.iter_concept_entries('tb')):
+        report = service.import_multiterm('a', source)
+        assert report.bytes == len(MULTITERM)
+        assert report.counts == {'ErrorCount': 0, 'SuccessCount': 40}
+        assert fake_server.imported['a'] == MULTITERM
+    assert fake_server.calls['EndChunkedMultiTermImport'] == 3
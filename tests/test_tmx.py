@@ -0,0 +1,148 @@
+"""
+Tests for streaming TMX exports and imports through the Translation Memory service, against the local stand-in memoQ
+server used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import io
+import json
+import time
+
+import pytest
+from zeep.exceptions import Fault
+
+from benchmarks.fake_server import FakeMemoQServer
+from memoq.tmx import TranslationUnit, iter_translation_units
+from memoq.transfer import AdaptiveChunkSize, MIN_CHUNK_SIZE, TransferLimiter, TransferReport
+from memoq.webservice import MemoQTMService
+
+TMX = (b'<?xml version="1.0" encoding="utf-8"?><tmx version="1.4"><header srclang="en-us"/><body>' +
+       b''.join(b'<tu tuid="%d"><prop type="client">Client %d</prop><tuv xml:lang="en-us"><seg>Source '
+                b'<bpt i="1"/>%d</seg></tuv><tuv xml:lang="de-de"><seg>Ziel %d</seg></tuv></tu>' % (i, i, i, i)
+                for i in range(50)) +
+       b'</body></tmx>')
+
+
+@pytest.fixture
+def fake_server():
+    with FakeMemoQServer(export_chunk_size=100) as server:
+        server.tmx.update({'tm': TMX, 'a': TMX, 'b': TMX})
+        yield server
+
+
+@pytest.fixture
+def service(fake_server):
+    return MemoQTMService(fake_server.base_url)
+
+
+def test_tm_iter_tmx_chunks(service, fake_server):
+    chunks = list(service.iter_tmx_chunks('tm'))
+    assert len(chunks) == len(TMX) // 100 + 1
+    assert b''.join(chunks) == TMX
+    assert fake_server.calls['EndChunkedTMXExport'] == 1
+
+
+def test_tm_iter_translation_units(service, fake_server):
+    units = list(service.iter_translation_units('tm'))
+    assert len(units) == 50
+    assert units[7] == TranslationUnit({'tuid': '7'}, [('client', 'Client 7')],
+                                       [('en-us', 'Source <bpt i="1"/>7'), ('de-de', 'Ziel 7')])
+    assert units[7].segment('DE-DE') == 'Ziel 7' and units[7].segment('fr-fr') is None
+    # Only the chunks holding the units consumed are requested, and the export is ended when the consumer stops.
+    units = service.iter_translation_units('tm')
+    next(units)
+    assert fake_server.calls['GetNextTMXChunk'] < 2 * len(TMX) // 100
+    units.close()
+    assert fake_server.calls['EndChunkedTMXExport'] == 2
+
+
+def test_translation_units_split_across_chunks():
+    units = list(iter_translation_units(TMX[i:i + 7] for i in range(0, len(TMX), 7)))
+    assert [unit.attributes['tuid'] for unit in units] == [str(i) for i in range(50)]
+    assert units[0].variants[0] == ('en-us', 'Source <bpt i="1"/>0')
+
+
+@pytest.mark.parametrize('pipeline', [False, True])
+def test_tm_export_tmx(service, tmp_path, pipeline):
+    assert service.export_tmx('tm', tmp_path / 'tm.tmx', pipeline=pipeline) == len(TMX)
+    assert (tmp_path / 'tm.tmx').read_bytes() == TMX
+    dest = io.BytesIO()
+    assert service.export_tmx('tm', dest, pipeline=pipeline) == len(TMX)
+    assert dest.getvalue() == TMX
+
+
+def test_tm_export_tmx_as_json_lines(service, tmp_path):
+    assert service.export_tmx('tm', tmp_path / 'tm.jsonl', json_lines=True) == 50
+    lines = (tmp_path / 'tm.jsonl').read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[3]) == {'attributes': {'tuid': '3'}, 'properties': [['client', 'Client 3']],
+                                    'variants': [['en-us', 'Source <bpt i="1"/>3'], ['de-de', 'Ziel 3']]}
+    dest = io.StringIO()
+    assert service.export_tmx('tm', dest, json_lines=True) == 50
+    assert dest.getvalue().splitlines() == lines
+
+
+def test_tm_export_tmxs(service, tmp_path):
+    destinations = {'a': tmp_path / 'a.tmx', 'b': tmp_path / 'b.tmx', 'missing': tmp_path / 'missing.tmx'}
+    results = service.export_tmxs(destinations, max_workers=2)
+    assert results['a'] == results['b'] == len(TMX)
+    assert isinstance(results['missing'], Fault)
+    assert (tmp_path / 'b.tmx').read_bytes() == TMX
+    assert service.export_tmxs({'a': tmp_path / 'a.jsonl', 'b': tmp_path / 'b.jsonl'}, json_lines=True) == \
+        {'a': 50, 'b': 50}
+
+
+@pytest.mark.parametrize('read_ahead', [0, 2])
+def test_tm_import_tmx(service, fake_server, tmp_path, read_ahead):
+    data = TMX * (2 * MIN_CHUNK_SIZE // len(TMX) + 1)
+    path = tmp_path / 'tm.tmx'
+    path.write_bytes(data)
+    for source in (path, io.BytesIO(data)):
+        report = service.import_tmx('tm', source, chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE),
+                                    read_ahead=read_ahead)
+        assert isinstance(report, TransferReport)
+        assert report.name == 'tm'
+        assert report.bytes == len(data)
+        assert report.counts == {'AllSegmentCount': 50 * (len(data) // len(TMX)),
+                                 'StoredSegmentCount': 50 * (len(data) // len(TMX))}
+        assert fake_server.imported['tm'] == data
+    assert fake_server.calls['AddNextTMXChunk'] > 2
+
+
+def test_tm_import_tmxs(service, fake_server, tmp_path):
+    sources = {}
+    for name in 'abcd':
+        sources[name] = tmp_path / f'{name}.tmx'
+        sources[name].write_bytes(TMX)
+    sources['missing'] = tmp_path / 'missing.tmx'
+    reports = service.import_tmxs(sources, max_workers=2)
+    assert all(reports[name].bytes == len(TMX) for name in 'abcd')
+    assert isinstance(reports['missing'], FileNotFoundError)
+    assert all(fake_server.imported[name] == TMX for name in 'abcd')
+    assert 'missing' not in fake_server.imported
+    assert fake_server.calls['EndChunkedTMXImport'] == 4
+
+
+def test_tm_import_tmx_is_never_ended_when_it_fails(service, fake_server):
+    add_next_chunk = service.AddNextTMXChunk
+
+    def fail_after_the_first_chunk(session_id, chunk):
+        if fake_server.calls['AddNextTMXChunk']:
+            raise ConnectionError('lost')
+        add_next_chunk(session_id, chunk)
+
+    service.AddNextTMXChunk = fail_after_the_first_chunk
+    data = TMX * (2 * MIN_CHUNK_SIZE // len(TMX) + 1)
+    with pytest.raises(ConnectionError):
+        service.import_tmx('tm', io.BytesIO(data), chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE))
+    # Ending the import would commit the first chunk to the TM.
+    assert fake_server.calls['AddNextTMXChunk'] == 1
+    assert fake_server.calls['EndChunkedTMXImport'] == 0
+    assert 'tm' not in fake_server.imported
+
+
+def test_tm_import_tmxs_caps_bandwidth(service):
+    limiter = TransferLimiter(max_bytes_per_second=len(TMX) * 20)
+    started = time.monotonic()
+    service.import_tmxs({name: io.BytesIO(TMX) for name in 'ab'}, limiter=limiter)
+    # The second of the two TMs has to wait for the first to be sent.
+    assert time.monotonic() - started >= 0.04
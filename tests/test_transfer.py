@@ -0,0 +1,125 @@
+"""
+Tests for the chunked transfer helpers used by the memoQ services.
+
+This code is released under the MIT License.
+"""
+import io
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from memoq.transfer import AdaptiveChunkSize, MIN_CHUNK_SIZE, TransferLimiter, iter_chunks, upload_chunks
+from memoq.webservice import MemoQFileManagerService
+
+
+@pytest.fixture
+def data() -> bytes:
+    return os.urandom(40 * MIN_CHUNK_SIZE + 123)
+
+
+@pytest.mark.parametrize('read_ahead', [0, 2])
+def test_buffers_grow_with_the_chunk_size(data, read_ahead):
+    chunk_size = AdaptiveChunkSize(MIN_CHUNK_SIZE)
+    chunks = []
+    for chunk in iter_chunks(io.BytesIO(data), chunk_size, read_ahead):
+        chunks.append(bytes(chunk))
+        if len(chunks) == 3:
+            chunk_size.size = 4 * MIN_CHUNK_SIZE
+    assert b''.join(chunks) == data
+    assert {len(chunk) for chunk in chunks[:3]} == {MIN_CHUNK_SIZE}
+    assert len(chunks[-2]) == 4 * MIN_CHUNK_SIZE
+
+
+@pytest.mark.parametrize('read_ahead', [0, 2])
+def test_buffers_are_sized_to_the_chunks_rather_than_the_maximum(data, read_ahead):
+    chunk_size = AdaptiveChunkSize(MIN_CHUNK_SIZE)
+    fileobj = io.BytesIO(data)
+    tracemalloc.start()
+    try:
+        for _ in iter_chunks(fileobj, chunk_size, read_ahead):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Buffers of the maximum chunk size would take 8 MiB each.
+    assert peak < (read_ahead + 3) * MIN_CHUNK_SIZE
+
+
+def test_files_are_memory_mapped(data, tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+    chunk_size = AdaptiveChunkSize(MIN_CHUNK_SIZE)
+    chunks = [bytes(chunk) for chunk in iter_chunks(str(path), chunk_size, read_ahead=2)]
+    assert b''.join(chunks) == data
+
+
+@pytest.mark.parametrize('read_ahead', [0, 2])
+@pytest.mark.parametrize('from_path', [True, False])
+def test_file_manager_uploads_paths_and_file_objects(fake_server, data, tmp_path, read_ahead, from_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+    service = MemoQFileManagerService(fake_server.base_url)
+    source = str(path) if from_path else io.BytesIO(data)
+    file_guid = service.upload(source, file_name='data.bin', chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE),
+                               read_ahead=read_ahead)
+    assert fake_server.uploaded_bytes[file_guid] == len(data)
+    assert fake_server.calls['AddNextFileChunk'] > 1
+    assert fake_server.calls['EndChunkedFileUpload'] == 1
+
+
+def test_file_manager_uploads_empty_files(fake_server, tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    service = MemoQFileManagerService(fake_server.base_url)
+    file_guid = service.upload(path)
+    assert fake_server.uploaded_bytes[file_guid] == 0
+    assert fake_server.calls['AddNextFileChunk'] == 0
+    assert fake_server.calls['EndChunkedFileUpload'] == 1
+
+
+def test_file_manager_upload_needs_a_file_name(fake_server):
+    with pytest.raises(ValueError):
+        MemoQFileManagerService(fake_server.base_url).upload(io.BytesIO(b'data'))
+
+
+def test_upload_chunks_sends_every_byte_and_aborts_on_failure(data):
+    received = bytearray()
+    ended = []
+    session_id, result = upload_chunks(lambda: 'session', lambda session_id, chunk: received.extend(chunk),
+                                       lambda session_id: ended.append(session_id) or 'done', io.BytesIO(data),
+                                       chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE), read_ahead=2)
+    assert (session_id, result) == ('session', 'done')
+    assert bytes(received) == data
+
+    def fail(session_id, chunk):
+        raise ConnectionError('lost')
+
+    aborted = []
+    with pytest.raises(ConnectionError):
+        upload_chunks(lambda: 'broken', fail, ended.append, io.BytesIO(data), abort=aborted.append)
+    # A failed upload is aborted instead of being ended, which would commit the chunks already sent.
+    assert ended == ['session']
+    assert aborted == ['broken']
+
+
+def test_upload_chunks_logs_failures_to_abort(data, caplog):
+    def fail(session_id, *args):
+        raise ConnectionError(session_id)
+
+    with pytest.raises(ConnectionError, match='^lost$'):
+        upload_chunks(lambda: 'lost', fail, fail, io.BytesIO(data), abort=lambda session_id: fail('abort'))
+    assert "Aborting upload session 'lost' failed" in caplog.text
+
+
+def test_transfer_limiter_caps_the_bandwidth_of_uploads(data):
+    limiter = TransferLimiter(max_concurrency=1, max_bytes_per_second=len(data) * 10)
+    started = time.monotonic()
+    for _ in range(3):
+        upload_chunks(lambda: 'session', lambda session_id, chunk: None, lambda session_id: None, io.BytesIO(data),
+                      chunk_size=AdaptiveChunkSize(MIN_CHUNK_SIZE), limiter=limiter)
+    # Each upload takes a tenth of a second at the capped rate, less the time reserved for its last chunk.
+    assert time.monotonic() - started >= 0.25
+    # The slot is released once each upload finishes.
+    assert limiter._slots.acquire(blocking=False)
@@ -0,0 +1,48 @@
+"""
+Tests for the transport shared between the memoQ services, against the local stand-in memoQ server used by the
+benchmarks.
+
+This code is released under the MIT License.
+"""
+from memoq.server import MemoQServer
+from memoq.transport import MemoQTransport, create_session
+
+
+def test_create_session():
+    session = create_session(pool_size=3, keep_alive=False, gzip=False)
+    assert session.headers['Connection'] == 'close'
+    assert session.headers['Accept-Encoding'] == 'identity'
+    assert session.get_adapter('http://localhost')._pool_maxsize == 3
+
+
+def test_services_share_the_transport_of_the_server(fake_server):
+    server = MemoQServer(fake_server.base_url)
+    services = (server._asynchronous_tasks_service, server._light_resource_service, server._live_docs_service,
+                server._security_service, server._server_project_service, server._tb_service, server._tm_service)
+    assert all(service.transport is server.transport for service in services)
+    assert isinstance(server.transport, MemoQTransport)
+
+
+def test_clients_are_built_on_first_use(fake_server):
+    server = MemoQServer(fake_server.base_url)
+    server._tm_service
+    server._tb_service
+    assert not fake_server.calls
+    assert len(server.tms) == fake_server.list_size
+    # The API version is checked once, when the service definitions are first needed.
+    assert fake_server.calls == {'serverproject?wsdl': 1, 'GetApiVersion': 1, 'tm?wsdl': 1, 'ListTMs': 1}
+    server.refresh('tms')
+    server.tbs
+    assert fake_server.calls['tm?wsdl'] == 1
+    assert fake_server.calls['tb?wsdl'] == 1
+    assert fake_server.calls['ListTMs'] == 2
+
+
+def test_services_reuse_the_connections_of_the_transport(fake_server):
+    server = MemoQServer(fake_server.base_url)
+    server.tms
+    server.tbs
+    server.users
+    adapter = server.transport.session.get_adapter(fake_server.base_url)
+    assert len(adapter.poolmanager.pools) == 1
+    server.transport.close()
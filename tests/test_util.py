@@ -0,0 +1,101 @@
+"""
+Tests for the utility functions serializing response objects, against the local stand-in memoQ server used by the
+benchmarks.
+
+This code is released under the MIT License.
+"""
+import gc
+import io
+import json
+import weakref
+
+import pytest
+from zeep import xsd
+from zeep.helpers import serialize_object
+
+import memoq.util
+from memoq.cache import WSDLCache
+from memoq.server import MemoQServer
+from memoq.transport import MemoQTransport
+from memoq.util import record_field_names, response_object_to_dict, response_object_to_record, \
+    response_objects_to_columns, response_objects_to_dicts, response_objects_to_records, response_objects_to_tuples, \
+    write_json_lines
+from memoq.webservice import MemoQTMService
+
+
+@pytest.fixture
+def server(fake_server):
+    return MemoQServer(fake_server.base_url)
+
+
+@pytest.mark.parametrize('name', ['all_projects', 'tms', 'users'])
+def test_dicts_match_zeep(server, name):
+    objects = getattr(server, name)
+    expected = [dict(serialize_object(o, target_cls=dict)) for o in objects]
+    assert response_objects_to_dicts(objects) == expected
+    assert [response_object_to_dict(o) for o in objects] == expected
+    # Compact records serialize to the same dicts as the objects they were converted from.
+    assert [response_object_to_dict(o) for o in response_objects_to_records(objects)] == expected
+
+
+def test_records_have_the_fields_of_the_objects(server):
+    tm = server.tms[0]
+    record = response_object_to_record(tm)
+    assert record._fields == tuple(tm.__values__)
+    assert (record.Name, record.NumEntries) == (tm.Name, tm.NumEntries)
+    assert response_objects_to_records(None) == []
+
+
+def test_fields_that_are_not_valid_record_fields_are_mapped():
+    thing = xsd.Element('{urn:things}Thing', xsd.ComplexType([
+        xsd.Element('{urn:things}Name', xsd.String()), xsd.Element('{urn:things}from', xsd.String()), xsd.Any()]))
+    record = response_object_to_record(thing(Name='a', _value_1='b', **{'from': 'c'}))
+    assert record._fields == ('Name', 'from_', 'value_1')
+    assert record == ('a', 'c', 'b')
+    assert response_object_to_dict(record) == {'Name': 'a', 'from_': 'c', 'value_1': 'b'}
+    assert record_field_names(['xml-lang', '__id']) == ('xml_lang', 'id')
+    # Rather than renaming the fields after their position, names that cannot be mapped are rejected.
+    for names in (['value', '_value'], ['1st']):
+        with pytest.raises(ValueError):
+            record_field_names(names)
+
+
+def test_converters_are_dropped_with_the_classes_of_a_client(fake_server, tmp_path):
+    def convert_tms(index: int) -> weakref.ref:
+        # A cache of its own, so that every client parses the service definitions and builds new classes.
+        transport = MemoQTransport(cache=WSDLCache(str(tmp_path / str(index))))
+        tms = MemoQTMService(fake_server.base_url, transport).ListTMs()
+        response_objects_to_dicts(tms)
+        response_objects_to_records(tms)
+        assert tms[0].__class__ in memoq.util._converters and tms[0].__class__ in memoq.util._record_converters
+        return weakref.ref(tms[0].__class__)
+
+    gc.collect()
+    converters = len(memoq.util._converters)
+    tm_classes = [convert_tms(index) for index in range(3)]
+    gc.collect()
+    assert not any(tm_class() for tm_class in tm_classes)
+    assert len(memoq.util._converters) == converters
+
+
+def test_tuples_and_columns(server):
+    tms = server.tms
+    fields, rows = response_objects_to_tuples(tms)
+    assert fields == tuple(tms[0].__values__)
+    assert rows[1] == tuple(tms[1].__values__.values())
+    columns = response_objects_to_columns(tms)
+    assert list(columns) == list(fields)
+    assert columns['NumEntries'] == list(range(len(tms)))
+    assert response_objects_to_tuples([]) == ((), [])
+    # zeep returns None rather than an empty list when there are no objects.
+    assert response_objects_to_dicts(None) == []
+    assert response_objects_to_tuples(None) == ((), [])
+    assert response_objects_to_columns(None) == {}
+
+
+def test_write_json_lines(server):
+    fp = io.StringIO()
+    assert write_json_lines(server.all_projects, fp) == len(server.all_projects)
+    first = json.loads(fp.getvalue().splitlines()[0])
+    assert first['Name'] == 'Name-0'
+    assert first['TimeClosed'] == '2000-01-01T00:00:00'
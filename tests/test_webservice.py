@@ -0,0 +1,27 @@
+"""
+Tests for the memoQ Web Service API services, against the local stand-in memoQ server used by the benchmarks.
+
+This code is released under the MIT License.
+"""
+import io
+
+import pytest
+
+from benchmarks.fake_server import FakeMemoQServer
+from memoq.transfer import AdaptiveChunkSize, MAX_CHUNK_SIZE
+from memoq.webservice import MemoQFileManagerService
+
+
+@pytest.fixture
+def fake_server():
+    with FakeMemoQServer(download_size=MAX_CHUNK_SIZE + 1024) as server:
+        yield server
+
+
+def test_file_manager_downloads_the_largest_chunks(fake_server):
+    # Each chunk is base64 encoded into a text node over the 10 MB lxml allows by default.
+    service = MemoQFileManagerService(fake_server.base_url)
+    dest = io.BytesIO()
+    file_name = service.download('file', dest, chunk_size=AdaptiveChunkSize(MAX_CHUNK_SIZE))
+    assert file_name == 'file.bin'
+    assert dest.getvalue() == bytes(MAX_CHUNK_SIZE + 1024)
@@ -0,0 +1,173 @@
+"""
+Tests for harvesting the workload of the projects on a memoQ server.
+
+This code is released under the MIT License.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from lxml import etree
+from zeep import Client
+
+from memoq.server import MemoQServer
+from memoq.workload import WorkloadHarvest
+
+# Just enough of the Server project service for zeep to serialize StartStatisticsOnProjectTask requests.
+WSDL = b'''<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="http://kilgray.com/memoqservices/2007"
+    xmlns:arr="http://schemas.microsoft.com/2003/10/Serialization/Arrays"
+    targetNamespace="http://kilgray.com/memoqservices/2007">
+  <wsdl:types>
+    <xs:schema targetNamespace="http://schemas.microsoft.com/2003/10/Serialization/Arrays"
+        elementFormDefault="qualified">
+      <xs:complexType name="ArrayOfstring">
+        <xs:sequence><xs:element name="string" type="xs:string" minOccurs="0" maxOccurs="unbounded"/></xs:sequence>
+      </xs:complexType>
+    </xs:schema>
+    <xs:schema targetNamespace="http://kilgray.com/memoqservices/2007" elementFormDefault="qualified">
+      <xs:import namespace="http://schemas.microsoft.com/2003/10/Serialization/Arrays"/>
+      <xs:complexType name="StatisticsOptions">
+        <xs:sequence><xs:element name="Analysis_Homogenity" type="xs:boolean" minOccurs="0"/></xs:sequence>
+      </xs:complexType>
+      <xs:element name="StartStatisticsOnProjectTask">
+        <xs:complexType>
+          <xs:sequence>
+            <xs:element name="serverProjectGuid" type="xs:string" minOccurs="0"/>
+            <xs:element name="targetLangCodes" type="arr:ArrayOfstring" minOccurs="0" nillable="true"/>
+            <xs:element name="options" type="tns:StatisticsOptions" minOccurs="0" nillable="true"/>
+            <xs:element name="resultFormat" type="xs:string" minOccurs="0"/>
+          </xs:sequence>
+        </xs:complexType>
+      </xs:element>
+      <xs:element name="StartStatisticsOnProjectTaskResponse">
+        <xs:complexType><xs:sequence/></xs:complexType>
+      </xs:element>
+    </xs:schema>
+  </wsdl:types>
+  <wsdl:message name="Request"><wsdl:part name="parameters" element="tns:StartStatisticsOnProjectTask"/></wsdl:message>
+  <wsdl:message name="Response">
+    <wsdl:part name="parameters" element="tns:StartStatisticsOnProjectTaskResponse"/>
+  </wsdl:message>
+  <wsdl:portType name="IServerProjectService">
+    <wsdl:operation name="StartStatisticsOnProjectTask">
+      <wsdl:input message="tns:Request"/>
+      <wsdl:output message="tns:Response"/>
+    </wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="Binding" type="tns:IServerProjectService">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="StartStatisticsOnProjectTask">
+      <soap:operation soapAction="StartStatisticsOnProjectTask" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input>
+      <wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="ServerProjectService">
+    <wsdl:port name="Port" binding="tns:Binding"><soap:address location="http://memoq.invalid/"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>'''
+
+
+class StubServerProjectService(object):
+    """Server project service recording the serialized StartStatisticsOnProjectTask requests."""
+
+    def __init__(self, client: Client):
+        self.client = client
+        self.requests = []
+
+    def ListProjectTranslationDocuments(self, project_guid):
+        return [SimpleNamespace(TargetLangCode=language, TotalWordCount=100, ConfirmedWordCount=50)
+                for language in ('fr-fr', 'de-de', 'ja-jp', 'de-de')]
+
+    def StartStatisticsOnProjectTask(self, *args):
+        self.requests.append(self.client.create_message(self.client.service, 'StartStatisticsOnProjectTask', *args))
+        return SimpleNamespace(TaskId='task')
+
+
+@pytest.fixture
+def server_project_service(tmp_path):
+    wsdl = tmp_path / 'serverproject.wsdl'
+    wsdl.write_bytes(WSDL)
+    return StubServerProjectService(Client(str(wsdl)))
+
+
+def test_statistics_are_started_for_every_target_language(server_project_service):
+    task_scheduler = SimpleNamespace(wait=lambda task_id: SimpleNamespace(ResultsForTargetLangs=[
+        SimpleNamespace(TargetLangCode=language, ResultData=b'csv') for language in ('de-de', 'fr-fr', 'ja-jp')]))
+    memoq_server = SimpleNamespace(_server_project_service=server_project_service, compact=False,
+                                   task_scheduler=task_scheduler)
+    projects = [SimpleNamespace(ServerProjectGuid='project')]
+
+    workloads = list(WorkloadHarvest(memoq_server, projects, statistics_options={'Analysis_Homogenity': True}))
+
+    assert workloads[0].ok, workloads[0].error
+    assert sorted(workloads[0].statistics) == ['de-de', 'fr-fr', 'ja-jp']
+    request, = server_project_service.requests
+    languages = request.xpath('//arr:string/text()',
+                              namespaces={'arr': 'http://schemas.microsoft.com/2003/10/Serialization/Arrays'})
+    assert languages == ['de-de', 'fr-fr', 'ja-jp'], etree.tostring(request)
+
+
+class CountingServerProjectService(object):
+    """Server project service returning documents with known word counts, and counting the calls running at once."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def ListProjectTranslationDocuments(self, project_guid):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self._lock:
+            self.running -= 1
+        if project_guid == 'broken':
+            raise ConnectionError('lost')
+        # Project n has a German document of 100 * n words, a third of them confirmed, and a French one of 10 words.
+        number = int(project_guid)
+        return [SimpleNamespace(TargetLangCode='de-de', TotalWordCount=100 * number, ConfirmedWordCount=30 * number,
+                                ProofreadWordCount=10 * number, WorkflowStatus='TranslationInProgress'),
+                SimpleNamespace(TargetLangCode='fr-fr', TotalWordCount=10, ConfirmedWordCount=None,
+                                WorkflowStatus='Completed')]
+
+
+def test_harvest_workload_counts_words():
+    server = MemoQServer('http://memoq.invalid')
+    service = server._api_endpoints['_server_project_service'] = CountingServerProjectService()
+    projects = [SimpleNamespace(ServerProjectGuid=guid) for guid in ['0', '1', '2', '3', 'broken', '4']]
+
+    harvest = server.harvest_workload(projects, max_workers=2)
+    workloads = {workload.project.ServerProjectGuid: workload for workload in harvest}
+
+    assert service.max_running == 2
+    assert (workloads['3'].word_count, workloads['3'].confirmed_word_count) == (310, 90)
+    assert workloads['3'].progress == pytest.approx(90 / 310)
+    assert workloads['0'].word_count == 10 and workloads['0'].progress == 0.0
+    assert not workloads['broken'].ok and isinstance(workloads['broken'].error, ConnectionError)
+    assert workloads['broken'].word_count == 0 and workloads['broken'].progress is None
+    assert harvest.totals.as_dict() == {
+        'projects': 6,
+        'errors': 1,
+        'documents': 10,
+        'word_count': 1050,
+        'confirmed_word_count': 300,
+        'proofread_word_count': 100,
+        'progress': 300 / 1050,
+        'word_counts_by_language': {'de-de': 1000, 'fr-fr': 50},
+        'confirmed_word_counts_by_language': {'de-de': 300, 'fr-fr': 0},
+        'documents_by_workflow_status': {'TranslationInProgress': 5, 'Completed': 5},
+    }
+    with pytest.raises(RuntimeError):
+        iter(harvest)
+
+
+def test_harvest_workload_run():
+    server = MemoQServer('http://memoq.invalid')
+    server._api_endpoints['_server_project_service'] = CountingServerProjectService()
+    totals = server.harvest_workload([SimpleNamespace(ServerProjectGuid='2')]).run()
+    assert (totals.projects, totals.documents, totals.word_count) == (1, 2, 210)